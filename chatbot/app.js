@@ -1,221 +1,130 @@
 const { useState, useEffect } = React;
 
+// 서버 모드 대화 세션 id: 이전 대화는 서버가 보관하므로 매 요청에는 새 메시지만 보낸다
+const getSessionId = () => {
+  let id = localStorage.getItem('chatSessionId');
+  if (!id) {
+    id = crypto.randomUUID ? crypto.randomUUID() : `${Date.now()}-${Math.random().toString(36).slice(2)}`;
+    localStorage.setItem('chatSessionId', id);
+  }
+  return id;
+};
+
 function App() {
-  const [apiKey, setApiKey] = useState('');
+  const [serverUrl, setServerUrl] = useState('');
+  const [connected, setConnected] = useState(false);
   const [messages, setMessages] = useState([]);
   const [input, setInput] = useState('');
   const [loading, setLoading] = useState(false);
-  const [showKeyInput, setShowKeyInput] = useState(false);
   const [logs, setLogs] = useState([]);
   const [activeTab, setActiveTab] = useState('chat');
   const [configLoaded, setConfigLoaded] = useState(false);
-  const [systemInitialized, setSystemInitialized] = useState(false);
 
-  // config.json에서 API 키 로드
+  // 서버 주소 결정: 서버가 제공하는 페이지면 같은 origin, 따로 띄운 경우 config.json의 serverUrl
+  // (API 키와 페르소나는 서버에만 있으므로 브라우저에서는 초기화 요청이 필요 없다)
   useEffect(() => {
     fetch('config.json')
-      .then(response => response.json())
+      .then(response => response.ok ? response.json() : {})
+      .catch(() => ({}))
       .then(config => {
-        setApiKey(config.apiKey || '');
-        setConfigLoaded(true);
-        addLog('success', '✅ API 키를 config.json에서 로드했습니다');
+        const url = (config.serverUrl || '').replace(/\/$/, '');
+        setServerUrl(url);
+        return fetch(`${url}/health`).then(response => response.json());
+      })
+      .then(health => {
+        setConnected(true);
+        addLog('success', health.ready ? '✅ 서버 연결됨' : 'ℹ️ 서버 연결됨 (모델 로딩 중)', health);
       })
       .catch(error => {
-        console.error('config.json 로드 실패:', error);
-        setConfigLoaded(true);
-        addLog('error', '❌ config.json을 찾을 수 없습니다. API 키를 직접 입력하세요.', error.message);
-      });
+        addLog('error', '❌ 서버에 연결할 수 없습니다', error.message);
+      })
+      .finally(() => setConfigLoaded(true));
   }, []);
 
-  // 시스템 초기화 메시지 전송
-  useEffect(() => {
-    if (configLoaded && apiKey && !systemInitialized) {
-      initializeSystem();
-    }
-  }, [configLoaded, apiKey, systemInitialized]);
-
-  const initializeSystem = async () => {
-    try {
-      // prompt.txt 파일 읽기
-      const promptResponse = await fetch('prompt.txt');
-      const promptText = await promptResponse.text();
-
-      if (!promptText.trim()) {
-        addLog('info', 'ℹ️ prompt.txt가 비어있어 초기화를 건너뜁니다');
-        setSystemInitialized(true);
-        return;
-      }
-
-      addLog('info', '🔧 시스템 초기화 중...', { prompt: promptText });
-
-      const initMessage = {
-        role: "user",
-        content: promptText.trim()
-      };
-
-      const requestBody = {
-        model: "gpt-5-mini",
-        messages: [
-          {
-            role: "system",
-            content: "Answer in Korean"
-          },
-          initMessage
-        ]
-      };
-
-      const apiUrl = 'https://gms.ssafy.io/gmsapi/api.openai.com/v1/chat/completions';
-      const proxyUrl = `https://corsproxy.io/?${encodeURIComponent(apiUrl)}`;
-
-      const response = await fetch(proxyUrl, {
-        method: 'POST',
-        headers: {
-          'Content-Type': 'application/json',
-          'Authorization': `Bearer ${apiKey}`
-        },
-        body: JSON.stringify(requestBody)
-      });
-
-      const responseText = await response.text();
-      const data = JSON.parse(responseText);
-
-      if (response.ok && data.choices?.[0]?.message) {
-        // 초기화 메시지와 응답을 messages에 추가 (화면에는 표시되지 않음)
-        setMessages([
-          initMessage,
-          {
-            role: "assistant",
-            content: data.choices[0].message.content
-          }
-        ]);
-        addLog('success', '✅ 시스템 초기화 완료', { response: data.choices[0].message.content });
-      } else {
-        addLog('error', '❌ 시스템 초기화 실패', data);
-      }
-    } catch (error) {
-      addLog('error', '❌ 시스템 초기화 오류', error.message);
-    } finally {
-      setSystemInitialized(true);
-    }
-  };
-
   const addLog = (type, message, data = null) => {
     const timestamp = new Date().toLocaleTimeString('ko-KR');
     setLogs(prev => [...prev, { type, message, data, timestamp }]);
   };
 
-  const sendMessage = async () => {
-    if (!input.trim() || !apiKey.trim()) {
-      alert('API 키와 메시지를 모두 입력해주세요.');
-      return;
+  // 서버 SSE 스트림(/api/v1/chat/stream)을 읽어 이벤트별 콜백 호출
+  const streamChat = async (message, handlers) => {
+    const response = await fetch(`${serverUrl}/api/v1/chat/stream`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ message, session_id: getSessionId() })
+    });
+    if (!response.ok) {
+      throw new Error(`서버 오류: ${response.status}`);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+
+      let sep;
+      while ((sep = buffer.indexOf('\n\n')) >= 0) {
+        const block = buffer.slice(0, sep);
+        buffer = buffer.slice(sep + 2);
+        const event = (block.match(/^event: (.*)$/m) || [])[1];
+        const data = (block.match(/^data: (.*)$/m) || [])[1];
+        if (event && data && handlers[event]) {
+          handlers[event](JSON.parse(data));
+        }
+      }
     }
+  };
 
+  const sendServerMessage = async () => {
     const userMessage = { role: "user", content: input };
     const updatedMessages = [...messages, userMessage];
-    setMessages(updatedMessages);
+    setMessages([...updatedMessages, { role: "assistant", content: '' }]);
     setInput('');
     setLoading(true);
+    addLog('info', '📤 서버 스트리밍 요청 시작', { url: `${serverUrl}/api/v1/chat/stream`, message: userMessage.content });
 
-    const requestBody = {
-      model: "gpt-5-mini",
-      messages: [
-        {
-          role: "system",
-          content: "Answer in Korean"
-        },
-        ...updatedMessages
-      ]
+    const startedAt = performance.now();
+    let content = '';
+    const updateAssistant = (text) => {
+      setMessages([...updatedMessages, { role: "assistant", content: text }]);
     };
 
-    const apiUrl = 'https://gms.ssafy.io/gmsapi/api.openai.com/v1/chat/completions';
-    const proxyUrl = `https://corsproxy.io/?${encodeURIComponent(apiUrl)}`;
-    const targetUrl = proxyUrl;
-
-    addLog('info', '📤 API 요청 시작', {
-      url: targetUrl,
-      originalUrl: apiUrl,
-      usingProxy: true,
-      method: 'POST',
-      headers: {
-        'Content-Type': 'application/json',
-        'Authorization': `Bearer ${apiKey.substring(0, 10)}...`
-      },
-      body: requestBody
-    });
-
     try {
-      const response = await fetch(targetUrl, {
-        method: 'POST',
-        headers: {
-          'Content-Type': 'application/json',
-          'Authorization': `Bearer ${apiKey}`
+      await streamChat(userMessage.content, {
+        command: (command) => addLog('success', `🤖 AGV 명령 전송: ${command}`, {
+          command,
+          elapsedMs: Math.round(performance.now() - startedAt)
+        }),
+        token: (delta) => {
+          content += delta;
+          updateAssistant(content);
         },
-        body: JSON.stringify(requestBody)
-      });
-
-      addLog('info', `📥 응답 상태: ${response.status} ${response.statusText}`, {
-        status: response.status,
-        statusText: response.statusText,
-        headers: Object.fromEntries(response.headers.entries())
+        done: (result) => {
+          updateAssistant(result.response);
+          addLog('success', '✅ 응답 완료', result);
+        },
+        error: (result) => {
+          updateAssistant(result.response);
+          addLog('error', '❌ 서버 처리 오류', result);
+        }
       });
-
-      const responseText = await response.text();
-      addLog('info', '📄 원본 응답 텍스트', responseText);
-
-      let data;
-      try {
-        data = JSON.parse(responseText);
-        addLog('success', '✅ JSON 파싱 성공', data);
-      } catch (parseError) {
-        addLog('error', '❌ JSON 파싱 실패', { error: parseError.message, responseText });
-        throw new Error(`JSON 파싱 실패: ${parseError.message}`);
-      }
-
-      if (!response.ok) {
-        addLog('error', '❌ API 오류 응답', data);
-        throw new Error(`API 오류: ${response.status} - ${data.error?.message || JSON.stringify(data)}`);
-      }
-
-      if (!data.choices || !data.choices[0] || !data.choices[0].message) {
-        addLog('error', '❌ 응답 구조 오류', { message: '예상하지 못한 응답 구조', data });
-        throw new Error('응답에 choices 데이터가 없습니다');
-      }
-
-      const assistantMessage = {
-        role: "assistant",
-        content: data.choices[0].message.content
-      };
-
-      setMessages([...updatedMessages, assistantMessage]);
-      addLog('success', '✅ 메시지 추가 완료', assistantMessage);
     } catch (error) {
-      console.error('Error:', error);
-      
-      if (error.name === 'TypeError' && error.message.includes('fetch')) {
-        addLog('error', '❌ 네트워크 오류 (CORS or 연결 실패)', {
-          error: error.message,
-          type: error.name,
-          possibleCauses: [
-            'CORS 정책 위반 (서버에서 브라우저 요청 차단)',
-            '잘못된 URL',
-            '네트워크 연결 문제',
-            '서버가 응답하지 않음'
-          ]
-        });
-      } else {
-        addLog('error', `❌ 오류 발생: ${error.message}`, {
-          name: error.name,
-          message: error.message,
-          stack: error.stack
-        });
-      }
-      
+      addLog('error', `❌ 오류 발생: ${error.message}`, { name: error.name, message: error.message });
       alert(`오류가 발생했습니다: ${error.message}\n\n로그 탭에서 자세한 내용을 확인하세요.`);
     } finally {
       setLoading(false);
     }
   };
 
+  const sendMessage = async () => {
+    if (input.trim()) {
+      await sendServerMessage();
+    }
+  };
+
   const clearLogs = () => {
     setLogs([]);
   };
@@ -248,20 +157,20 @@ function App() {
               'div',
               { className: 'flex items-center gap-4' },
               
-              // API 키 상태 아이콘
+              // 서버 연결 상태 아이콘
               configLoaded && (
-                apiKey && apiKey !== 'YOUR_API_KEY_HERE'
+                connected
                   ? React.createElement(
                       'div',
                       { className: 'flex items-center gap-2 bg-green-500 px-3 py-1 rounded-lg' },
                       React.createElement('span', { className: 'text-lg' }, '✓'),
-                      React.createElement('span', { className: 'text-sm font-semibold' }, 'API 연결됨')
+                      React.createElement('span', { className: 'text-sm font-semibold' }, '서버 연결됨')
                     )
                   : React.createElement(
                       'div',
                       { className: 'flex items-center gap-2 bg-red-500 px-3 py-1 rounded-lg' },
                       React.createElement('span', { className: 'text-lg' }, '✕'),
-                      React.createElement('span', { className: 'text-sm font-semibold' }, 'API 미연결')
+                      React.createElement('span', { className: 'text-sm font-semibold' }, '서버 미연결')
                     )
               ),
               
@@ -285,7 +194,7 @@ function App() {
           React.createElement(
             'div',
             { className: 'flex-1 overflow-y-auto p-6 space-y-4' },
-            messages.filter((msg, idx) => idx >= 2).length === 0
+            messages.length === 0
               ? React.createElement(
                   'div',
                   { className: 'text-center text-gray-400 mt-20' },
@@ -296,7 +205,7 @@ function App() {
                     '이전 대화 내용이 다음 질문에 반영됩니다.'
                   )
                 )
-              : messages.filter((msg, idx) => idx >= 2).map((msg, idx) =>
+              : messages.map((msg, idx) =>
                   React.createElement(
                     'div',
                     {
@@ -425,16 +334,6 @@ function App() {
         React.createElement(
           'div',
           { className: 'p-6 bg-gray-50 border-t' },
-          !systemInitialized &&
-            React.createElement(
-              'div',
-              { className: 'mb-3 p-3 bg-yellow-50 border border-yellow-200 rounded-lg text-center' },
-              React.createElement(
-                'p',
-                { className: 'text-sm text-yellow-800' },
-                '⏳ 시스템 초기화 중... 잠시만 기다려주세요'
-              )
-            ),
           React.createElement(
             'div',
             { className: 'flex gap-2' },
@@ -442,16 +341,16 @@ function App() {
               type: 'text',
               value: input,
               onChange: (e) => setInput(e.target.value),
-              onKeyPress: (e) => e.key === 'Enter' && !loading && systemInitialized && sendMessage(),
-              placeholder: systemInitialized ? '메시지를 입력하세요...' : '시스템 초기화 중...',
-              disabled: loading || !systemInitialized,
+              onKeyPress: (e) => e.key === 'Enter' && !loading && sendMessage(),
+              placeholder: '메시지를 입력하세요...',
+              disabled: loading,
               className: 'flex-1 px-4 py-3 border border-gray-300 rounded-lg focus:ring-2 focus:ring-indigo-500 focus:border-transparent disabled:bg-gray-100 disabled:cursor-not-allowed'
             }),
             React.createElement(
               'button',
               {
                 onClick: sendMessage,
-                disabled: loading || !input.trim() || !apiKey.trim() || !systemInitialized,
+                disabled: loading || !input.trim(),
                 className: 'px-6 py-3 bg-indigo-600 text-white rounded-lg hover:bg-indigo-700 disabled:bg-gray-300 disabled:cursor-not-allowed flex items-center gap-2 font-semibold'
               },
               '📤 전송'
@@ -0,0 +1,172 @@
+import collections
+import threading
+import time
+
+import control.movement as move
+
+MOTIONS = {
+    "forward": move.move_forward,
+    "backward": move.move_backward,
+    "left": move.turn_left,
+    "right": move.turn_right,
+    "drive": move.drive,
+}
+
+
+class MotionCommand:
+    def __init__(self, cmd, val=None, duration=None, seq=None, ts=None, job=None):
+        self.cmd = cmd
+        self.val = val
+        self.duration = duration
+        self.seq = seq
+        self.ts = ts
+        self.job = job  # 서버 fleet 작업 id (텔레메트리로 되돌려 보낸다)
+        self.received = time.monotonic()
+
+
+class MotionExecutor:
+    """
+    모션 전용 실행 스레드.
+    MQTT 네트워크 스레드는 submit()으로 명령만 넘기고 바로 반환한다.
+    새 명령(기본)이나 stop은 진행 중인 모션을 즉시 중단시킨다.
+    """
+
+    def __init__(self, robot, max_age=1.0):
+        self.robot = robot
+        self.max_age = max_age  # ts가 있는 명령의 최대 허용 지연 (초)
+        self.last_seq = None
+        self.last_command = None
+        self.rejected = None  # 실행할 수 없어 거부한 마지막 명령
+        self.current = None
+
+        self._queue = collections.deque()
+        self._cond = threading.Condition()
+        self._cancel = threading.Event()   # 선점 또는 정지로 현재 모션 취소
+        self._stopped = threading.Event()  # 정지로 취소됨 (모션이 스스로 모터를 멈춰야 함)
+        self._running = True
+
+        self.stats = {
+            "received": 0,
+            "executed": 0,
+            "preempted": 0,
+            "stale": 0,
+            "rejected": 0,
+            "latency_last_ms": 0.0,
+            "latency_avg_ms": 0.0,
+            "latency_max_ms": 0.0,
+        }
+
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, command, preempt=True):
+        """명령 등록. 오래되었거나 순서가 뒤바뀐 명령은 버리고 False 반환"""
+        self.stats["received"] += 1
+        if self._is_stale(command):
+            self.stats["stale"] += 1
+            print(f"Drop stale command: {command.cmd} (seq={command.seq})")
+            return False
+        if command.seq is not None:
+            self.last_seq = command.seq
+        self.last_command = command
+
+        if command.cmd == "stop":
+            self.stop()
+            self._record_latency(command)
+            return True
+
+        with self._cond:
+            if preempt:
+                if self._queue or self.current is not None:
+                    self.stats["preempted"] += 1
+                self._queue.clear()
+                self._cancel.set()
+            self._queue.append(command)
+            self._cond.notify()
+        return True
+
+    def reject(self, command):
+        """실행할 동작이 없는 명령(drink 등) 기록. 진행 중인 모션은 건드리지 않는다"""
+        self.stats["received"] += 1
+        self.stats["rejected"] += 1
+        self.last_command = command
+        self.rejected = command
+
+    def stop(self):
+        """대기 명령을 모두 지우고 현재 모션을 즉시 중단"""
+        with self._cond:
+            if self._queue or self.current is not None:
+                self.stats["preempted"] += 1
+            self._queue.clear()
+            # 모션이 cancel을 보고 stopped를 확인하므로 stopped를 먼저 set
+            self._stopped.set()
+            self._cancel.set()
+        move.stop_robot(self.robot)
+
+    def close(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        self.stop()
+        self._thread.join(timeout=1.0)
+
+    @property
+    def state(self):
+        # rejected: 마지막 명령을 거부함 (서버는 이 상태와 job으로 작업을 바로 해제한다)
+        if self.current is not None or self._queue:
+            return "busy"
+        last = self.last_command
+        return "rejected" if last is not None and last is self.rejected else "idle"
+
+    @property
+    def queue_depth(self):
+        return len(self._queue)
+
+    def _is_stale(self, command):
+        if command.seq is not None and self.last_seq is not None and command.seq <= self.last_seq:
+            return True
+        if command.ts is not None and time.time() - command.ts > self.max_age:
+            return True
+        return False
+
+    def _record_latency(self, command):
+        ms = (time.monotonic() - command.received) * 1000.0
+        n = self.stats["executed"] = self.stats["executed"] + 1
+        self.stats["latency_last_ms"] = ms
+        self.stats["latency_avg_ms"] += (ms - self.stats["latency_avg_ms"]) / n
+        self.stats["latency_max_ms"] = max(self.stats["latency_max_ms"], ms)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._running and not self._queue:
+                    self._cond.wait()
+                if not self._running:
+                    return
+                command = self._queue.popleft()
+                self._cancel.clear()
+                self._stopped.clear()
+                self.current = command
+
+            motion = MOTIONS.get(command.cmd)
+            try:
+                if motion is None:
+                    # 선점된 모션의 모터 값이 남아 있으므로 정지시킨다
+                    print(f"Unknown command: {command.cmd}")
+                    self.rejected = command
+                    self.stats["rejected"] += 1
+                    move.stop_robot(self.robot)
+                    continue
+                kwargs = {"cancel": self._cancel, "stopped": self._stopped}
+                if command.val is not None:
+                    kwargs["speed"] = command.val
+                if command.duration is not None:
+                    kwargs["duration"] = command.duration
+                # 모터 값 설정 직전까지를 명령->모터 지연으로 기록
+                self._record_latency(command)
+                motion(self.robot, **kwargs)
+            except Exception as e:
+                print(f"Error executing command: {e}")
+                move.stop_robot(self.robot)
+            finally:
+                self.current = None
@@ -0,0 +1,31 @@
+import time
+
+
+class FakeMotor:
+    def __init__(self):
+        self._value = 0.0
+        self.history = []  # (monotonic 시각, 값)
+
+    @property
+    def value(self):
+        return self._value
+
+    @value.setter
+    def value(self, v):
+        self._value = v
+        self.history.append((time.monotonic(), v))
+
+
+class FakeRobot:
+    """jetbot.Robot 대체용. 모터 값 변경 시각을 기록해 명령->모터 지연 측정에 사용"""
+
+    def __init__(self):
+        self.left_motor = FakeMotor()
+        self.right_motor = FakeMotor()
+
+    def set_motors(self, left, right):
+        self.left_motor.value = left
+        self.right_motor.value = right
+
+    def stop(self):
+        self.set_motors(0.0, 0.0)
@@ -1,33 +1,46 @@
-from jetbot import Robot
 import time
 
-def move_forward(robot, speed=0.5, duration=1):
-    robot.left_motor.value = speed
-    robot.right_motor.value = speed
-    
-    time.sleep(duration)
-    robot.stop()
+def _drive(robot, left, right, duration, cancel=None, stopped=None):
+    # cancel(threading.Event)이 주어지면 set() 시 즉시 중단
+    # stopped(threading.Event)는 선점이 아니라 정지로 취소된 경우에 set 된다
+    if cancel is not None and cancel.is_set():
+        # 시작 전에 취소됨: 모터 값을 쓰지 않는다
+        if stopped is not None and stopped.is_set():
+            robot.stop()
+        return
 
-def move_backward(robot, speed=0.5, duration=1):
-    robot.left_motor.value = -speed
-    robot.right_motor.value = -speed
-    
-    time.sleep(duration)
-    robot.stop()
+    robot.left_motor.value = left
+    robot.right_motor.value = right
 
-def turn_left(robot, speed=0.3, duration=2):
-    robot.left_motor.value = -speed
-    robot.right_motor.value = speed
-    
-    time.sleep(duration)
+    if cancel is None:
+        time.sleep(duration)
+    elif cancel.wait(duration):
+        # 선점된 경우 다음 명령이 모터 값을 이어받는다.
+        # 정지된 경우 executor.stop()의 정지 뒤에 모터 값을 썼을 수 있으므로 여기서 다시 정지
+        if stopped is not None and stopped.is_set():
+            robot.stop()
+        return
     robot.stop()
 
-def turn_right(robot, speed=0.3, duration=2):
-    robot.left_motor.value = speed
-    robot.right_motor.value = -speed
-    
-    time.sleep(duration)
-    robot.stop()
+def move_forward(robot, speed=0.5, duration=1, cancel=None, stopped=None):
+    _drive(robot, speed, speed, duration, cancel, stopped)
+
+def move_backward(robot, speed=0.5, duration=1, cancel=None, stopped=None):
+    _drive(robot, -speed, -speed, duration, cancel, stopped)
+
+def turn_left(robot, speed=0.3, duration=2, cancel=None, stopped=None):
+    _drive(robot, -speed, speed, duration, cancel, stopped)
+
+def turn_right(robot, speed=0.3, duration=2, cancel=None, stopped=None):
+    _drive(robot, speed, -speed, duration, cancel, stopped)
+
+def drive(robot, speed=(0.0, 0.0), duration=0.3, cancel=None, stopped=None):
+    # 연속 제어: (left, right) 속도를 유지, duration 안에 다음 명령이 없으면 정지 (watchdog)
+    # 모터 값을 바꾸기 전에 검증한다 (잘못된 값이면 호출 쪽이 정지시킨다)
+    if not isinstance(speed, (list, tuple)) or len(speed) != 2:
+        raise ValueError("drive speed must be (left, right), got {!r}".format(speed))
+    left, right = (float(v) for v in speed)
+    _drive(robot, left, right, duration, cancel, stopped)
 
 def stop_robot(robot):
-    robot.stop()
\ No newline at end of file
+    robot.stop()
@@ -1,40 +1,47 @@
 import asyncio
 import time
 import json
-from jetbot import Robot
 
 # Import custom modules
 from mqtt.client import MqttWorker
+from mqtt.telemetry import TelemetryPublisher
 import control.movement as move
+from control.executor import MotionCommand, MotionExecutor
 # import control.arm as arm
 # import control.camera as cam
 
+ROBOT_ID = "1"
+BROKER_IP = "172.20.10.14"
+TELEMETRY_HZ = 10
+TELEMETRY_ENCODING = "struct"  # json | struct | msgpack
+
 robot = None
+executor = None
 
 # 1. Define logic to handle received commands
 def process_command(command_str):
-    global robot
-    
+    # Runs in the MQTT network thread: parse and hand off to the executor only
     try:
         # Assuming the message is JSON string
         data = json.loads(command_str)
-        cmd = data.get("cmd")
-        val = data.get("val", 0.5) # Default speed
+        cmd = data.get("cmd") or data.get("command")
+        command = MotionCommand(
+            cmd,
+            val=data.get("val"),
+            duration=data.get("duration"),
+            seq=data.get("seq"),
+            ts=data.get("ts"),
+            job=data.get("job"),
+        )
 
-        if cmd == "forward":
-            move.move_forward(robot, val)
-        elif cmd == "backward":
-            move.move_backward(robot, val)
-        elif cmd == "left":
-            move.turn_left(robot, val)
-        elif cmd == "right":
-            move.turn_right(robot, val)
-        elif cmd == "stop":
-            move.stop_robot(robot)
+        if cmd == "stop" or cmd in ("forward", "backward", "left", "right", "drive"):
+            executor.submit(command, preempt=not data.get("queue", False))
 #         elif cmd == "grab":
 #             arm.grab_object()
         else:
+            # Not a motion: report it as rejected (with its job id) so the server can release the job
             print(f"Unknown command: {cmd}")
+            executor.reject(command)
 
     except json.JSONDecodeError:
         print("Not a JSON message")
@@ -45,24 +52,29 @@ def process_command(command_str):
 # 2. Setup and Main Loop
 def main():
     
-    global robot
+    # jetbot 라이브러리는 실제 로봇에서만 필요 (process_command는 FakeRobot으로도 동작)
+    from jetbot import Robot
+
+    global robot, executor
     robot = Robot()
+    executor = MotionExecutor(robot)
     
     # Initialize MQTT
-    worker = MqttWorker()
-    worker.connect_broker("172.20.10.14") 
+    worker = MqttWorker(command_topic="AGV/CMD/{}".format(ROBOT_ID))
+    worker.connect_broker(BROKER_IP) 
     
     # Register the command processing function
     worker.set_callback(process_command)
 
+    # Send Status periodically (AGV/STATUS/<id>)
+    telemetry = TelemetryPublisher(worker, ROBOT_ID, robot, executor,
+                                   rate_hz=TELEMETRY_HZ, encoding=TELEMETRY_ENCODING)
+    telemetry.start()
+
     print("System Ready. Waiting for commands...")
 
     try:
         while True:
-            # Send Status periodically
-            status = {"status": "alive", "timestamp": time.time()}
-            #worker.publish_data("jetbot/status", status)
-            
             time.sleep(2)
 
 #     except asyncio.CancelledError:
@@ -70,7 +82,9 @@ def main():
     except KeyboardInterrupt:
         print("Shutting down...")
     finally:
-        move.stop_robot()
+        telemetry.stop()
+        executor.close()
+        move.stop_robot(robot)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
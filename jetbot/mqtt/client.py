@@ -2,9 +2,10 @@ import paho.mqtt.client as mqtt
 import json
 
 class MqttWorker:
-    def __init__(self):
+    def __init__(self, command_topic="AGV/CMD/1"):
         # Using Callback API V2 to avoid warnings
         self.client = mqtt.Client(protocol=mqtt.MQTTv311)
+        self.command_topic = command_topic
         self.client.on_connect = self.on_connect
         self.client.on_message = self.on_message
         self.message_callback = None 
@@ -13,7 +14,7 @@ class MqttWorker:
         if rc == 0:
             print("MQTT Connected successfully")
             # Auto subscribe to control topic upon connection
-            client.subscribe("jetbot/status")
+            client.subscribe(self.command_topic, qos=1)
         else:
             print(f"Connection failed with code {rc}")
 
@@ -34,14 +35,16 @@ class MqttWorker:
         except Exception as e:
             print(f"Connection Error: {e}")
 
-    def publish_data(self, topic, data):
-        # Can handle both string and dictionary (JSON)
+    def publish_data(self, topic, data, qos=0):
+        # Can handle string, bytes (binary frames) and dictionary (JSON)
         if isinstance(data, dict):
             payload = json.dumps(data)
+        elif isinstance(data, (bytes, bytearray)):
+            payload = data
         else:
             payload = str(data)
             
-        info = self.client.publish(topic, payload)
+        info = self.client.publish(topic, payload, qos=qos)
         if info.rc != mqtt.MQTT_ERR_SUCCESS:
             print("Failed to publish")
 
@@ -0,0 +1,100 @@
+import json
+import struct
+import threading
+import time
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# 바이너리 상태 프레임 (42 bytes, little-endian)
+# magic, version, seq, timestamp, left, right, state, last_cmd, last_seq, loop_ms, cmd_latency_ms, queue_depth, job
+# 서버 server/util/telemetry.py 와 동일한 레이아웃을 유지해야 한다
+FRAME = struct.Struct("<BBIdffBBIffHI")
+MAGIC = 0xA7
+VERSION = 2
+NO_SEQ = 0xFFFFFFFF
+
+STATES = ("idle", "busy", "stopped", "rejected")
+COMMANDS = (None, "forward", "backward", "left", "right", "stop", "grab", "drink", "no")
+
+
+def encode(frame, encoding="json"):
+    if encoding == "struct":
+        last_seq = frame["last_seq"]
+        job = frame.get("job")
+        return FRAME.pack(
+            MAGIC, VERSION, frame["seq"] & 0xFFFFFFFF, frame["timestamp"],
+            frame["left"], frame["right"],
+            STATES.index(frame["state"]) if frame["state"] in STATES else 0,
+            COMMANDS.index(frame["last_command"]) if frame["last_command"] in COMMANDS else 0,
+            NO_SEQ if last_seq is None else last_seq & 0xFFFFFFFF,
+            frame["loop_ms"], frame["cmd_latency_ms"], min(frame["queue_depth"], 0xFFFF),
+            NO_SEQ if job is None else job & 0xFFFFFFFF,
+        )
+    if encoding == "msgpack" and msgpack is not None:
+        return msgpack.packb(frame)
+    return json.dumps(frame, separators=(",", ":"))
+
+
+class TelemetryPublisher:
+    """주기적으로 로봇 상태 프레임을 AGV/STATUS/<robot_id>로 전송"""
+
+    def __init__(self, worker, robot_id, robot, executor=None, rate_hz=10.0, encoding="json"):
+        self.worker = worker
+        self.topic = "AGV/STATUS/{}".format(robot_id)
+        self.robot = robot
+        self.executor = executor
+        self.period = 1.0 / rate_hz
+        self.encoding = encoding
+        self.seq = 0
+        self.loop_ms = 0.0
+        self._running = False
+        self._thread = None
+
+    def build_frame(self):
+        executor = self.executor
+        last = executor.last_command if executor else None
+        return {
+            "seq": self.seq,
+            "timestamp": time.time(),
+            "left": float(self.robot.left_motor.value),
+            "right": float(self.robot.right_motor.value),
+            "state": executor.state if executor else "idle",
+            "last_command": last.cmd if last else None,
+            "last_seq": last.seq if last else None,
+            "job": last.job if last else None,
+            "loop_ms": self.loop_ms,
+            "cmd_latency_ms": executor.stats["latency_last_ms"] if executor else 0.0,
+            "queue_depth": executor.queue_depth if executor else 0,
+        }
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        if self._thread:
+            self._thread.join(timeout=1.0)
+
+    def _run(self):
+        next_t = time.monotonic()
+        while self._running:
+            t0 = time.monotonic()
+            try:
+                self.worker.publish_data(self.topic, encode(self.build_frame(), self.encoding), qos=0)
+                self.seq += 1
+            except Exception as e:
+                print(f"Telemetry Error: {e}")
+            self.loop_ms = (time.monotonic() - t0) * 1000.0
+
+            # 고정 주기 유지 (밀렸으면 다음 주기로 건너뜀)
+            next_t += self.period
+            delay = next_t - time.monotonic()
+            if delay < 0:
+                next_t = time.monotonic()
+                delay = 0
+            time.sleep(delay)
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# jetbot 모듈은 jetbot 디렉토리 기준으로 import 한다 (control.*, mqtt.*)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
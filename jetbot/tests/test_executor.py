@@ -0,0 +1,105 @@
+import time
+
+import control.executor as executor_module
+import control.movement as move
+from control.executor import MotionCommand, MotionExecutor
+from control.fake_robot import FakeMotor, FakeRobot
+
+
+class HookMotor(FakeMotor):
+    """값을 쓰기 직전에 hook을 한 번 호출하는 모터"""
+
+    def __init__(self):
+        super().__init__()
+        self.hook = None
+
+    @FakeMotor.value.setter
+    def value(self, v):
+        hook, self.hook = self.hook, None
+        if hook is not None:
+            hook()
+        FakeMotor.value.fset(self, v)
+
+
+def wait_idle(executor, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while executor.state != "idle" and time.monotonic() < deadline:
+        time.sleep(0.005)
+    # current는 모션 함수가 반환된 뒤에 지워진다
+    time.sleep(0.02)
+
+
+def motors(robot):
+    return robot.left_motor.value, robot.right_motor.value
+
+
+def test_stop_after_pop_before_motion_starts(monkeypatch):
+    """_run이 명령을 꺼낸 뒤, 모션이 시작되기 전에 stop()이 들어온 경우"""
+    robot = FakeRobot()
+    executor = MotionExecutor(robot)
+
+    def forward(robot, **kwargs):
+        executor.stop()
+        move.move_forward(robot, **kwargs)
+
+    monkeypatch.setitem(executor_module.MOTIONS, "forward", forward)
+    try:
+        executor.submit(MotionCommand("forward", duration=5))
+        wait_idle(executor)
+        assert motors(robot) == (0.0, 0.0)
+        assert executor.state == "idle"
+    finally:
+        executor.close()
+
+
+def test_stop_lands_while_motion_writes_motors():
+    """stop()의 robot.stop()이 모션의 모터 쓰기 사이에 끼어든 경우에도 로봇이 멈춰야 한다"""
+    robot = FakeRobot()
+    robot.left_motor = HookMotor()
+    executor = MotionExecutor(robot)
+    robot.left_motor.hook = executor.stop
+    try:
+        start = time.monotonic()
+        executor.submit(MotionCommand("forward", duration=5))
+        wait_idle(executor)
+        assert time.monotonic() - start < 1.0
+        assert motors(robot) == (0.0, 0.0)
+    finally:
+        executor.close()
+
+
+def test_preempt_hands_motors_to_next_command():
+    """선점은 정지가 아니다: 다음 명령이 모터 값을 이어받고 중간에 0으로 떨어지지 않는다"""
+    robot = FakeRobot()
+    executor = MotionExecutor(robot)
+    try:
+        executor.submit(MotionCommand("forward", val=0.5, duration=5))
+        time.sleep(0.05)
+        executor.submit(MotionCommand("drive", val=[0.3, 0.3], duration=0.1))
+        wait_idle(executor)
+        values = [v for _, v in robot.left_motor.history]
+        assert values == [0.5, 0.3, 0.0]
+        assert executor.stats["preempted"] == 1
+    finally:
+        executor.close()
+
+
+def test_rejected_command_is_reported_with_its_job():
+    from mqtt.telemetry import FRAME, STATES, TelemetryPublisher, encode
+
+    robot = FakeRobot()
+    executor = MotionExecutor(robot)
+    try:
+        executor.reject(MotionCommand("drink", job=7))
+        assert executor.state == "rejected"
+        frame = TelemetryPublisher(None, "1", robot, executor).build_frame()
+        assert frame["state"] == "rejected" and frame["last_command"] == "drink" and frame["job"] == 7
+        fields = FRAME.unpack(encode(frame, "struct"))
+        assert STATES[fields[6]] == "rejected" and fields[-1] == 7
+
+        # 다음 모션 명령이 오면 rejected 상태는 사라진다
+        executor.submit(MotionCommand("drive", val=[0.2, 0.2], duration=0.05))
+        wait_idle(executor)
+        assert executor.state == "idle"
+    finally:
+        executor.close()
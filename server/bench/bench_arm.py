@@ -0,0 +1,91 @@
+"""
+팔 집기 사이클 벤치마크 (명령 지연을 모델링한 가짜 서보 버스)
+
+    direct_block_ms         기존 방식: control 스레드에서 서보 명령을 하나씩 보낼 때 막히는 시간
+    submit_us               ArmScheduler.run() 호출 비용 (control 스레드가 막히는 시간)
+    grab_cold_ms            home 자세에서 집기 자세 도달까지
+    grab_prepositioned_ms   정렬 중 pre_grab으로 미리 옮겨 둔 뒤 집기 자세 도달까지
+    grab_batched_ms         버스가 syncAngleCtrl로 한 번에 받는 경우 (pre_grab 이후)
+
+실행 (server 디렉토리에서):
+    python -m bench.bench_arm --latency 0.004
+"""
+import argparse
+import time
+
+from sim.world import SimArm
+from util.arm import POSES, ArmScheduler
+
+
+class SyncArm(SimArm):
+    """여러 서보 명령을 한 번의 전송(SYNC WRITE)으로 받는 버스"""
+
+    def syncAngleCtrl(self, commands):
+        if self.latency:
+            time.sleep(self.latency)
+        for servo_id, angle, _, _ in commands:
+            self.calls.append((servo_id, angle))
+
+
+def median(values):
+    values = sorted(values)
+    return values[len(values) // 2]
+
+
+def grab_time(arm, start_pose):
+    """start_pose에서 집기 자세 도달까지 걸린 시간 (ms)"""
+    arm.move("home", preempt=True).result()
+    if start_pose != "home":
+        arm.move(start_pose).result()
+    t0 = time.perf_counter()
+    arm.run([(0.0, "grab")]).result()
+    return (time.perf_counter() - t0) * 1000.0
+
+
+def run(trials=5, latency=0.004):
+    bus = SimArm(latency=latency)
+    grab = POSES["grab"]
+    t0 = time.perf_counter()
+    for servo_id, (angle, speed) in grab.items():
+        bus.servoAngleCtrl(servo_id, angle, 1, speed)
+    direct_block_ms = (time.perf_counter() - t0) * 1000.0
+
+    arm = ArmScheduler(SimArm(latency=latency))
+    arm.move("home").result()
+    submits = []
+    for _ in range(trials):
+        t0 = time.perf_counter()
+        future = arm.run([(0.0, "pre_grab")])
+        submits.append((time.perf_counter() - t0) * 1e6)
+        future.result()
+        arm.move("home").result()
+
+    cold = [grab_time(arm, "home") for _ in range(trials)]
+    warm = [grab_time(arm, "pre_grab") for _ in range(trials)]
+
+    synced = ArmScheduler(SyncArm(latency=latency))
+    batched = [grab_time(synced, "pre_grab") for _ in range(trials)]
+
+    return {
+        "direct_block_ms": round(direct_block_ms, 2),
+        "submit_us": round(median(submits), 1),
+        "grab_cold_ms": round(median(cold), 1),
+        "grab_prepositioned_ms": round(median(warm), 1),
+        "grab_batched_ms": round(median(batched), 1),
+        "bus_writes": arm.stats["writes"],
+        "bus_skipped": arm.stats["skipped"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--trials", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.004, help="서보 명령 1회 전송 시간 (초)")
+    args = parser.parse_args()
+
+    for name, value in run(args.trials, args.latency).items():
+        print(f"{name:24s} {value}")
+
+
+if __name__ == "__main__":
+    main()
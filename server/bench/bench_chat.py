@@ -0,0 +1,153 @@
+"""
+/api/v1/chat/ 엔드투엔드 지연 벤치마크 (LLM 호출은 지연을 설정할 수 있는 스텁으로 대체)
+
+측정 구간: HTTP 요청 -> 라우터 -> LLMService(캐시/합류/디스패치) -> 응답 직렬화
+    miss   : 매번 다른 질문 (스텁 LLM 호출)
+    hit    : 같은 질문 반복 (응답 캐시)
+    stream : /stream 의 첫 command 이벤트까지의 시간
+    session: 한 세션에서 긴 대화를 이어갈 때 요청별 프롬프트 토큰/지연 (처음 10턴 vs 마지막 10턴)
+
+실행 (server 디렉토리에서):
+    python -m bench.bench_chat --requests 200 --delay 0.05
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import time
+import types
+
+from schemas.chat_schema import Result
+
+REPLY = "[잔채우기 프로세스 가동] 잔이 비었네요... 바로 채워드릴게요!"
+
+
+class StubChain:
+    """LangChain 체인 대체. delay 초 후 고정 응답"""
+
+    def __init__(self, delay):
+        self.delay = delay
+
+    async def ainvoke(self, inputs):
+        await asyncio.sleep(self.delay)
+        return Result(response=REPLY, command="drink")
+
+
+class StubSummaryLLM:
+    """세션 요약 LLM 대체. 새 턴의 앞부분만 이어 붙인 요약을 돌려준다"""
+
+    def __init__(self, delay):
+        self.delay = delay
+
+    async def ainvoke(self, messages):
+        await asyncio.sleep(self.delay)
+        return types.SimpleNamespace(content=messages[-1][1][-400:], usage_metadata=None)
+
+
+class StubStreamChain(StubChain):
+    """부분 dict 스트림 대체. command가 먼저, response는 여러 조각으로 나뉘어 도착"""
+
+    def __init__(self, delay, chunks=8):
+        super().__init__(delay)
+        self.chunks = chunks
+
+    async def astream(self, inputs):
+        step = self.delay / (self.chunks + 1)
+        await asyncio.sleep(step)
+        yield {"command": "drink"}
+        for i in range(1, self.chunks + 1):
+            await asyncio.sleep(step)
+            yield {"command": "drink", "response": REPLY[:len(REPLY) * i // self.chunks]}
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+async def _run(requests, delay, concurrency, turns):
+    import httpx
+    from fastapi import FastAPI
+
+    from router import llm
+    from services.llm_router import ChainProvider, LLMRouter
+
+    llm.llm_service.router = LLMRouter([ChainProvider("stub", StubChain(delay), StubStreamChain(delay))], hedge=False)
+    llm.llm_service.summary_llm = StubSummaryLLM(delay)
+    app = FastAPI()
+    app.include_router(llm.router)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def post(message):
+            async with semaphore:
+                t0 = time.perf_counter()
+                response = await client.post("/api/v1/chat/", json={"message": message})
+                response.raise_for_status()
+                return (time.perf_counter() - t0) * 1000.0
+
+        async def first_command(message):
+            async with semaphore:
+                t0 = time.perf_counter()
+                async with client.stream("POST", "/api/v1/chat/stream", json={"message": message}) as response:
+                    async for line in response.aiter_lines():
+                        if line == "event: command":
+                            return (time.perf_counter() - t0) * 1000.0
+                return float("nan")
+
+        miss = await asyncio.gather(*(post(f"bench miss {i}") for i in range(requests)))
+        await post("bench hit")
+        hit = await asyncio.gather(*(post("bench hit") for _ in range(requests)))
+        stream = await asyncio.gather(*(first_command(f"bench stream {i}") for i in range(requests)))
+
+        # 한 세션에서 순차 대화: 질문마다 다른 문장이라 매번 LLM(스텁) 호출
+        session = []
+        for i in range(max(turns, 20)):
+            t0 = time.perf_counter()
+            response = await client.post("/api/v1/chat/", json={
+                "message": f"bench session {i}: 잔이 비었어요 한 잔 더 채워 주세요",
+                "session_id": "bench-session",
+            })
+            response.raise_for_status()
+            usage = response.json()["usage"]
+            session.append(((time.perf_counter() - t0) * 1000.0, usage.get("prompt_tokens", 0)))
+
+    delay_ms = delay * 1000.0
+    return {
+        "miss_p50_ms": round(percentile(miss, 0.5), 2),
+        "miss_p95_ms": round(percentile(miss, 0.95), 2),
+        "miss_overhead_ms": round(percentile(miss, 0.5) - delay_ms, 2),
+        "hit_p50_ms": round(percentile(hit, 0.5), 2),
+        "hit_p95_ms": round(percentile(hit, 0.95), 2),
+        "stream_first_command_p50_ms": round(percentile(stream, 0.5), 2),
+        "session_first10_prompt_tokens": round(sum(t for _, t in session[:10]) / 10, 1),
+        "session_last10_prompt_tokens": round(sum(t for _, t in session[-10:]) / 10, 1),
+        "session_first10_ms": round(sum(ms for ms, _ in session[:10]) / 10, 2),
+        "session_last10_ms": round(sum(ms for ms, _ in session[-10:]) / 10, 2),
+    }
+
+
+def run(requests=200, delay=0.05, concurrency=8, turns=100):
+    # 응답/전송 로그는 측정에서 제외
+    with contextlib.redirect_stdout(io.StringIO()):
+        return asyncio.run(_run(requests, delay, concurrency, turns))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--delay", type=float, default=0.05, help="스텁 LLM 응답 지연 (초)")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--turns", type=int, default=100, help="session 시나리오 대화 턴 수")
+    args = parser.parse_args()
+
+    for name, value in run(args.requests, args.delay, args.concurrency, args.turns).items():
+        print(f"{name:28s} {value}")
+
+
+if __name__ == "__main__":
+    main()
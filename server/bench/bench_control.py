@@ -0,0 +1,170 @@
+"""
+펄스 이동(pulse) vs 연속 PID 제어(servo) 시뮬레이션 벤치마크
+
+차동 구동 로봇과 핀홀 카메라를 가상 시간으로 시뮬레이션하고
+select_target()으로 실제 서비스와 같은 IoU / 크기 비율 / 중심 오프셋을 계산한다.
+집기 조건(ROI IoU >= 0.7)을 만족할 때까지의 시간과 제어 반복 횟수를 비교한다.
+
+실행 (server 디렉토리에서):
+    python -m bench.bench_control --trials 50
+"""
+import argparse
+import math
+import random
+
+import numpy as np
+
+from sim.world import CAM_DROP, FOCAL, FRAME, MAX_WHEEL, OBJ_H, OBJ_W, WHEEL_BASE
+from util.control import VisualServoController
+from util.detection import select_target
+
+MOTOR_TAU = 0.05              # 모터 응답 시정수 (s)
+ROI = (130, FRAME - 140, 170, FRAME - 80)
+
+
+class SimRobot:
+    def __init__(self, distance, bearing):
+        # 물체는 원점, 로봇은 물체를 바라보는 방향에서 bearing 만큼 틀어진 자세로 시작
+        self.x = -distance
+        self.y = 0.0
+        self.theta = bearing
+        self.cmd = (0.0, 0.0)
+        self.wheels = [0.0, 0.0]
+        self.until = None
+
+    def set_motors(self, left, right, duration=None, now=0.0):
+        self.cmd = (left, right)
+        self.until = None if duration is None else now + duration
+
+    def step(self, dt, now):
+        if self.until is not None and now >= self.until:
+            self.cmd = (0.0, 0.0)
+            self.until = None
+        a = dt / (MOTOR_TAU + dt)
+        for i in range(2):
+            self.wheels[i] += a * (self.cmd[i] - self.wheels[i])
+        vl, vr = (w * MAX_WHEEL for w in self.wheels)
+        v = (vl + vr) / 2.0
+        self.theta += (vr - vl) / WHEEL_BASE * dt
+        self.x += v * math.cos(self.theta) * dt
+        self.y += v * math.sin(self.theta) * dt
+
+    def observe(self, rng, noise_px):
+        dx, dy = -self.x, -self.y
+        d = math.hypot(dx, dy)
+        # 오른쪽이 양수인 상대 방위
+        err = self.theta - math.atan2(dy, dx)
+        phi = math.atan2(math.sin(err), math.cos(err))
+        if d < 0.05 or abs(phi) > math.radians(40):
+            return None
+        cx = FRAME / 2 + FOCAL * math.tan(phi) + rng.gauss(0, noise_px)
+        cy = FRAME / 2 + FOCAL * CAM_DROP / d + rng.gauss(0, noise_px)
+        w = FOCAL * OBJ_W / d
+        h = FOCAL * OBJ_H / d
+        return np.array([[cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2, 0.9, 0]], dtype=np.float32)
+
+
+def pulse_policy(robot, best, now, state):
+    """AGVService._act 펄스 모드와 같은 규칙"""
+    if best is None:
+        robot.set_motors(0.0, 0.0)
+        return False
+    if now - state.get("last_move_t", -1.0) < 0.5:
+        return False
+    _, _, _, iou, size_ratio, center_offset = best
+    if size_ratio < 0.85:
+        robot.set_motors(0.25, 0.25, 0.10, now)
+    elif size_ratio > 1.15:
+        robot.set_motors(-0.25, -0.25, 0.10, now)
+    elif center_offset > 0:
+        robot.set_motors(0.22, -0.22, 0.08, now)
+    else:
+        robot.set_motors(-0.22, 0.22, 0.08, now)
+    state["last_move_t"] = now
+    return True
+
+
+def servo_policy(robot, best, now, state):
+    """AGVService._act_servo와 같은 규칙 (watchdog 0.3 s)"""
+    controller = state.setdefault("controller", VisualServoController(frame_width=FRAME))
+    dt = now - state.get("last_t", now)
+    state["last_t"] = now
+    if best is None:
+        controller.reset()
+        robot.set_motors(0.0, 0.0)
+        return False
+    _, _, _, iou, size_ratio, center_offset = best
+    left, right, aligned = controller.update(center_offset, size_ratio, dt)
+    if aligned and left == 0.0 and right == 0.0:
+        robot.set_motors(0.0, 0.0)
+        return False
+    robot.set_motors(left, right, 0.3, now)
+    return True
+
+
+POLICIES = {"pulse": pulse_policy, "servo": servo_policy}
+
+
+def trial(policy, distance, bearing, rng, fps=30.0, timeout=30.0, noise_px=1.0, iou_threshold=0.7):
+    robot = SimRobot(distance, bearing)
+    state = {}
+    dt = 1.0 / fps
+    now = 0.0
+    iterations = 0
+    while now < timeout:
+        best = select_target(robot.observe(rng, noise_px), ROI)
+        if best is not None and best[3] >= iou_threshold:
+            return now, iterations
+        if POLICIES[policy](robot, best, now, state):
+            iterations += 1
+        robot.step(dt, now)
+        now += dt
+    return None, iterations
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+def run(trials=50, seed=0, fps=30.0, noise_px=1.0):
+    results = {}
+    for policy in POLICIES:
+        rng = random.Random(seed)
+        times, iters, failures = [], [], 0
+        for _ in range(trials):
+            distance = rng.uniform(0.3, 0.8)
+            bearing = math.radians(rng.uniform(-25, 25))
+            t, n = trial(policy, distance, bearing, rng, fps=fps, noise_px=noise_px)
+            if t is None:
+                failures += 1
+            else:
+                times.append(t)
+                iters.append(n)
+        results[policy] = {
+            "success": trials - failures,
+            "time_to_grab_p50_s": round(percentile(times, 0.5), 2),
+            "time_to_grab_p95_s": round(percentile(times, 0.95), 2),
+            "iterations_avg": round(sum(iters) / len(iters), 1) if iters else 0.0,
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--trials", type=int, default=50)
+    parser.add_argument("--fps", type=float, default=30.0)
+    parser.add_argument("--noise", type=float, default=1.0, help="bbox 좌표 노이즈 (px)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    for policy, stats in run(args.trials, args.seed, args.fps, args.noise).items():
+        print(f"[{policy}]")
+        for name, value in stats.items():
+            print(f"  {name:22s} {value}")
+
+
+if __name__ == "__main__":
+    main()
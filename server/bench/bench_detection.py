@@ -0,0 +1,99 @@
+"""
+탐지 후처리 마이크로 벤치마크: YOLOv5 출력 디코딩 + NMS, 기존 per-box 경로 vs 벡터화 scorer
+
+실행 (server 디렉토리에서):
+    python -m bench.bench_detection --boxes 50 --frames 8
+"""
+import argparse
+import time
+
+import numpy as np
+
+from services.detector import Detector
+from util.detection import bbox_iou_xyxy, score_candidates, select_target, select_targets, to_targets
+
+ROI = (130, 160, 170, 220)
+
+
+def make_predictions(n_boxes, seed=0, size=300):
+    rng = np.random.default_rng(seed)
+    xy = rng.uniform(0, size - 60, (n_boxes, 2))
+    wh = rng.uniform(10, 60, (n_boxes, 2))
+    conf = rng.uniform(0.2, 1.0, (n_boxes, 1))
+    cls = rng.integers(0, 3, (n_boxes, 1))
+    return np.hstack([xy, xy + wh, conf, cls]).astype(np.float32)
+
+
+def make_raw_output(anchors=6300, classes=3, seed=0, size=320):
+    """imgsz 320 YOLOv5 raw 출력 (1, anchors, 5 + nc). 대부분 낮은 objectness"""
+    rng = np.random.default_rng(seed)
+    out = np.empty((1, anchors, 5 + classes), dtype=np.float32)
+    out[0, :, :2] = rng.uniform(0, size, (anchors, 2))
+    out[0, :, 2:4] = rng.uniform(8, 80, (anchors, 2))
+    out[0, :, 4] = rng.beta(0.5, 8.0, anchors)
+    out[0, :, 5:] = rng.uniform(0, 1, (anchors, classes))
+    return out
+
+
+def legacy_select(pred, roi, conf_threshold=0.5):
+    """기존 AGVService._control_loop의 per-box 처리 경로"""
+    if pred is None or len(pred) == 0:
+        return None
+    keep = pred[:, 4] >= conf_threshold
+    if not bool(keep.any()):
+        return None
+    cand = pred[keep]
+    idx = int(np.argmax(cand[:, 4]))
+    x1, y1, x2, y2, conf, cls = cand[idx].tolist()
+    bbox = (int(x1), int(y1), int(x2), int(y2))
+    iou = bbox_iou_xyxy(bbox, roi)
+    bbox_area = max(1, (bbox[2] - bbox[0])) * max(1, (bbox[3] - bbox[1]))
+    roi_area = max(1, (roi[2] - roi[0])) * max(1, (roi[3] - roi[1]))
+    return bbox, float(conf), int(cls), iou, bbox_area / roi_area
+
+
+def timeit(fn, repeat):
+    fn()
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - t0) / repeat * 1e6
+
+
+def run(boxes=50, frames=8, repeat=2000, device=None):
+    preds = [make_predictions(boxes, seed=i) for i in range(frames)]
+    if device:
+        import torch
+        preds = [torch.from_numpy(p).to(device) for p in preds]
+        legacy_preds = [p.cpu().numpy() for p in preds]
+    else:
+        legacy_preds = preds
+
+    decoder = Detector("bench")
+    raw = make_raw_output()
+    results = {
+        "postprocess_us": timeit(lambda: decoder._postprocess(raw, 1.0, (0, 0)), max(1, repeat // 10)),
+        "legacy_per_frame_us": timeit(lambda: [legacy_select(p, ROI) for p in legacy_preds], repeat) / frames,
+        "vectorized_per_frame_us": timeit(lambda: [select_target(p, ROI) for p in preds], repeat) / frames,
+        # select_target의 단일 프레임 경로 없이 전체 scorer를 한 프레임에 쓸 때
+        "scored_per_frame_us": timeit(lambda: [to_targets(score_candidates(p, ROI))[0] for p in preds],
+                                      repeat) / frames,
+        "vectorized_batch_per_frame_us": timeit(lambda: select_targets(preds, ROI), repeat) / frames,
+    }
+    return {k: round(v, 2) for k, v in results.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--boxes", type=int, default=50)
+    parser.add_argument("--frames", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=2000)
+    parser.add_argument("--device", default=None, help="torch 디바이스 (예: cpu, cuda). 미지정 시 numpy")
+    args = parser.parse_args()
+
+    for name, value in run(args.boxes, args.frames, args.repeat, args.device).items():
+        print(f"{name:32s} {value:10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+FleetService 디스패처 시뮬레이션 벤치마크 (MQTT 없이 가상 시간으로 실행)
+
+실행 (server 디렉토리에서):
+    python -m bench.bench_fleet --robots 40 --requests 500
+"""
+import argparse
+import heapq
+import random
+import time
+
+from services.fleet_service import FleetService
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+def run(robots=40, requests=500, arrival_rate=8.0, service_time=4.0, policy="idlest", seed=0):
+    rng = random.Random(seed)
+    fleet = FleetService(policy=policy, job_timeout=1e9)
+    for i in range(robots):
+        fleet.register(i, position=(rng.uniform(0, 20), rng.uniform(0, 20)), now=0.0)
+
+    # 이벤트: (시각, 종류, 데이터)
+    events = []
+    t = 0.0
+    for _ in range(requests):
+        t += rng.expovariate(arrival_rate)
+        heapq.heappush(events, (t, 0, None))
+
+    now = 0.0
+    dispatch_time = 0.0
+    busy_since = {}
+    while events:
+        now, kind, data = heapq.heappop(events)
+        t0 = time.perf_counter()
+        if kind == 0:
+            fleet.submit("drink", priority=rng.randint(0, 2), deadline=120.0,
+                         location=(rng.uniform(0, 20), rng.uniform(0, 20)), now=now)
+        else:
+            fleet.complete(data, now=now)
+        dispatch_time += time.perf_counter() - t0
+
+        # 새로 할당된 로봇의 완료 이벤트 예약
+        for robot in fleet.robots.values():
+            if robot.job is not None and busy_since.get(robot.id) is not robot.job:
+                busy_since[robot.id] = robot.job
+                heapq.heappush(events, (now + rng.expovariate(1.0 / service_time), 1, robot.id))
+
+    waits = list(fleet.wait_times)
+    return {
+        "robots": robots,
+        "requests": requests,
+        "assigned": fleet.stats["assigned"],
+        "expired": fleet.stats["expired"],
+        "sim_throughput_per_s": round(fleet.stats["completed"] / now, 2) if now else 0.0,
+        "dispatch_ops_per_s": round((requests + fleet.stats["completed"]) / dispatch_time),
+        "wait_p50_s": round(percentile(waits, 0.5), 3),
+        "wait_p95_s": round(percentile(waits, 0.95), 3),
+        "wait_p99_s": round(percentile(waits, 0.99), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--robots", type=int, default=40)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--rate", type=float, default=8.0, help="초당 요청 도착률")
+    parser.add_argument("--service", type=float, default=4.0, help="평균 작업 시간 (초)")
+    parser.add_argument("--policy", default="idlest", choices=["idlest", "nearest"])
+    args = parser.parse_args()
+
+    for name, value in run(args.robots, args.requests, args.rate, args.service, args.policy).items():
+        print(f"{name:24s} {value}")
+
+
+if __name__ == "__main__":
+    main()
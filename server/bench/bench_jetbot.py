@@ -0,0 +1,82 @@
+"""
+JetBot process_command 디스패치 지연 벤치마크 (FakeRobot 사용)
+
+MQTT 콜백 스레드가 process_command()에서 머무는 시간과
+명령 수신 -> 모터 값 설정까지의 지연을 측정한다.
+
+실행 (server 디렉토리에서):
+    python -m bench.bench_jetbot --commands 500
+"""
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import sys
+import time
+
+JETBOT_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "jetbot")
+
+
+def load_jetbot_main():
+    """jetbot/main.py를 server/main.py와 겹치지 않는 이름으로 불러온다"""
+    path = os.path.abspath(JETBOT_DIR)
+    if path not in sys.path:
+        sys.path.insert(0, path)
+    spec = importlib.util.spec_from_file_location("jetbot_main", os.path.join(path, "main.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+def run(commands=500, interval=0.002):
+    jetbot = load_jetbot_main()
+    from control.executor import MotionExecutor
+    from control.fake_robot import FakeRobot
+
+    robot = FakeRobot()
+    jetbot.executor = MotionExecutor(robot)
+    actions = ["forward", "left", "backward", "right"]
+
+    call_us = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(commands):
+            message = json.dumps({"cmd": actions[i % 4], "val": 0.2, "duration": 0.05,
+                                  "seq": i, "ts": time.time()})
+            t0 = time.perf_counter()
+            jetbot.process_command(message)
+            call_us.append((time.perf_counter() - t0) * 1e6)
+            time.sleep(interval)
+        jetbot.executor.close()
+
+    stats = jetbot.executor.stats
+    return {
+        "dispatch_p50_us": round(percentile(call_us, 0.5), 1),
+        "dispatch_p99_us": round(percentile(call_us, 0.99), 1),
+        "cmd_to_motor_avg_ms": round(stats["latency_avg_ms"], 3),
+        "cmd_to_motor_max_ms": round(stats["latency_max_ms"], 3),
+        "executed": stats["executed"],
+        "preempted": stats["preempted"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--commands", type=int, default=500)
+    parser.add_argument("--interval", type=float, default=0.002, help="명령 간격 (초)")
+    args = parser.parse_args()
+
+    for name, value in run(args.commands, args.interval).items():
+        print(f"{name:24s} {value}")
+
+
+if __name__ == "__main__":
+    main()
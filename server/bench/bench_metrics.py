@@ -0,0 +1,61 @@
+"""
+메트릭 계측 오버헤드 벤치마크 (핫패스에 상시 켜 둘 수 있는지 확인)
+
+실행 (server 디렉토리에서):
+    python -m bench.bench_metrics
+"""
+import argparse
+import time
+
+from util.metrics import Registry
+from util.profiler import SamplingProfiler
+
+
+def timeit(fn, repeat):
+    fn()
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - t0) / repeat * 1e6
+
+
+def run(repeat=200000):
+    registry = Registry()
+    counter = registry.counter("bench_total", "bench")
+    labeled = registry.counter("bench_labeled_total", "bench", ["action"])
+    histogram = registry.histogram("bench_seconds", "bench", ["stage"])
+    child = histogram.labels("inference")
+    for action in ("forward", "backward", "left", "right", "grap"):
+        labeled.labels(action).inc()
+
+    def workload():
+        # AGV 제어 루프 1회 분량의 순수 파이썬 연산
+        return sum(i * i for i in range(200))
+
+    base = timeit(workload, repeat // 10)
+    profiler = SamplingProfiler(interval=0.005)
+    profiler.start()
+    profiled = timeit(workload, repeat // 10)
+    profiler.stop()
+
+    return {
+        "counter_inc_us": round(timeit(counter.inc, repeat), 3),
+        "labeled_inc_us": round(timeit(lambda: labeled.labels("forward").inc(), repeat), 3),
+        "histogram_observe_us": round(timeit(lambda: child.observe(0.012), repeat), 3),
+        "labeled_observe_us": round(timeit(lambda: histogram.labels("inference").observe(0.012), repeat), 3),
+        "render_us": round(timeit(registry.render, max(1, repeat // 100)), 1),
+        "profiler_overhead_ratio": round(profiled / base - 1.0, 4),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=200000)
+    args = parser.parse_args()
+
+    for name, value in run(args.repeat).items():
+        print(f"{name:26s} {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+MQTTService 퍼블리시 처리량 벤치마크
+
+기본은 브로커 없이 PUBACK을 흉내내는 가짜 클라이언트를 사용하고,
+--broker를 주면 실제 브로커(예: 로컬 mosquitto)로 전송한다.
+
+실행 (server 디렉토리에서):
+    python -m bench.bench_mqtt --messages 5000
+    python -m bench.bench_mqtt --broker 127.0.0.1
+"""
+import argparse
+import collections
+import contextlib
+import io
+import threading
+import time
+from concurrent.futures import wait
+
+import paho.mqtt.client as mqtt
+
+from services.mqtt_service import MQTTService
+
+
+class FakeClient:
+    """paho Client 대체. 별도 스레드가 ack_delay 후 on_publish를 호출한다."""
+
+    class Info:
+        def __init__(self, mid):
+            self.mid = mid
+            self.rc = mqtt.MQTT_ERR_SUCCESS
+
+    def __init__(self, ack_delay=0.0):
+        self.ack_delay = ack_delay
+        self.on_connect = self.on_disconnect = self.on_publish = self.on_message = None
+        self._mid = 0
+        self._acks = collections.deque()
+        self._cond = threading.Condition()
+        self._running = False
+        self._thread = None
+
+    def reconnect_delay_set(self, min_delay=1, max_delay=120):
+        pass
+
+    def connect_async(self, host, port=1883, keepalive=60):
+        pass
+
+    def loop_start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+        self.on_connect(self, None, None, 0, None)
+
+    def loop_stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        self._thread.join(timeout=1.0)
+
+    def disconnect(self):
+        pass
+
+    def subscribe(self, topic, qos=0):
+        pass
+
+    def publish(self, topic, payload=None, qos=0):
+        with self._cond:
+            self._mid += 1
+            mid = self._mid
+            if qos:
+                self._acks.append((time.perf_counter() + self.ack_delay, mid))
+                self._cond.notify()
+        return self.Info(mid)
+
+    def _loop(self):
+        with self._cond:
+            while self._running:
+                if not self._acks:
+                    self._cond.wait()
+                    continue
+                due, mid = self._acks[0]
+                remaining = due - time.perf_counter()
+                if remaining > 0:
+                    self._cond.wait(remaining)
+                    continue
+                self._acks.popleft()
+                self._cond.release()
+                try:
+                    self.on_publish(self, None, mid, 0, None)
+                finally:
+                    self._cond.acquire()
+
+
+def run(messages=5000, qos=1, ack_delay=0.0, broker=None, max_queue=None):
+    client = None if broker else FakeClient(ack_delay)
+    service = MQTTService(broker_ip=broker, max_queue=max_queue or messages, client=client)
+
+    # publish()의 [SEND] 로그는 터미널 속도에 좌우되므로 버린다
+    with contextlib.redirect_stdout(io.StringIO()):
+        service.connect()
+        deadline = time.monotonic() + 5.0
+        while not service.connected and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        t0 = time.perf_counter()
+        futures = [service.publish(f"bench/{i % 8}", {"command": "forward", "seq": i}, qos=qos)
+                   for i in range(messages)]
+        t_enqueue = time.perf_counter() - t0
+        done, pending = wait(futures, timeout=30.0)
+        elapsed = time.perf_counter() - t0
+        service.disconnect()
+
+    acked = sum(1 for f in done if f.result())
+    latency = service.latency.snapshot()
+    return {
+        "messages": messages,
+        "acked": acked,
+        "enqueue_us_per_msg": round(t_enqueue / messages * 1e6, 2),
+        "throughput_per_s": round(acked / elapsed),
+        "ack_latency_avg_ms": latency["avg_ms"],
+        "ack_latency_max_ms": latency["max_ms"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=5000)
+    parser.add_argument("--qos", type=int, default=1, choices=[0, 1])
+    parser.add_argument("--ack-delay", type=float, default=0.0, help="가짜 브로커 PUBACK 지연 (초)")
+    parser.add_argument("--broker", help="실제 브로커 주소 (미지정 시 가짜 클라이언트)")
+    args = parser.parse_args()
+
+    for name, value in run(args.messages, args.qos, args.ack_delay, args.broker).items():
+        print(f"{name:22s} {value}")
+
+
+if __name__ == "__main__":
+    main()
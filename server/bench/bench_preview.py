@@ -0,0 +1,122 @@
+"""
+미리보기 시청자 수가 제어 루프에 주는 영향 벤치마크
+
+시뮬레이션 AGV(servo 모드)를 돌리면서 /agv/stream 시청자를 0, 1, 10, 50명으로 늘려
+제어 루프 주기와 end-to-end 지연, 미리보기 인코딩 횟수를 비교한다.
+인코딩은 시청자 수와 무관하게 한 번만 일어나야 하고, 제어 주기는 시청자 0명과 같아야 한다.
+cv2가 없으면 zlib 압축으로 JPEG 인코딩 비용을 대신한다.
+
+실행 (server 디렉토리에서):
+    python -m bench.bench_preview --duration 5 --viewers 0 1 10 50
+"""
+import argparse
+import asyncio
+import threading
+import time
+import zlib
+
+from services.preview_service import PreviewService
+from sim.harness import build
+
+
+def _zlib_encode(image, quality):
+    # 품질이 높을수록 느린 압축 레벨 (JPEG 품질 대용)
+    return zlib.compress(image.tobytes(), max(1, min(9, quality // 10)))
+
+
+def _copy_annotate(image, annotation):
+    return image.copy()
+
+
+def make_preview():
+    try:
+        import cv2  # noqa: F401
+        return PreviewService()
+    except ImportError:
+        return PreviewService(encode=_zlib_encode, annotate=_copy_annotate)
+
+
+class Viewers:
+    """별도 스레드의 이벤트 루프에서 n명의 시청자가 미리보기를 소비"""
+
+    def __init__(self, preview, n):
+        self.preview = preview
+        self.n = n
+        self.received = 0
+        self.bytes = 0
+        self._loop = asyncio.new_event_loop()
+        self._tasks = []
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+
+    async def _watch(self):
+        async for _, jpeg in self.preview.frames():
+            self.received += 1
+            self.bytes += len(jpeg)
+
+    def start(self):
+        self._thread.start()
+        for _ in range(self.n):
+            self._tasks.append(asyncio.run_coroutine_threadsafe(self._watch(), self._loop))
+
+    def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        time.sleep(0.05)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=1.0)
+
+
+def measure(viewers, duration):
+    agv, _, _ = build(control_mode="servo")
+    agv.preview = make_preview()
+    watchers = Viewers(agv.preview, viewers)
+    watchers.start()
+    agv.start(wait=True)
+    try:
+        time.sleep(duration)
+    finally:
+        report = agv.latency_report()
+        agv.stop(wait=True)
+        agv.motor.close()
+        watchers.stop()
+        agv.preview.stop()
+
+    preview = report["preview"]
+    return {
+        "control_hz": report["end_to_end"]["rate_hz"],
+        "end_to_end_avg_ms": report["end_to_end"]["avg_ms"],
+        "end_to_end_max_ms": report["end_to_end"]["max_ms"],
+        "actuation_avg_ms": report["actuation"]["avg_ms"],
+        "encoded": preview["encoded"],
+        "encode_avg_ms": preview["encode_avg_ms"],
+        "quality": preview["quality"],
+        "delivered": watchers.received,
+    }
+
+
+def run(duration=5.0, viewers=(0, 1, 10, 50)):
+    results = {f"viewers_{n}": measure(n, duration) for n in viewers}
+    base = results[f"viewers_{viewers[0]}"]["control_hz"]
+    worst = min(r["control_hz"] for r in results.values())
+    results["control_hz_worst_ratio"] = round(worst / base, 3) if base else 0.0
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--viewers", type=int, nargs="+", default=[0, 1, 10, 50])
+    args = parser.parse_args()
+
+    results = run(args.duration, tuple(args.viewers))
+    print(f"{'viewers':>8s} {'ctrl_hz':>8s} {'e2e_avg':>8s} {'e2e_max':>8s} {'encoded':>8s} "
+          f"{'enc_ms':>7s} {'quality':>7s} {'delivered':>9s}")
+    for n in args.viewers:
+        r = results[f"viewers_{n}"]
+        print(f"{n:8d} {r['control_hz']:8.1f} {r['end_to_end_avg_ms']:8.2f} {r['end_to_end_max_ms']:8.2f} "
+              f"{r['encoded']:8d} {r['encode_avg_ms']:7.2f} {r['quality']:7d} {r['delivered']:9d}")
+    print(f"worst/baseline control rate: {results['control_hz_worst_ratio']}")
+
+
+if __name__ == "__main__":
+    main()
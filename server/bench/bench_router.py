@@ -0,0 +1,177 @@
+"""
+LLM 라우터 벤치마크 (지연 분포/실패율을 설정할 수 있는 스텁 provider)
+
+시나리오:
+    single   : 꼬리 지연이 있는 provider 하나, hedge 없음 (기존 동작)
+    hedged   : 같은 1순위 + 2순위 provider, p95 기준 hedge
+    failover : 1순위가 fail_rate 비율로 실패 -> 2순위로 넘김
+    outage   : 모든 provider가 deadline보다 느림 -> 규칙 기반 응답, deadline 준수 여부
+
+--server 를 주면 in-process 스텁 대신 bench.stub_llm 서버를 띄우고
+실제 ChatOpenAI 체인(OpenAI 호환 base_url)으로 hedged 시나리오를 한 번 더 잰다.
+
+실행 (server 디렉토리에서):
+    python -m bench.bench_router --requests 200
+    python -m bench.bench_router --requests 100 --server
+"""
+import argparse
+import asyncio
+import random
+
+from schemas.chat_schema import Result
+from services.llm_router import ChainProvider, LLMRouter
+
+REPLY = "[잔채우기 프로세스 가동] 잔이 비었네요... 바로 채워드릴게요!"
+
+
+class StubChain:
+    """delay 초 후 응답. tail_rate 비율로 tail_delay, fail_rate 비율로 예외"""
+
+    def __init__(self, delay, tail_rate=0.0, tail_delay=0.0, fail_rate=0.0, seed=0):
+        self.delay = delay
+        self.tail_rate = tail_rate
+        self.tail_delay = tail_delay
+        self.fail_rate = fail_rate
+        self.rng = random.Random(seed)
+
+    async def ainvoke(self, inputs):
+        delay = self.tail_delay if self.rng.random() < self.tail_rate else self.delay
+        fail = self.rng.random() < self.fail_rate
+        await asyncio.sleep(delay)
+        if fail:
+            raise RuntimeError("stub provider failure")
+        return Result(response=REPLY, command="drink")
+
+    async def astream(self, inputs):
+        result = await self.ainvoke(inputs)
+        yield {"command": result.command}
+        yield {"command": result.command, "response": result.response}
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+async def measure(router, requests, concurrency=8):
+    """요청별 (지연, 응답 provider, 대체 사유) 수집"""
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(concurrency)
+    samples = []
+
+    async def one(i):
+        async with semaphore:
+            info = {}
+            t0 = loop.time()
+            await router.invoke({"question": f"잔 채워줘 {i}"}, info)
+            samples.append((loop.time() - t0, info["provider"], info["fallback"]))
+
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    latencies = [s[0] * 1000.0 for s in samples]
+    return {
+        "p50_ms": round(percentile(latencies, 0.5), 1),
+        "p99_ms": round(percentile(latencies, 0.99), 1),
+        "max_ms": round(max(latencies), 1),
+        "fallback_rate": round(sum(1 for s in samples if s[2]) / len(samples), 3),
+        "hedged": router.stats["hedged"],
+        "hedge_wins": router.stats["hedge_wins"],
+        "failovers": router.stats["failovers"],
+    }
+
+
+async def warm(router, requests=100):
+    """hedge 기준(p95)을 잡기 위한 예열. 통계는 초기화한다"""
+    await measure(router, requests)
+    for key in router.stats:
+        router.stats[key] = 0
+
+
+def stub_chains(delay, tail_rate=0.0, tail_delay=0.0, fail_rate=0.0, seed=0):
+    chain = StubChain(delay, tail_rate, tail_delay, fail_rate, seed)
+    return chain, chain
+
+
+async def _run(requests, delay, tail_rate, tail_delay, fail_rate, deadline):
+    results = {}
+
+    router = LLMRouter([ChainProvider("primary", *stub_chains(delay, tail_rate, tail_delay, seed=1))],
+                       deadline=deadline, hedge=False)
+    results["single"] = await measure(router, requests)
+
+    router = LLMRouter([
+        ChainProvider("primary", *stub_chains(delay, tail_rate, tail_delay, seed=1)),
+        ChainProvider("secondary", *stub_chains(delay * 1.5, tail_rate, tail_delay, seed=2)),
+    ], deadline=deadline)
+    await warm(router)
+    results["hedged"] = await measure(router, requests)
+
+    router = LLMRouter([
+        ChainProvider("primary", *stub_chains(delay, fail_rate=fail_rate, seed=3)),
+        ChainProvider("secondary", *stub_chains(delay * 1.5, seed=4)),
+    ], deadline=deadline, hedge=False)
+    results["failover"] = await measure(router, requests)
+
+    router = LLMRouter([
+        ChainProvider("primary", *stub_chains(deadline * 3)),
+        ChainProvider("secondary", *stub_chains(deadline * 3)),
+    ], deadline=deadline)
+    outage = await measure(router, min(requests, 20))
+    outage["deadline_ms"] = round(deadline * 1000.0, 1)
+    results["outage"] = outage
+    return results
+
+
+async def _run_server(requests, delay, tail_rate, tail_delay, deadline):
+    from langchain_core.prompts import ChatPromptTemplate
+    from langchain_openai import ChatOpenAI
+
+    from bench.stub_llm import Behaviour, StubLLMServer
+
+    server = StubLLMServer({
+        "primary": Behaviour(delay, 0.0, tail_rate, tail_delay),
+        "secondary": Behaviour(delay * 1.5, 0.0, tail_rate, tail_delay),
+    }, seed=1).start()
+    prompt = ChatPromptTemplate.from_messages([("human", "{question}")])
+
+    def provider(model):
+        llm = ChatOpenAI(model=model, base_url=server.url, api_key="stub", timeout=deadline, max_retries=0)
+        return ChainProvider(model, prompt | llm.with_structured_output(Result, include_raw=True))
+
+    try:
+        router = LLMRouter([provider("primary"), provider("secondary")], deadline=deadline)
+        await warm(router)
+        result = await measure(router, requests)
+        result["server_calls"] = sum(server.calls.values())
+        return result
+    finally:
+        server.stop()
+
+
+def run(requests=200, delay=0.05, tail_rate=0.02, tail_delay=1.0, fail_rate=0.3, deadline=2.0, server=False):
+    results = asyncio.run(_run(requests, delay, tail_rate, tail_delay, fail_rate, deadline))
+    if server:
+        results["server"] = asyncio.run(_run_server(requests, delay, tail_rate, tail_delay, deadline))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--delay", type=float, default=0.05, help="provider 기본 지연 (초)")
+    parser.add_argument("--tail-rate", type=float, default=0.02, help="꼬리 지연 비율 (hedge 분위수 1-q보다 작아야 의미가 있다)")
+    parser.add_argument("--tail-delay", type=float, default=1.0, help="꼬리 지연 (초)")
+    parser.add_argument("--fail-rate", type=float, default=0.3, help="failover 시나리오의 1순위 실패 비율")
+    parser.add_argument("--deadline", type=float, default=2.0, help="요청 제한 시간 (초)")
+    parser.add_argument("--server", action="store_true", help="스텁 HTTP 서버 + ChatOpenAI로도 측정")
+    args = parser.parse_args()
+
+    results = run(args.requests, args.delay, args.tail_rate, args.tail_delay, args.fail_rate,
+                  args.deadline, args.server)
+    for scenario, metrics in results.items():
+        print(f"[{scenario}]")
+        for name, value in metrics.items():
+            print(f"  {name:16s} {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""
+OpenAI 호환 스텁 LLM 서버 (느리거나 실패하는 provider 시뮬레이션)
+
+/v1/chat/completions 만 구현한다. 요청의 model 이름으로 동작을 고른다:
+    --model NAME:DELAY[:FAIL_RATE[:TAIL_RATE:TAIL_DELAY]]
+        DELAY      : 기본 응답 지연 (초)
+        FAIL_RATE  : 500 에러 비율
+        TAIL_RATE  : TAIL_DELAY 만큼 늦게 응답하는 비율 (꼬리 지연)
+
+응답 형식:
+    tools가 있으면 첫 번째 함수의 tool call, response_format이 있으면 JSON content,
+    그 외에는 일반 텍스트 (세션 요약 등). stream=true면 SSE 청크로 나눠 보낸다.
+
+실행 (server 디렉토리에서):
+    python -m bench.stub_llm --port 8900 --model fast:0.2 --model slow:0.5:0:0.2:6 --model broken:0.1:1
+    LLM_PROVIDERS="slow@http://127.0.0.1:8900/v1,fast@http://127.0.0.1:8900/v1" uvicorn main:app
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+REPLY = {"command": "drink", "response": "[잔채우기 프로세스 가동]\n잔이 비었네요... 바로 채워드릴게요!"}
+TEXT_REPLY = "사용자는 잔 채우기를 자주 요청함."
+
+
+class Behaviour:
+    def __init__(self, delay=0.2, fail_rate=0.0, tail_rate=0.0, tail_delay=0.0):
+        self.delay = delay
+        self.fail_rate = fail_rate
+        self.tail_rate = tail_rate
+        self.tail_delay = tail_delay
+
+    @classmethod
+    def parse(cls, spec):
+        name, *values = spec.split(":")
+        return name, cls(*(float(v) for v in values))
+
+    def latency(self, rng):
+        return self.tail_delay if rng.random() < self.tail_rate else self.delay
+
+
+class StubLLMServer:
+    """스레드에서 도는 스텁 서버. 모델별 호출/실패 횟수를 센다"""
+
+    def __init__(self, models, host="127.0.0.1", port=0, seed=0):
+        self.models = models
+        self.default = Behaviour()
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.calls = {}
+        self.failures = {}
+        self.disconnects = {}
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                try:
+                    server.handle(self, body)
+                except (BrokenPipeError, ConnectionResetError):
+                    # hedge에서 진 요청은 클라이언트가 먼저 끊는다
+                    server.count("disconnects", body.get("model", ""))
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def count(self, kind, model):
+        with self.lock:
+            counts = getattr(self, kind)
+            counts[model] = counts.get(model, 0) + 1
+
+    def handle(self, request, body):
+        model = body.get("model", "")
+        behaviour = self.models.get(model, self.default)
+        self.count("calls", model)
+        with self.lock:
+            fail = self.rng.random() < behaviour.fail_rate
+            delay = behaviour.latency(self.rng)
+        time.sleep(delay)
+        if fail:
+            self.count("failures", model)
+            self._send_json(request, 500, {"error": {"message": "stub failure", "type": "server_error"}})
+            return
+
+        tools = body.get("tools")
+        if tools:
+            message = {"role": "assistant", "content": None, "tool_calls": [{
+                "id": "call_stub", "type": "function",
+                "function": {"name": tools[0]["function"]["name"], "arguments": json.dumps(REPLY, ensure_ascii=False)},
+            }]}
+        elif body.get("response_format"):
+            message = {"role": "assistant", "content": json.dumps(REPLY, ensure_ascii=False)}
+        else:
+            message = {"role": "assistant", "content": TEXT_REPLY}
+
+        if body.get("stream"):
+            self._stream(request, model, message)
+            return
+        self._send_json(request, 200, {
+            "id": "chatcmpl-stub", "object": "chat.completion", "created": int(time.time()), "model": model,
+            "choices": [{"index": 0, "message": message, "finish_reason": "tool_calls" if tools else "stop"}],
+            "usage": {"prompt_tokens": 1200, "completion_tokens": 40, "total_tokens": 1240,
+                      "prompt_tokens_details": {"cached_tokens": 1024}},
+        })
+
+    def _send_json(self, request, status, payload):
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        request.send_response(status)
+        request.send_header("Content-Type", "application/json")
+        request.send_header("Content-Length", str(len(data)))
+        request.end_headers()
+        request.wfile.write(data)
+
+    def _stream(self, request, model, message):
+        request.send_response(200)
+        request.send_header("Content-Type", "text/event-stream")
+        request.send_header("Connection", "close")
+        request.end_headers()
+
+        def chunk(delta, finish=None):
+            payload = {"id": "chatcmpl-stub", "object": "chat.completion.chunk", "created": int(time.time()),
+                       "model": model, "choices": [{"index": 0, "delta": delta, "finish_reason": finish}]}
+            request.wfile.write(f"data: {json.dumps(payload, ensure_ascii=False)}\n\n".encode("utf-8"))
+            request.wfile.flush()
+
+        if message.get("tool_calls"):
+            call = message["tool_calls"][0]
+            arguments = call["function"]["arguments"]
+            chunk({"role": "assistant", "tool_calls": [{"index": 0, "id": call["id"], "type": "function",
+                                                        "function": {"name": call["function"]["name"], "arguments": ""}}]})
+            for i in range(0, len(arguments), 8):
+                chunk({"tool_calls": [{"index": 0, "function": {"arguments": arguments[i:i + 8]}}]})
+                time.sleep(0.005)
+            chunk({}, "tool_calls")
+        else:
+            content = message["content"]
+            for i in range(0, len(content), 8):
+                chunk({"role": "assistant", "content": content[i:i + 8]})
+                time.sleep(0.005)
+            chunk({}, "stop")
+        request.wfile.write(b"data: [DONE]\n\n")
+        request.close_connection = True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--model", action="append", default=[], help="NAME:DELAY[:FAIL_RATE[:TAIL_RATE:TAIL_DELAY]]")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    models = dict(Behaviour.parse(spec) for spec in args.model)
+    server = StubLLMServer(models, args.host, args.port, args.seed)
+    print(f"Stub LLM server on {server.url} models={sorted(models)}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+서버 핫패스 벤치마크 묶음 실행 + 회귀 비교
+
+각 벤치마크의 run() 결과를 하나의 JSON으로 저장하고,
+--compare로 이전 결과와 비교해 threshold 이상 나빠진 지표를 REGRESSION으로 표시한다.
+(회귀가 있으면 종료 코드 1)
+
+실행 (server 디렉토리에서):
+    python -m bench.suite --out bench-base.json
+    python -m bench.suite --out bench-new.json --compare bench-base.json
+    python -m bench.suite --only detection mqtt --quick
+"""
+import argparse
+import importlib
+import json
+import platform
+import subprocess
+import sys
+import time
+
+# 이름 -> (모듈, 기본 인자, --quick 인자)
+BENCHMARKS = {
+    "detection": ("bench.bench_detection", {}, {"repeat": 200}),
+    "chat": ("bench.bench_chat", {}, {"requests": 50, "turns": 40}),
+    "mqtt": ("bench.bench_mqtt", {}, {"messages": 1000}),
+    "jetbot": ("bench.bench_jetbot", {}, {"commands": 100}),
+    "fleet": ("bench.bench_fleet", {}, {"requests": 200}),
+    "control": ("bench.bench_control", {}, {"trials": 10}),
+    "metrics": ("bench.bench_metrics", {}, {"repeat": 20000}),
+    "preview": ("bench.bench_preview", {}, {"duration": 2.0}),
+    "arm": ("bench.bench_arm", {}, {"trials": 2}),
+    # 요청 수가 적으면 2% 꼬리 지연이 한 번도 안 나와 hedge가 측정되지 않으므로 비율을 올린다 (p95 분위수 미만 유지)
+    "router": ("bench.bench_router", {}, {"requests": 60, "tail_rate": 0.04}),
+}
+
+# 이름이 이 접미사로 끝나면 클수록 좋은 지표, 그 외 *_us/_ms/_s 는 작을수록 좋은 지표
+HIGHER_IS_BETTER = ("_per_s", "_hz", "success", "acked", "assigned", "executed")
+LOWER_IS_BETTER = ("_us", "_ms", "_s", "_msg")
+
+
+def direction(metric):
+    """1: 클수록 좋음, -1: 작을수록 좋음, 0: 비교하지 않음 (횟수 등)"""
+    if metric.endswith(HIGHER_IS_BETTER):
+        return 1
+    if metric.endswith(LOWER_IS_BETTER):
+        return -1
+    return 0
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"],
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def flatten(result, prefix=""):
+    flat = {}
+    for key, value in result.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, name + "."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+
+def run_suite(names, quick=False):
+    report = {
+        "meta": {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "quick": quick,
+        },
+        "results": {},
+        "skipped": {},
+    }
+    for name in names:
+        module_name, kwargs, quick_kwargs = BENCHMARKS[name]
+        print(f"== {name}", file=sys.stderr)
+        try:
+            module = importlib.import_module(module_name)
+        except ImportError as e:
+            # 선택 의존성(fastapi, torch 등)이 없는 환경에서는 건너뛴다
+            report["skipped"][name] = str(e)
+            print(f"   skipped: {e}", file=sys.stderr)
+            continue
+        t0 = time.perf_counter()
+        result = module.run(**{**kwargs, **(quick_kwargs if quick else {})})
+        report["results"][name] = flatten(result)
+        print(f"   done in {time.perf_counter() - t0:.1f}s", file=sys.stderr)
+    return report
+
+
+def compare(current, baseline, threshold):
+    """(벤치마크, 지표, 기준값, 현재값, 변화율, 회귀 여부) 목록"""
+    rows = []
+    for name, metrics in current["results"].items():
+        base_metrics = baseline.get("results", {}).get(name, {})
+        for metric, value in metrics.items():
+            base = base_metrics.get(metric)
+            sign = direction(metric)
+            if base is None or sign == 0:
+                continue
+            change = (value - base) / abs(base) if base else 0.0
+            regressed = -sign * change > threshold
+            rows.append((name, metric, base, value, change, regressed))
+    return rows
+
+
+def print_report(report):
+    for name, metrics in report["results"].items():
+        print(f"[{name}]")
+        for metric, value in metrics.items():
+            print(f"  {metric:32s} {value}")
+    for name, reason in report["skipped"].items():
+        print(f"[{name}] skipped ({reason})")
+
+
+def print_comparison(rows, threshold):
+    print(f"\n{'benchmark':10s} {'metric':32s} {'base':>12s} {'current':>12s} {'change':>8s}")
+    for name, metric, base, value, change, regressed in rows:
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{name:10s} {metric:32s} {base:12.4g} {value:12.4g} {change:+8.1%}{flag}")
+    regressions = sum(1 for row in rows if row[-1])
+    print(f"\n{regressions} regression(s) over {threshold:.0%} threshold")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), help="실행할 벤치마크")
+    parser.add_argument("--quick", action="store_true", help="반복 횟수를 줄여 빠르게 실행")
+    parser.add_argument("--out", help="결과 JSON 저장 경로")
+    parser.add_argument("--compare", help="비교할 기준 결과 JSON")
+    parser.add_argument("--threshold", type=float, default=0.20, help="회귀로 볼 변화율 (기본 20%%)")
+    args = parser.parse_args()
+
+    report = run_suite(args.only or list(BENCHMARKS), args.quick)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    print_report(report)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if print_comparison(compare(report, baseline, args.threshold), args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,93 @@
+import asyncio
+import os
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
-from router import llm, agv
+from fastapi.responses import JSONResponse, RedirectResponse
+from fastapi.staticfiles import StaticFiles
+from router import llm, agv, fleet, metrics
+
+# 웹 챗봇 클라이언트 (chatbot/). 같은 origin에서 제공하므로 브라우저는 /api/v1/chat/만 호출한다
+CHATBOT_DIR = os.getenv("CHATBOT_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "chatbot"))
+
+# 컴포넌트별 준비 상태: pending | loading | ready | error: ...
+readiness = {
+    "detector": "pending",
+    "llm": "pending",
+}
+
+
+async def _preload(name, load, is_ready):
+    readiness[name] = "loading"
+    try:
+        await asyncio.to_thread(load)
+        readiness[name] = "ready" if is_ready() else "error: load failed"
+    except Exception as e:
+        print(f"Preload [{name}] failed: {e}")
+        readiness[name] = f"error: {e}"
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 무거운 모델/클라이언트는 서버가 요청을 받기 시작한 뒤 백그라운드에서 로드
+    preload = asyncio.gather(
+        _preload("detector", agv.agv_service.load_model, lambda: agv.agv_service.is_ready),
+        _preload("llm", llm.llm_service.load, lambda: llm.llm_service.is_ready),
+    )
+    # 수집 시점 메트릭 콜백은 앱이 쓰는 서비스 인스턴스에만 연결한다
+    agv.agv_service.bind_metrics()
+    llm.llm_service.bind_metrics()
+    yield
+    preload.cancel()
+    await asyncio.to_thread(agv.agv_service.stop, True)
+    await asyncio.to_thread(agv.agv_service.preview.stop)
+    agv.agv_service.unbind_metrics()
+    llm.llm_service.unbind_metrics()
+    await llm.llm_service.aclose()
+
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 app.include_router(llm.router)
 app.include_router(agv.router)
+app.include_router(fleet.router)
+app.include_router(metrics.router)
 
 @app.get("/")
 async def root():
     return {"message": "Hello World"}
 
 
+@app.get("/chatbot", include_in_schema=False)
+async def chatbot_index():
+    return RedirectResponse("/chatbot/")
+
+
+@app.get("/chatbot/config.json", include_in_schema=False)
+async def chatbot_config():
+    """서버가 제공하는 클라이언트는 API 키 없이 같은 origin의 서버 모드로 동작한다"""
+    return {"serverUrl": ""}
+
+
+if os.path.isdir(CHATBOT_DIR):
+    app.mount("/chatbot", StaticFiles(directory=CHATBOT_DIR, html=True), name="chatbot")
+
+
 @app.get("/health")
 async def health():
-    return {"status": "ok"}
\ No newline at end of file
+    """liveness: 프로세스가 응답하면 ok. 준비 상태는 ready 필드로 별도 제공"""
+    return {
+        "status": "ok",
+        "ready": all(state == "ready" for state in readiness.values()),
+        "components": readiness,
+    }
+
+
+@app.get("/health/ready")
+async def ready():
+    """readiness: 모든 컴포넌트가 로드되기 전까지 503"""
+    is_ready = all(state == "ready" for state in readiness.values())
+    return JSONResponse(
+        status_code=200 if is_ready else 503,
+        content={"ready": is_ready, "components": readiness},
+    )
@@ -1,5 +1,8 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
 from services.agv_service import AGVService
+from services.telemetry_service import TelemetryService
+from router.llm import llm_service
 
 router = APIRouter(
     prefix="/agv",
@@ -7,21 +10,70 @@ router = APIRouter(
 )
 
 agv_service = AGVService()
+telemetry_service = TelemetryService(llm_service.mqtt)
 
 @router.post("/start")
 async def start_tracking():
-    """YOLO 탐지 및 자율 주행 시작"""
+    """YOLO 탐지 및 자율 주행 시작 (즉시 반환, 진행 상황은 /agv/ws 또는 /agv/status)"""
     return agv_service.start()
 
 @router.post("/stop")
 async def stop_tracking():
-    """작동 중지"""
+    """작동 중지 (즉시 반환)"""
     return agv_service.stop()
 
 @router.get("/status")
 async def get_status():
     """현재 상태 확인"""
+    state = agv_service.state.snapshot()
     return {
         "is_running": agv_service.is_running,
-        "message": agv_service.status_message
-    }
\ No newline at end of file
+        "state": state["state"],
+        "seq": state["seq"],
+        "message": state["message"],
+        "latency": agv_service.latency_report()
+    }
+
+@router.websocket("/ws")
+async def status_ws(websocket: WebSocket):
+    """상태 변경 푸시: {"seq", "state", "message", "since", "time"}. 느린 클라이언트는 최신 상태만 받는다."""
+    await websocket.accept()
+    try:
+        async for _, snapshot in agv_service.state.updates.subscribe():
+            await websocket.send_json(snapshot)
+    except WebSocketDisconnect:
+        pass
+
+@router.get("/stream")
+async def stream_preview():
+    """bbox / ROI / 행동이 그려진 MJPEG 미리보기 (브라우저 <img src>로 바로 재생)"""
+    async def mjpeg():
+        async for _, jpeg in agv_service.preview.frames():
+            yield (b"--frame\r\nContent-Type: image/jpeg\r\n"
+                   b"Content-Length: " + str(len(jpeg)).encode() + b"\r\n\r\n" + jpeg + b"\r\n")
+
+    return StreamingResponse(
+        mjpeg(),
+        media_type="multipart/x-mixed-replace; boundary=frame",
+        headers={"Cache-Control": "no-cache"}
+    )
+
+@router.websocket("/stream/ws")
+async def stream_preview_ws(websocket: WebSocket):
+    """같은 미리보기를 WebSocket 바이너리 메시지(JPEG 한 장씩)로 전송"""
+    await websocket.accept()
+    try:
+        async for _, jpeg in agv_service.preview.frames():
+            await websocket.send_bytes(jpeg)
+    except WebSocketDisconnect:
+        pass
+
+@router.get("/telemetry")
+async def get_telemetry(robot_id: str | None = None, limit: int = 100):
+    """AGV 상태 프레임. robot_id 미지정 시 로봇별 최신 프레임 요약"""
+    if robot_id is None:
+        return telemetry_service.summary()
+    return {
+        "robot_id": robot_id,
+        "frames": telemetry_service.history(robot_id, limit)
+    }
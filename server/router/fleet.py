@@ -0,0 +1,49 @@
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel
+
+from router.llm import llm_service
+
+router = APIRouter(
+    prefix="/fleet",
+    tags=["Fleet"]
+)
+
+fleet_service = llm_service.fleet
+
+
+class RobotRegistration(BaseModel):
+    robot_id: str
+    position: tuple[float, float] | None = None
+    require_heartbeat: bool = True
+
+
+class DispatchRequest(BaseModel):
+    command: str = "drink"
+    priority: int = 0
+    deadline: float | None = None
+    location: tuple[float, float] | None = None
+
+
+@router.get("/")
+async def get_fleet():
+    """등록된 AGV와 대기 중인 요청"""
+    return fleet_service.snapshot()
+
+@router.post("/robots")
+async def register_robot(request: RobotRegistration):
+    """AGV 등록 (명령: AGV/CMD/<id>, 상태: AGV/STATUS/<id>)"""
+    robot = fleet_service.register(request.robot_id, request.position, request.require_heartbeat)
+    return {"robot_id": robot.id, "cmd_topic": robot.cmd_topic, "status_topic": robot.status_topic}
+
+@router.delete("/robots/{robot_id}")
+async def unregister_robot(robot_id: str):
+    if robot_id not in fleet_service.robots:
+        raise HTTPException(status_code=404, detail="Unknown robot")
+    fleet_service.unregister(robot_id)
+    return {"status": "Removed"}
+
+@router.post("/requests")
+async def submit_request(request: DispatchRequest):
+    """작업 요청 (우선순위가 높을수록, 마감이 빠를수록 먼저 할당)"""
+    job = fleet_service.submit(request.command, request.priority, request.deadline, request.location)
+    return job.snapshot()
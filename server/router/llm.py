@@ -1,5 +1,8 @@
+import json
+
 from fastapi import APIRouter, HTTPException
-from schemas.chat_schema import UserRequest, Result
+from fastapi.responses import StreamingResponse
+from schemas.chat_schema import UserRequest, ChatResponse
 from services.llm_service import LLMService
 
 router = APIRouter(
@@ -9,7 +12,44 @@ router = APIRouter(
 
 llm_service = LLMService()
 
-@router.post("/", response_model=Result, summary="챗봇 대화 요청")
+@router.post("/", response_model=ChatResponse, summary="챗봇 대화 요청")
 async def create_chat_response(request: UserRequest):
-    result = await llm_service.ask(request.message)
-    return result
\ No newline at end of file
+    """session_id를 주면 서버가 이전 대화(요약 + 최근 턴)를 이어서 사용한다"""
+    result = await llm_service.ask(request.message, request.session_id)
+    return result
+
+
+@router.post("/stream", summary="챗봇 대화 스트리밍 요청 (SSE)")
+async def stream_chat_response(request: UserRequest):
+    """
+    text/event-stream 으로 응답한다.
+    event: command (AGV 명령, 결정 즉시) / token (응답 텍스트 조각) / done (최종 Result) / error
+    """
+    async def events():
+        async for event, data in llm_service.ask_stream(request.message, request.session_id):
+            yield f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/session/{session_id}", summary="대화 세션 상태 (요약, 턴 수, 컨텍스트 토큰)")
+async def get_session(session_id: str):
+    info = llm_service.session_info(session_id)
+    if info is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    return info
+
+
+@router.delete("/session/{session_id}", summary="대화 세션 초기화")
+async def reset_session(session_id: str):
+    llm_service.reset_session(session_id)
+    return {"session_id": session_id, "status": "reset"}
+
+
+@router.get("/metrics", summary="응답 캐시/합류 통계")
+async def get_metrics():
+    return llm_service.metrics()
@@ -0,0 +1,34 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from util import metrics
+from util.profiler import profiler
+
+router = APIRouter(tags=["Metrics"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse, summary="Prometheus 메트릭")
+async def get_metrics():
+    return PlainTextResponse(metrics.REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+
+@router.get("/metrics/profiler", summary="샘플링 프로파일러 상태 / 상위 함수")
+async def get_profile(limit: int = 20):
+    return profiler.report(limit)
+
+
+@router.get("/metrics/profiler/folded", response_class=PlainTextResponse, summary="flamegraph용 folded 스택")
+async def get_folded():
+    return profiler.folded()
+
+
+@router.post("/metrics/profiler/start", summary="샘플링 프로파일러 시작")
+async def start_profiler(interval: float = 0.005):
+    started = profiler.start(interval=max(0.001, interval))
+    return {"started": started, **profiler.report(0)}
+
+
+@router.post("/metrics/profiler/stop", summary="샘플링 프로파일러 중지")
+async def stop_profiler(limit: int = 20):
+    stopped = profiler.stop()
+    return {"stopped": stopped, **profiler.report(limit)}
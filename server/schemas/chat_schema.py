@@ -2,7 +2,23 @@ from pydantic import BaseModel, Field
 
 class UserRequest(BaseModel):
     message: str
+    session_id: str | None = Field(default=None, description="대화 세션 id (클라이언트별). 없으면 이전 대화 없이 응답")
 
 class Result(BaseModel):
     response: str = Field(description="사용자의 말에 대한 자연스러운 응답 텍스트")
     command: str = Field(description="AGV가 실행할 명령어. 반드시 다음 중 하나여야 함: [None, drink, no]")
+
+
+class ChatResponse(Result):
+    session_id: str | None = None
+    usage: dict | None = Field(default=None, description="요청별 토큰 수/지연 (prompt_tokens, history_tokens, input_tokens, cached_tokens, output_tokens, latency_ms)")
+
+
+def command_first_schema() -> dict:
+    """스트리밍용 Result JSON 스키마. command가 response보다 먼저 생성되도록 필드 순서를 바꾼다."""
+    schema = Result.model_json_schema()
+    props = schema["properties"]
+    schema["properties"] = {"command": props["command"], "response": props["response"]}
+    schema["required"] = ["command", "response"]
+    schema.setdefault("description", "AGV 명령과 사용자에게 보낼 응답")
+    return schema
@@ -1,52 +1,67 @@
-import torch
-import cv2
+import collections
 import time
 import threading
-import numpy as np
-import pathlib
-import sys
 import os
 
-try:
-    from jetbot import Robot, Camera, bgr8_to_jpeg
-    from SCSCtrl import TTLServo
-except ImportError:
-    print("Warning: Jetbot/SCSCtrl libraries not found. Running in mock mode.")
-    
-    class Robot:
-        def stop(self): pass
-        def forward(self, x): pass
-        def backward(self, x): pass
-        def left(self, x): pass
-        def right(self, x): pass
-    class Camera:
-        @staticmethod
-        def instance(width, height): return Camera()
-        def start(self): pass
-        def stop(self): pass
-        @property
-        def value(self): return np.zeros((300, 300, 3), dtype=np.uint8)
-        def observe(self, callback, names): pass
-        def unobserve(self, callback, names): pass
-    class TTLServo:
-        @staticmethod
-        def servoAngleCtrl(*args): pass
-
-pathlib.WindowsPath = pathlib.PosixPath
+from services import hardware
+from services.preview_service import PreviewService
+from util import metrics
+from util.pipeline import LatestQueue, StageStats, TimedMotor
+from util.state import InvalidTransition, StateMachine
+
+STAGE_SECONDS = metrics.histogram("agv_stage_seconds", "AGV pipeline stage latency", ["stage"])
+ACTIONS = metrics.counter("agv_actions_total", "AGV actions taken", ["action"])
+FRAMES = metrics.counter("agv_frames_total", "Frames handled by the inference loop", ["mode"])
+RUNNING = metrics.gauge("agv_running", "1 while the AGV control loop is running")
+DROPPED = metrics.counter("agv_dropped_total", "Frames/detections dropped by latest-wins queues", ["queue"])
+
+# 컨트롤러 상태와 허용 전이
+IDLE, LOADING, TRACKING, GRABBING, STOPPING, ERROR = "idle", "loading", "tracking", "grabbing", "stopping", "error"
+TRANSITIONS = {
+    IDLE: {LOADING},
+    LOADING: {TRACKING, STOPPING, ERROR},
+    TRACKING: {GRABBING, STOPPING, ERROR},
+    GRABBING: {TRACKING, STOPPING, ERROR},
+    STOPPING: {IDLE, ERROR},
+    ERROR: {LOADING, STOPPING},
+}
+
 
 class AGVService:
+    """
+    YOLO 탐지 기반 AGV 컨트롤러.
+    start/stop은 상태 전이만 하고 즉시 반환하며, 모델 로드/스레드 정리는 lifecycle 스레드에서 수행한다.
+    상태/메시지 변경은 self.state.updates로 발행된다 (/agv/ws).
+    """
+
     def __init__(self):
-        self.is_running = False
+        # 추적 메시지(IoU 포함)는 프레임마다 바뀌므로 /agv/ws 발행은 간격을 둔다 (상태 전이는 즉시)
+        self.state = StateMachine(TRANSITIONS, IDLE, "Initialized",
+                                  message_interval=float(os.getenv("AGV_STATUS_INTERVAL", "0.2")))
+        self._running = threading.Event()  # capture/inference/control 루프 실행 플래그
+        self._lifecycle_lock = threading.Lock()  # startup/shutdown 작업 직렬화
         self.model = None
+        self.names = {}
         self.robot = None
         self.camera = None
-        self.thread = None
-        self.status_message = "Initialized"
+        self.motor = None
+        self.scheduler = None
+        self.multires = None
+        self.servo = None
+        self.last_servo_t = None
+        self.threads = []
+        self.hw = None
+        self.arm = None  # ArmScheduler (init_hardware에서 생성)
+        self.grab_future = None
+        self.prepositioned = False
+        self._load_lock = threading.Lock()
         
         # 파라미터 설정
         self.conf_threshold = 0.5
         self.iou_match_threshold = 0.7
         self.size_ratio_eps = 0.15
+        self.target_policy = "confidence"  # confidence | iou | largest | class_priority
+        self.class_priority = []
         
         self.move_speed = 0.25
         self.turn_speed = 0.22
@@ -54,196 +69,466 @@ class AGVService:
         self.turn_dt = 0.08
         self.move_cooldown = 0.50
         self.grap_cooldown = 2.0
+        self.grap_hold = 3.5
+        self.prealign_iou = 0.4  # 이 IoU 이상이면 정렬 중에 팔을 집기 직전 자세로 미리 옮긴다
+        self.capture_interval = 1.0 / 30
+        self.use_scheduler = True  # 쿨다운 중 추론 생략 + 변화 없는 프레임은 추적으로 대체
+        self.inference_mode = os.getenv("AGV_INFERENCE_MODE", "full")  # full | multires
+        self.control_mode = os.getenv("AGV_CONTROL_MODE", "pulse")  # pulse | servo
+        self.watchdog = 0.3  # servo 모드: 이 시간 안에 새 명령이 없으면 정지
         
+        # 아래 타이밍 값은 control 스레드만 쓴다. 다른 스레드는 busy_until 하나만 읽는다.
         self.last_move_t = 0.0
         self.last_grap_t = 0.0
+        self.grap_until = 0.0
+        self.busy_until = 0.0  # 이 시각까지는 이동/집기 쿨다운 (inference 스레드의 추론 생략 판단용)
+
+        # 파이프라인: capture -> inference -> actuation
+        self.frame_queue = LatestQueue(maxsize=1)
+        self.detection_queue = LatestQueue(maxsize=1)
+        self.stats = {
+            "capture": StageStats("capture"),
+            "inference": StageStats("inference"),
+            "actuation": StageStats("actuation"),
+            "end_to_end": StageStats("end_to_end"),
+        }
+        self.actions = collections.Counter()  # 행동별 실행 횟수
+        self.preview = PreviewService()  # /agv/stream 미리보기 (시청자가 있을 때만 인코딩)
+        self._stage_metrics = {name: STAGE_SECONDS.labels(name) for name in self.stats}
 
         self.model_path = os.path.join(os.path.dirname(__file__), "../../utils/best.pt") 
         if not os.path.exists(self.model_path):
              self.model_path = "best.pt"
 
+    def bind_metrics(self):
+        """
+        수집 시점 메트릭(agv_running, agv_dropped_total, preview_viewers)을 이 인스턴스에 연결한다.
+        메트릭은 프로세스 전역이므로 앱이 쓰는 인스턴스에서만 한 번 호출하고, 종료 시 unbind_metrics()
+        """
+        RUNNING.set_function(lambda: int(self.is_running))
+        DROPPED.set_function(lambda: self.frame_queue.dropped, "frame")
+        DROPPED.set_function(lambda: self.detection_queue.dropped, "detection")
+        self.preview.bind_metrics()
+
+    def unbind_metrics(self):
+        RUNNING.set_function(None)
+        DROPPED.set_function(None, "frame")
+        DROPPED.set_function(None, "detection")
+        self.preview.unbind_metrics()
+
+    @property
+    def is_running(self):
+        return self._running.is_set()
+
+    @property
+    def status_message(self):
+        return self.state.message
+
+    @status_message.setter
+    def status_message(self, message):
+        self.state.set_message(message)
+
     def load_model(self):
+        with self._load_lock:
+            self._load_model()
+
+    @property
+    def is_ready(self):
+        return self.model is not None
+
+    def _load_model(self):
+        # torch/onnxruntime/numpy는 모델 로드 시점에 import
+        from services.detector import create_detector, HubDetector
+
         if self.model is None:
             print(f"Loading YOLOv5 model from {self.model_path}...")
             try:
-                self.model = torch.hub.load(
-                    'ultralytics/yolov5:v7.0',
-                    'custom',
-                    path=self.model_path,
-                    force_reload=False
-                )
-                self.model.to('cuda' if torch.cuda.is_available() else 'cpu')
-                self.model.eval()
-                self.names = getattr(self.model, "names", {}) or {}
+                detector = create_detector(self.model_path)
+                try:
+                    detector.load()
+                except Exception as e:
+                    if isinstance(detector, HubDetector):
+                        raise
+                    print(f"Detector backend [{detector.name}] failed ({e}), falling back to torch.hub")
+                    detector = HubDetector(self.model_path, warmup=detector.warmup).load()
+                self.model = detector
+                self.names = detector.names
                 print("Model loaded successfully.")
             except Exception as e:
                 print(f"Failed to load model: {e}")
                 self.status_message = f"Model Load Error: {e}"
 
     def init_hardware(self):
+        if self.hw is None:
+            self.hw = hardware.load()
         if self.robot is None:
-            self.robot = Robot()
-        
-        TTLServo.servoAngleCtrl(4, 40, 1, 300)
-        TTLServo.servoAngleCtrl(1, 0, 1, 150)
-        TTLServo.servoAngleCtrl(2, 0, 1, 150)
-        TTLServo.servoAngleCtrl(3, 0, 1, 150)
-        TTLServo.servoAngleCtrl(5, 10, 1, 150)
-
-    def start(self):
-        if self.is_running:
-            return {"status": "Already running"}
-        
-        self.load_model()
-        self.init_hardware()
-        
-        if self.camera is None:
-            self.camera = Camera.instance(width=300, height=300)
-        self.camera.start()
-        
-        self.is_running = True
-        self.thread = threading.Thread(target=self._control_loop, daemon=True)
-        self.thread.start()
-        return {"status": "Started"}
-
-    def stop(self):
-        self.is_running = False
-        if self.thread:
-            self.thread.join(timeout=2.0)
+            self.robot = self.hw.Robot()
+        if self.motor is None:
+            self.motor = TimedMotor(self.robot)
         
-        if self.robot:
-            self.robot.stop()
-        
-        if self.camera:
-            self.camera.stop()
-            
-        self.status_message = "Stopped"
-        return {"status": "Stopped"}
+        if self.arm is None:
+            from util.arm import ArmScheduler
+            self.arm = ArmScheduler(self.hw.TTLServo)
+        self.arm.move("home", preempt=True)
+        self.prepositioned = False
 
-    def _control_loop(self):
-        print("Control loop started.")
+    def start(self, wait=False):
+        """추적 시작. loading으로 전이만 하고 반환하며, 준비는 startup 스레드가 한다."""
+        try:
+            self.state.transition(LOADING, "Loading", expect=(IDLE, ERROR))
+        except InvalidTransition:
+            state = self.state.state
+            if state in (LOADING, TRACKING, GRABBING):
+                return {"status": "Already running", "state": state}
+            return {"status": f"Cannot start while {state}", "state": state}
+
+        worker = threading.Thread(target=self._startup, name="agv-startup", daemon=True)
+        worker.start()
+        if not wait:
+            return {"status": "Starting", "state": LOADING}
+        worker.join()
+        state = self.state.state
+        return {"status": "Started" if state == TRACKING else "Failed", "state": state, "message": self.status_message}
+
+    def stop(self, wait=False):
+        """작동 중지. stopping으로 전이만 하고 반환하며, 스레드 정리는 shutdown 스레드가 한다."""
+        try:
+            self.state.transition(STOPPING, "Stopping", expect=(LOADING, TRACKING, GRABBING, ERROR))
+        except InvalidTransition:
+            state = self.state.state
+            if state == STOPPING and wait:
+                self.state.wait_for((IDLE, ERROR))
+                state = self.state.state
+            return {"status": "Stopping" if state == STOPPING else "Already stopped", "state": state}
+
+        worker = threading.Thread(target=self._shutdown, name="agv-shutdown", daemon=True)
+        worker.start()
+        if not wait:
+            return {"status": "Stopping", "state": STOPPING}
+        worker.join()
+        return {"status": "Stopped", "state": self.state.state}
+
+    def _startup(self):
+        with self._lifecycle_lock:
+            try:
+                self.load_model()
+                if self.model is None:
+                    raise RuntimeError(self.status_message)
+                self.init_hardware()
+
+                if self.camera is None:
+                    self.camera = self.hw.Camera.instance(width=300, height=300)
+                self.camera.start()
+
+                self.frame_queue.clear()
+                self.detection_queue.clear()
+                for stat in self.stats.values():
+                    stat.reset()
+                self.actions.clear()
+                self.busy_until = 0.0
+
+                if self.inference_mode == "multires" and self.multires is None:
+                    from services.detector import MultiResolutionDetector
+                    self.multires = MultiResolutionDetector(self.model)
+
+                if self.control_mode == "servo":
+                    from util.control import VisualServoController
+                    if self.servo is None:
+                        self.servo = VisualServoController()
+                    self.servo.reset()
+                    self.last_servo_t = None
+
+                if self.use_scheduler and self.scheduler is None:
+                    from util.tracking import InferenceScheduler
+                    self.scheduler = InferenceScheduler()
+                if self.scheduler is not None:
+                    self.scheduler.reset()
+            except Exception as e:
+                print(f"AGV start failed: {e}")
+                if self.camera:
+                    self.camera.stop()
+                self.state.try_transition(ERROR, f"Start Error: {e}", expect=(LOADING,))
+                return
+
+            if self.state.state != LOADING:
+                # 로딩 중 stop 요청: 뒤이어 실행되는 shutdown이 정리한다
+                return
+            self._running.set()
+            self.threads = [
+                threading.Thread(target=self._capture_loop, name="agv-capture", daemon=True),
+                threading.Thread(target=self._inference_loop, name="agv-inference", daemon=True),
+                threading.Thread(target=self._control_loop, name="agv-control", daemon=True),
+            ]
+            for thread in self.threads:
+                thread.start()
+            self.state.try_transition(TRACKING, "Tracking", expect=(LOADING,))
+
+    def _shutdown(self):
+        with self._lifecycle_lock:
+            try:
+                self._running.clear()
+                self.frame_queue.clear()
+                self.detection_queue.clear()
+                for thread in self.threads:
+                    thread.join(timeout=2.0)
+                self.threads = []
+
+                if self.motor:
+                    self.motor.stop()
+                elif self.robot:
+                    self.robot.stop()
+
+                if self.camera:
+                    self.camera.stop()
+            except Exception as e:
+                print(f"AGV stop failed: {e}")
+                self.state.try_transition(ERROR, f"Stop Error: {e}", expect=(STOPPING,))
+                return
+            self.state.try_transition(IDLE, "Stopped", expect=(STOPPING,))
+
+    def _record(self, stage, dt):
+        self.stats[stage].record(dt)
+        self._stage_metrics[stage].observe(dt)
+
+    def _count_action(self, action):
+        self.actions[action] += 1
+        ACTIONS.labels(action).inc()
+
+    def latency_report(self):
+        report = {name: stat.snapshot() for name, stat in self.stats.items()}
+        report["dropped_frames"] = self.frame_queue.dropped
+        report["dropped_detections"] = self.detection_queue.dropped
+        if self.scheduler is not None:
+            report["scheduler"] = dict(self.scheduler.counts)
+        if self.multires is not None:
+            report["multires"] = self.multires.report()
+        report["actions"] = dict(self.actions)
+        report["preview"] = self.preview.report()
+        if self.arm is not None:
+            report["arm"] = self.arm.report()
+        return report
+
+    def _capture_loop(self):
+        """카메라 프레임을 읽어 최신 프레임만 frame_queue에 유지"""
+        seq = 0
         while self.is_running:
+            t0 = time.perf_counter()
             try:
                 image = self.camera.value
-                if image is None:
-                    time.sleep(0.1)
-                    continue
+            except Exception as e:
+                print(f"Error in capture loop: {e}")
+                time.sleep(1)
+                continue
 
-                h, w = image.shape[:2]
+            if image is None:
+                time.sleep(0.1)
+                continue
 
-                with torch.no_grad():
-                    results = self.model(image)
+            seq += 1
+            self.frame_queue.put((seq, t0, image))
+            self.preview.offer_frame(seq, image)
+            self._record("capture", time.perf_counter() - t0)
 
-                pred = results.xyxy[0]
+            time.sleep(self.capture_interval)
+
+    def _inference_loop(self):
+        """최신 프레임에 대해 YOLO 추론 후 detection_queue로 전달"""
+        from util.detection import select_target
+
+        last_target = None
+        while self.is_running:
+            item = self.frame_queue.get(timeout=0.1)
+            if item is None:
+                continue
+            seq, t_capture, image = item
+            try:
+                t0 = time.perf_counter()
+                h, w = image.shape[:2]
                 roi = self._get_red_roi_xyxy(h, w)
-                roi_cx = (roi[0] + roi[2]) / 2.0
-                
-                best = None
-                if pred is not None and len(pred) > 0:
-                    confs = pred[:, 4]
-                    keep = confs >= self.conf_threshold
-                    if bool(keep.any()):
-                        cand = pred[keep]
-                        idx = torch.argmax(cand[:, 4])
-                        x1, y1, x2, y2, conf, cls = cand[idx].tolist()
-                        best = ((int(x1), int(y1), int(x2), int(y2)), float(conf), int(cls))
-
-                now = time.time()
-                action = "wait"
-
-                if best is None:
-                    self.robot.stop()
-                    self.status_message = "No detection"
-                
-                elif (now - self.last_move_t) < self.move_cooldown:
-                    self.robot.stop()
-                    self.status_message = "Cooldown"
-                
-                else:
-                    bbox, conf, cls = best
-                    bx1, by1, bx2, by2 = bbox
-                    
-                    iou = self._bbox_iou_xyxy(bbox, roi)
-                    bbox_area = max(1, (bx2 - bx1)) * max(1, (by2 - by1))
-                    roi_area = max(1, (roi[2] - roi[0])) * max(1, (roi[3] - roi[1]))
-                    size_ratio = bbox_area / roi_area
-                    bbox_cx = (bx1 + bx2) / 2.0
-                    
-                    name = self.names.get(cls, str(cls))
-
-                    if iou >= self.iou_match_threshold and (now - self.last_grap_t) > self.grap_cooldown:
-                        action = "grap"
-                        self.robot.stop()
-                        self._grap_action()
-                        self.last_grap_t = time.time()
-                        self.last_move_t = time.time()
-                    
-                    elif size_ratio < (1 - self.size_ratio_eps):
-                        action = "forward"
-                        self._move_forward()
-                        self.last_move_t = now
-                    
-                    elif size_ratio > (1 + self.size_ratio_eps):
-                        action = "backward"
-                        self._move_backward()
-                        self.last_move_t = now
-                    
+
+                mode = "detect"
+                if self.scheduler is not None:
+                    now = time.time()
+                    cooldown = now < self.busy_until
+                    mode = self.scheduler.decide(image, now, cooldown, roi)
+                FRAMES.labels(mode).inc()
+                if mode == "skip":
+                    continue
+
+                if mode == "detect":
+                    if self.multires is not None:
+                        # 타깃이 ROI 근처면 ROI 주변만 고해상도로 탐지
+                        pred = self.multires(image, roi, last_target[0] if last_target else None)
                     else:
-                        if bbox_cx > roi_cx:
-                            action = "right"
-                            self._turn_right()
-                        else:
-                            action = "left"
-                            self._turn_left()
-                        self.last_move_t = now
-                    
-                    self.status_message = f"Tracking {name}: {action} (IoU={iou:.2f})"
+                        pred = self.model(image)
+                    best = select_target(pred, roi, self.conf_threshold,
+                                         self.target_policy, self.class_priority)
+                    if self.scheduler is not None:
+                        self.scheduler.on_detection(image, time.time(), best)
+                    self._record("inference", time.perf_counter() - t0)
+                else:
+                    # 추적 박스는 이미 선택된 타깃이므로 신뢰도 필터 없이 점수만 계산
+                    best = select_target(self.scheduler.track(time.time()), roi, 0.0)
+
+                last_target = best
+                self.detection_queue.put((seq, t_capture, (h, w), best))
+
+            except Exception as e:
+                print(f"Error in inference loop: {e}")
+                time.sleep(1)
+
+    def _control_loop(self):
+        """탐지 결과로 행동을 결정하고 논블로킹 모터 펄스로 실행"""
+        print("Control loop started.")
+        while self.is_running:
+            item = self.detection_queue.get(timeout=0.1)
+            if item is None:
+                continue
+            seq, t_capture, (h, w), best = item
+            try:
+                t0 = time.perf_counter()
+                self._act(best)
+                self.busy_until = max(self.grap_until, self.last_move_t + self.move_cooldown)
+                t1 = time.perf_counter()
+                self._record("actuation", t1 - t0)
+                self._record("end_to_end", t1 - t_capture)
+                self.preview.annotate(best, self._get_red_roi_xyxy(h, w), self.status_message)
 
             except Exception as e:
                 print(f"Error in control loop: {e}")
                 time.sleep(1)
 
-            time.sleep(0.01)
+    def _act(self, best):
+        now = time.time()
+        action = "wait"
+
+        if now < self.grap_until:
+            self._count_action("grabbing")
+            return
+        if self.state.state == GRABBING:
+            self.state.try_transition(TRACKING, "Tracking", expect=(GRABBING,))
+        if best is not None and best[3] >= self.prealign_iou:
+            self._preposition_arm()
+
+        if self.control_mode == "servo" and self.servo is not None:
+            self._act_servo(best, now)
+            return
+
+        if best is None:
+            action = "none"
+            self.motor.stop()
+            self.status_message = "No detection"
+        
+        elif (now - self.last_move_t) < self.move_cooldown:
+            if not self.motor.busy:
+                self.motor.stop()
+            self.status_message = "Cooldown"
+        
+        else:
+            bbox, conf, cls, iou, size_ratio, center_offset = best
+            
+            name = self.names.get(cls, str(cls))
+
+            if iou >= self.iou_match_threshold and (now - self.last_grap_t) > self.grap_cooldown:
+                action = "grap"
+                self.motor.stop()
+                self._grap_action()
+                self.last_grap_t = self.grap_until
+                self.last_move_t = self.grap_until
+            
+            elif size_ratio < (1 - self.size_ratio_eps):
+                action = "forward"
+                self.last_move_t = now
+                self._move_forward()
+            
+            elif size_ratio > (1 + self.size_ratio_eps):
+                action = "backward"
+                self.last_move_t = now
+                self._move_backward()
+            
+            else:
+                if center_offset > 0:
+                    action = "right"
+                    self.last_move_t = now
+                    self._turn_right()
+                else:
+                    action = "left"
+                    self.last_move_t = now
+                    self._turn_left()
+            
+            self.status_message = f"Tracking {name}: {action} (IoU={iou:.2f})"
+
+        self._count_action(action)
+
+    def _act_servo(self, best, now):
+        """연속 제어: 매 프레임 PID로 모터 속도를 갱신 (쿨다운 없음)"""
+        dt = 0.0 if self.last_servo_t is None else now - self.last_servo_t
+        self.last_servo_t = now
+
+        if best is None:
+            self.servo.reset()
+            self.motor.stop()
+            self.status_message = "No detection"
+            self._count_action("none")
+            return
+
+        bbox, conf, cls, iou, size_ratio, center_offset = best
+        name = self.names.get(cls, str(cls))
+
+        if iou >= self.iou_match_threshold and (now - self.last_grap_t) > self.grap_cooldown:
+            action = "grap"
+            self.servo.reset()
+            self.motor.stop()
+            self._grap_action()
+            self.last_grap_t = self.grap_until
+        else:
+            left, right, aligned = self.servo.update(center_offset, size_ratio, dt)
+            if aligned and left == 0.0 and right == 0.0:
+                action = "hold"
+                self.motor.stop()
+            else:
+                action = f"drive({left:.2f},{right:.2f})"
+                self.motor.drive(left, right, self.watchdog)
+                if self.scheduler is not None:
+                    self.scheduler.notify_motion()
+
+        self.status_message = f"Tracking {name}: {action} (IoU={iou:.2f})"
+        self._count_action(action.split("(")[0])
 
     def _get_red_roi_xyxy(self, h, w):
         return (130, h - 140, 170, h - 80)
 
-    def _bbox_iou_xyxy(self, a, b):
-        ax1, ay1, ax2, ay2 = a
-        bx1, by1, bx2, by2 = b
-        ix1, iy1 = max(ax1, bx1), max(ay1, by1)
-        ix2, iy2 = min(ax2, bx2), min(ay2, by2)
-        iw, ih = max(0, ix2 - ix1), max(0, iy2 - iy1)
-        inter = iw * ih
-        area_a = max(0, (ax2 - ax1)) * max(0, (ay2 - ay1))
-        area_b = max(0, (bx2 - bx1)) * max(0, (by2 - by1))
-        union = area_a + area_b - inter
-        return 0.0 if union <= 0 else float(inter / union)
+    def _pulse(self, action, speed, duration):
+        self.motor.pulse(action, speed, duration)
+        if self.scheduler is not None:
+            self.scheduler.notify_motion()
 
     def _move_forward(self):
-        self.robot.forward(self.move_speed)
-        time.sleep(self.move_dt)
-        self.robot.stop()
+        self._pulse("forward", self.move_speed, self.move_dt)
 
     def _move_backward(self):
-        self.robot.backward(self.move_speed)
-        time.sleep(self.move_dt)
-        self.robot.stop()
+        self._pulse("backward", self.move_speed, self.move_dt)
 
     def _turn_left(self):
-        self.robot.left(self.turn_speed)
-        time.sleep(self.turn_dt)
-        self.robot.stop()
+        self._pulse("left", self.turn_speed, self.turn_dt)
 
     def _turn_right(self):
-        self.robot.right(self.turn_speed)
-        time.sleep(self.turn_dt)
-        self.robot.stop()
+        self._pulse("right", self.turn_speed, self.turn_dt)
+
+    def _preposition_arm(self):
+        """타깃에 가까워지면 주행과 동시에 팔을 미리 내려 집기 시간을 줄인다 (1회, 물체를 들고 있지 않을 때만)"""
+        if self.prepositioned or self.arm.busy or self.arm.holding:
+            return
+        self.prepositioned = True
+        self.arm.move("pre_grab")
 
     def _grap_action(self):
-        TTLServo.servoAngleCtrl(5, 60, 1, 150)
-        TTLServo.servoAngleCtrl(2, 120, 1, 150)
-        TTLServo.servoAngleCtrl(3, 110, 1, 150)
-        time.sleep(3.5)
-        TTLServo.servoAngleCtrl(4, -20, 1, 150)
+        """집기 동작 시작. 팔 궤적은 ArmScheduler가 실행하므로 파이프라인을 막지 않는다."""
+        from util.arm import grab_sequence
 
+        self.grab_future = self.arm.run(grab_sequence(self.grap_hold, self.prepositioned))
+        self.prepositioned = False
+        self.grap_until = time.time() + self.grap_hold
+        self.state.try_transition(GRABBING, "Grabbing", expect=(TRACKING,))
+        if self.scheduler is not None:
+            self.scheduler.notify_motion()
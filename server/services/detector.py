@@ -0,0 +1,327 @@
+"""
+YOLOv5 탐지 백엔드
+
+AGV_DETECTOR_BACKEND 환경 변수로 선택한다.
+    auto        : best.onnx -> best.torchscript -> torch.hub 순서로 사용 가능한 것 선택 (기본값)
+    onnx        : ONNX Runtime CPU 엔진
+    torchscript : TorchScript 엔진
+    hub         : torch.hub.load('ultralytics/yolov5:v7.0', ...) (기존 경로, 폴백)
+
+ONNX/TorchScript 모델은 yolov5 저장소에서 고정 입력 크기로 export 한다.
+    python export.py --weights best.pt --include onnx torchscript --imgsz 320
+"""
+import ast
+import json
+import os
+import time
+
+import numpy as np
+
+
+def letterbox(image, size, color=(114, 114, 114)):
+    """비율을 유지한 채 size x size로 리사이즈 + 패딩. (이미지, scale, (pad_x, pad_y)) 반환"""
+    import cv2
+
+    h, w = image.shape[:2]
+    scale = min(size / h, size / w)
+    nh, nw = int(round(h * scale)), int(round(w * scale))
+    if (nh, nw) != (h, w):
+        image = cv2.resize(image, (nw, nh), interpolation=cv2.INTER_LINEAR)
+    pad_y, pad_x = (size - nh) // 2, (size - nw) // 2
+    out = np.full((size, size, 3), color, dtype=np.uint8)
+    out[pad_y:pad_y + nh, pad_x:pad_x + nw] = image
+    return out, scale, (pad_x, pad_y)
+
+
+def nms(boxes, scores, iou_threshold):
+    """greedy NMS (numpy). 유지할 인덱스 반환"""
+    x1, y1, x2, y2 = boxes.T
+    areas = (x2 - x1).clip(min=0) * (y2 - y1).clip(min=0)
+    order = scores.argsort()[::-1]
+    keep = []
+    while order.size:
+        i = order[0]
+        keep.append(i)
+        xx1 = np.maximum(x1[i], x1[order[1:]])
+        yy1 = np.maximum(y1[i], y1[order[1:]])
+        xx2 = np.minimum(x2[i], x2[order[1:]])
+        yy2 = np.minimum(y2[i], y2[order[1:]])
+        inter = (xx2 - xx1).clip(min=0) * (yy2 - yy1).clip(min=0)
+        iou = inter / (areas[i] + areas[order[1:]] - inter + 1e-9)
+        order = order[1:][iou <= iou_threshold]
+    return np.array(keep, dtype=np.int64)
+
+
+class Detector:
+    """탐지 백엔드 공통 인터페이스. __call__은 (N, 6) [x1, y1, x2, y2, conf, cls]를 반환한다."""
+
+    name = "base"
+
+    def __init__(self, model_path, imgsz=320, threads=None, warmup=2,
+                 conf_threshold=0.25, iou_threshold=0.45, max_det=100):
+        self.model_path = model_path
+        self.imgsz = imgsz
+        self.threads = threads
+        self.warmup = warmup
+        self.conf_threshold = conf_threshold
+        self.iou_threshold = iou_threshold
+        self.max_det = max_det
+        self.names = {}
+        self.load_time = 0.0
+        # 호출마다 입력 크기를 바꿀 수 있는지 (고정 shape으로 export된 엔진은 불가)
+        self.dynamic_size = False
+
+    def load(self):
+        t0 = time.perf_counter()
+        self._load()
+        dummy = np.zeros((self.imgsz, self.imgsz, 3), dtype=np.uint8)
+        for _ in range(self.warmup):
+            self(dummy)
+        self.load_time = time.perf_counter() - t0
+        print(f"Detector [{self.name}] ready in {self.load_time:.2f}s ({self.model_path})")
+        return self
+
+    def _load(self):
+        raise NotImplementedError
+
+    def __call__(self, image, size=None):
+        raise NotImplementedError
+
+    def input_size(self, size=None):
+        return size if size and self.dynamic_size else self.imgsz
+
+    def _preprocess(self, image, size=None):
+        padded, scale, pad = letterbox(image, self.input_size(size))
+        # BGR(HWC) -> RGB(CHW), 0~1
+        blob = np.ascontiguousarray(padded[:, :, ::-1].transpose(2, 0, 1)[None], dtype=np.float32)
+        blob /= 255.0
+        return blob, scale, pad
+
+    def _postprocess(self, output, scale, pad):
+        """YOLOv5 raw 출력 (1, N, 5 + nc)을 원본 좌표계 (N, 6)로 변환"""
+        pred = output[0]
+        obj = pred[:, 4]
+        pred = pred[obj >= self.conf_threshold]
+        if not len(pred):
+            return np.zeros((0, 6), dtype=np.float32)
+
+        cls_scores = pred[:, 5:] * pred[:, 4:5]
+        cls = cls_scores.argmax(1)
+        conf = cls_scores[np.arange(len(cls)), cls]
+        mask = conf >= self.conf_threshold
+        pred, cls, conf = pred[mask], cls[mask], conf[mask]
+        if not len(pred):
+            return np.zeros((0, 6), dtype=np.float32)
+
+        cx, cy, w, h = pred[:, 0], pred[:, 1], pred[:, 2], pred[:, 3]
+        boxes = np.stack([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], 1)
+        # 클래스별 NMS를 위해 클래스마다 좌표 오프셋 적용
+        keep = nms(boxes + cls[:, None] * 4096.0, conf, self.iou_threshold)[:self.max_det]
+        boxes, conf, cls = boxes[keep], conf[keep], cls[keep]
+
+        boxes[:, [0, 2]] -= pad[0]
+        boxes[:, [1, 3]] -= pad[1]
+        boxes /= scale
+        return np.hstack([boxes, conf[:, None], cls[:, None]]).astype(np.float32)
+
+
+class OnnxDetector(Detector):
+    name = "onnx"
+
+    def _load(self):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if self.threads:
+            options.intra_op_num_threads = self.threads
+            options.inter_op_num_threads = 1
+        self.session = ort.InferenceSession(self.model_path, options, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+
+        shape = self.session.get_inputs()[0].shape
+        if isinstance(shape[-1], int):
+            self.imgsz = shape[-1]
+        else:
+            # --dynamic 으로 export된 모델
+            self.dynamic_size = True
+
+        meta = self.session.get_modelmeta().custom_metadata_map
+        if "names" in meta:
+            self.names = ast.literal_eval(meta["names"])
+
+    def __call__(self, image, size=None):
+        blob, scale, pad = self._preprocess(image, size)
+        output = self.session.run(None, {self.input_name: blob})[0]
+        return self._postprocess(output, scale, pad)
+
+
+class TorchScriptDetector(Detector):
+    name = "torchscript"
+
+    def _load(self):
+        import torch
+
+        if self.threads:
+            torch.set_num_threads(self.threads)
+        extra = {"config.txt": ""}
+        self.model = torch.jit.load(self.model_path, map_location="cpu", _extra_files=extra)
+        self.model.eval()
+        if extra["config.txt"]:
+            config = json.loads(extra["config.txt"])
+            self.imgsz = config.get("shape", [self.imgsz])[-1]
+            self.names = config.get("names", {})
+            if isinstance(self.names, list):
+                self.names = dict(enumerate(self.names))
+
+    def __call__(self, image, size=None):
+        import torch
+
+        blob, scale, pad = self._preprocess(image, size)
+        with torch.no_grad():
+            output = self.model(torch.from_numpy(blob))
+        if isinstance(output, (list, tuple)):
+            output = output[0]
+        return self._postprocess(output.numpy(), scale, pad)
+
+
+class HubDetector(Detector):
+    name = "hub"
+
+    def _load(self):
+        import pathlib
+        import torch
+
+        # Windows에서 저장된 best.pt 로드용
+        pathlib.WindowsPath = pathlib.PosixPath
+        if self.threads:
+            torch.set_num_threads(self.threads)
+        self.model = torch.hub.load(
+            'ultralytics/yolov5:v7.0',
+            'custom',
+            path=self.model_path,
+            force_reload=False
+        )
+        self.model.to('cuda' if torch.cuda.is_available() else 'cpu')
+        self.model.eval()
+        self.names = getattr(self.model, "names", {}) or {}
+        self.dynamic_size = True
+
+    def __call__(self, image, size=None):
+        import torch
+
+        with torch.no_grad():
+            results = self.model(image) if size is None else self.model(image, size=size)
+        return results.xyxy[0]
+
+
+class MultiResolutionDetector:
+    """
+    저해상도 전체 프레임 탐지로 타깃을 찾고, 타깃이 ROI 주변 창 안에 들어오면
+    해당 창만 잘라 고해상도로 탐지한다. 결과 좌표는 전체 프레임 기준으로 되돌린다.
+
+    입력 크기를 바꿀 수 있는 백엔드(dynamic_size)에서만 동작한다. 고정 shape으로 export된
+    ONNX/TorchScript는 두 패스 모두 export 크기로 추론하므로 줄어드는 연산 없이 창 밖에서는
+    두 번 추론하게 된다. 이 경우 전체 프레임 1회 추론으로 대신한다.
+    """
+
+    def __init__(self, detector, coarse_size=192, fine_size=224, margin=40):
+        self.detector = detector
+        self.coarse_size = coarse_size
+        self.fine_size = fine_size
+        self.margin = margin
+        self.enabled = bool(getattr(detector, "dynamic_size", False))
+        self.counts = {"full": 0, "coarse": 0, "fine": 0, "fine_miss": 0}
+        self.input_pixels = 0
+        self.frames = 0
+        self.inferences = 0
+        self.infer_seconds = 0.0
+        if not self.enabled:
+            print(f"Multi-resolution inference disabled: detector [{getattr(detector, 'name', '?')}] "
+                  f"has a fixed input size ({detector.input_size()}), using full-frame inference")
+
+    @property
+    def names(self):
+        return self.detector.names
+
+    def window(self, roi, shape):
+        h, w = shape[:2]
+        x1, y1, x2, y2 = roi
+        return (max(0, int(x1) - self.margin), max(0, int(y1) - self.margin),
+                min(w, int(x2) + self.margin), min(h, int(y2) + self.margin))
+
+    def __call__(self, image, roi, last_box=None):
+        t0 = time.perf_counter()
+        try:
+            return self._detect(image, roi, last_box)
+        finally:
+            self.frames += 1
+            self.infer_seconds += time.perf_counter() - t0
+
+    def _run(self, image, size=None):
+        self.inferences += 1
+        self.input_pixels += self.detector.input_size(size) ** 2
+        return self.detector(image) if size is None else self.detector(image, size=size)
+
+    def _detect(self, image, roi, last_box):
+        from util.detection import shift_predictions
+
+        if not self.enabled:
+            self.counts["full"] += 1
+            return self._run(image)
+
+        wx1, wy1, wx2, wy2 = self.window(roi, image.shape)
+        if last_box is not None:
+            bx1, by1, bx2, by2 = last_box
+            if bx1 >= wx1 and by1 >= wy1 and bx2 <= wx2 and by2 <= wy2:
+                pred = self._run(image[wy1:wy2, wx1:wx2], self.fine_size)
+                if len(pred):
+                    self.counts["fine"] += 1
+                    return shift_predictions(pred, wx1, wy1)
+                self.counts["fine_miss"] += 1
+
+        self.counts["coarse"] += 1
+        return self._run(image, self.coarse_size)
+
+    def report(self):
+        frames = self.frames
+        return {
+            **self.counts,
+            "enabled": self.enabled,
+            "avg_input_px": round(self.input_pixels / self.inferences) if self.inferences else 0,
+            "inferences_per_frame": round(self.inferences / frames, 2) if frames else 0.0,
+            "infer_avg_ms": round(self.infer_seconds / frames * 1000.0, 2) if frames else 0.0,
+        }
+
+
+BACKENDS = {
+    "onnx": (OnnxDetector, ".onnx"),
+    "torchscript": (TorchScriptDetector, ".torchscript"),
+    "hub": (HubDetector, ".pt"),
+}
+
+
+def create_detector(weights_path, backend=None, imgsz=None, threads=None, warmup=None):
+    """
+    설정(인자 또는 환경 변수)에 맞는 탐지 백엔드를 생성한다.
+    weights_path는 확장자를 제외한 기준 경로로도 쓰인다 (best.pt -> best.onnx, best.torchscript).
+    """
+    backend = backend or os.getenv("AGV_DETECTOR_BACKEND", "auto")
+    imgsz = imgsz or int(os.getenv("AGV_DETECTOR_IMGSZ", "320"))
+    threads = threads or int(os.getenv("AGV_DETECTOR_THREADS", "0")) or None
+    warmup = warmup if warmup is not None else int(os.getenv("AGV_DETECTOR_WARMUP", "2"))
+
+    stem = os.path.splitext(weights_path)[0]
+    if backend == "auto":
+        for name in ("onnx", "torchscript"):
+            if os.path.exists(stem + BACKENDS[name][1]):
+                backend = name
+                break
+        else:
+            backend = "hub"
+
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown detector backend: {backend}")
+
+    cls, ext = BACKENDS[backend]
+    return cls(stem + ext, imgsz=imgsz, threads=threads, warmup=warmup)
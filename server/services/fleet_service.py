@@ -0,0 +1,301 @@
+import collections
+import heapq
+import itertools
+import math
+import os
+import threading
+import time
+
+from util.telemetry import decode_status
+
+# 작업 종료 상태 -> stats 키
+FINISH_STATS = {"done": "completed", "rejected": "rejected", "timeout": "timeouts"}
+
+class FleetRobot:
+    def __init__(self, robot_id, position=None, require_heartbeat=False):
+        self.id = str(robot_id)
+        self.cmd_topic = f"AGV/CMD/{self.id}"
+        self.status_topic = f"AGV/STATUS/{self.id}"
+        self.position = position
+        self.require_heartbeat = require_heartbeat
+        self.state = "idle"  # idle | busy | offline
+        self.last_seen = None
+        self.job = None
+        self.job_started = 0.0
+        self.job_seen_busy = False
+        self.completed = 0
+        self.version = 0  # idle 힙 항목 무효화용
+
+    def snapshot(self, now):
+        return {
+            "id": self.id,
+            "state": self.state,
+            "position": self.position,
+            "cmd_topic": self.cmd_topic,
+            "last_seen_s": None if self.last_seen is None else round(now - self.last_seen, 2),
+            "job": self.job.id if self.job else None,
+            "completed": self.completed,
+        }
+
+
+class FleetRequest:
+    __slots__ = ("id", "command", "priority", "deadline", "location", "created",
+                 "assigned_at", "robot_id", "state")
+
+    def __init__(self, request_id, command, priority, deadline, location, created):
+        self.id = request_id
+        self.command = command
+        self.priority = priority
+        self.deadline = deadline
+        self.location = location
+        self.created = created
+        self.assigned_at = None
+        self.robot_id = None
+        self.state = "pending"  # pending | assigned | done | rejected | timeout | expired
+
+    def snapshot(self):
+        return {
+            "id": self.id,
+            "command": self.command,
+            "priority": self.priority,
+            "state": self.state,
+            "robot_id": self.robot_id,
+        }
+
+
+class FleetService:
+    """
+    AGV 레지스트리 + 작업 디스패처.
+
+    대기 요청은 (우선순위, 마감시각, 도착순) 힙, 유휴 로봇은 (완료 작업 수) 힙으로 관리하여
+    idlest 정책의 할당은 O(log n)이다. nearest 정책은 유휴 로봇 중 거리 최소를 고른다.
+    """
+
+    def __init__(self, mqtt=None, policy=None, heartbeat_timeout=5.0, job_timeout=None):
+        self.mqtt = mqtt
+        self.policy = policy or os.getenv("FLEET_POLICY", "idlest")
+        self.heartbeat_timeout = heartbeat_timeout
+        self.job_timeout = job_timeout or float(os.getenv("FLEET_JOB_TIMEOUT", "30"))
+
+        self.robots = {}
+        self._pending = []  # (-priority, deadline, seq, request)
+        self._idle = []     # (completed, seq, robot_id, version)
+        self._seq = itertools.count()
+        self._request_ids = itertools.count(1)
+        self._lock = threading.RLock()
+        self._running = False
+        self._thread = None
+
+        self.wait_times = collections.deque(maxlen=1000)
+        self.stats = {"submitted": 0, "assigned": 0, "completed": 0, "rejected": 0, "timeouts": 0,
+                      "expired": 0, "requeued": 0}
+
+    # ----- 레지스트리 -----
+    def register(self, robot_id, position=None, require_heartbeat=False, now=None):
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            robot = self.robots.get(str(robot_id))
+            if robot is None:
+                robot = FleetRobot(robot_id, position, require_heartbeat)
+                self.robots[robot.id] = robot
+                if require_heartbeat:
+                    # 첫 상태 메시지를 받을 때까지 할당하지 않음
+                    robot.state = "offline"
+                else:
+                    self._mark_idle(robot)
+            elif position is not None:
+                robot.position = position
+            self._dispatch(now)
+            return robot
+
+    def unregister(self, robot_id, now=None):
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            robot = self.robots.pop(str(robot_id), None)
+            if robot is not None:
+                robot.version += 1
+                self._requeue(robot)
+                self._dispatch(now)
+
+    @property
+    def default_topic(self):
+        with self._lock:
+            for robot in self.robots.values():
+                return robot.cmd_topic
+        return "AGV/CMD/1"
+
+    # ----- 요청 -----
+    def submit(self, command="drink", priority=0, deadline=None, location=None, now=None):
+        """작업 요청 등록. deadline은 현재부터의 초 단위 유효 시간"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            request = FleetRequest(
+                next(self._request_ids), command, priority,
+                math.inf if deadline is None else now + deadline, location, now,
+            )
+            heapq.heappush(self._pending, (-priority, request.deadline, next(self._seq), request))
+            self.stats["submitted"] += 1
+            self._dispatch(now)
+            return request
+
+    def on_status(self, robot_id, status, now=None):
+        """AGV/STATUS/<id> 수신. 하트비트 갱신, 위치/상태 반영"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            robot = self.robots.get(str(robot_id))
+            if robot is None:
+                return
+            robot.last_seen = now
+            if isinstance(status, dict):
+                if status.get("position") is not None:
+                    robot.position = tuple(status["position"])
+                state = status.get("state")
+            else:
+                state = None
+
+            if robot.state == "offline":
+                robot.state = "idle"
+                self._mark_idle(robot)
+            if robot.job is not None:
+                if state == "busy":
+                    robot.job_seen_busy = True
+                # 할당 직후 명령 수신 전의 idle 프레임으로 작업이 끝나지 않도록 busy를 본 뒤의 idle만 완료로 본다
+                elif state == "done" or (state == "idle" and robot.job_seen_busy):
+                    self._finish(robot, now)
+                # JetBot이 실행할 동작이 없는 명령(drink 등)은 작업 id와 함께 rejected로 보고한다.
+                # 이전 작업의 rejected 프레임으로 풀리지 않도록 id가 같을 때만 해제
+                elif state == "rejected" and status.get("job") == robot.job.id:
+                    self._finish(robot, now, "rejected")
+            self._dispatch(now)
+
+    def complete(self, robot_id, now=None):
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            robot = self.robots.get(str(robot_id))
+            if robot is not None and robot.job is not None:
+                self._finish(robot, now)
+                self._dispatch(now)
+
+    def tick(self, now=None):
+        """하트비트/작업 시간 초과 처리 후 디스패치"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            for robot in self.robots.values():
+                if robot.state == "busy" and now - robot.job_started > self.job_timeout:
+                    print(f"[FLEET] AGV {robot.id} job {robot.job.id} timed out")
+                    self._finish(robot, now, "timeout")
+                alive = robot.last_seen is not None and now - robot.last_seen <= self.heartbeat_timeout
+                if robot.state != "offline" and robot.require_heartbeat and not alive:
+                    print(f"[FLEET] AGV {robot.id} heartbeat lost")
+                    robot.state = "offline"
+                    robot.version += 1
+                    self._requeue(robot)
+            self._dispatch(now)
+
+    # ----- 내부 -----
+    def _mark_idle(self, robot):
+        robot.state = "idle"
+        robot.version += 1
+        heapq.heappush(self._idle, (robot.completed, next(self._seq), robot.id, robot.version))
+
+    def _finish(self, robot, now, state="done"):
+        robot.job.state = state
+        robot.job = None
+        robot.completed += 1
+        self.stats[FINISH_STATS[state]] += 1
+        self._mark_idle(robot)
+
+    def _requeue(self, robot):
+        if robot.job is not None:
+            request = robot.job
+            robot.job = None
+            request.state = "pending"
+            request.robot_id = None
+            heapq.heappush(self._pending, (-request.priority, request.deadline, next(self._seq), request))
+            self.stats["requeued"] += 1
+
+    def _pop_request(self, now):
+        while self._pending:
+            request = self._pending[0][3]
+            if request.deadline < now:
+                heapq.heappop(self._pending)
+                request.state = "expired"
+                self.stats["expired"] += 1
+                continue
+            return request
+        return None
+
+    def _pop_idle_robot(self, request):
+        if self.policy == "nearest" and request.location is not None:
+            candidates = [r for r in self.robots.values() if r.state == "idle" and r.position is not None]
+            if candidates:
+                robot = min(candidates, key=lambda r: math.dist(r.position, request.location))
+                robot.version += 1  # 힙에 남은 항목 무효화
+                return robot
+
+        while self._idle:
+            _, _, robot_id, version = heapq.heappop(self._idle)
+            robot = self.robots.get(robot_id)
+            if robot is not None and robot.state == "idle" and robot.version == version:
+                return robot
+        return None
+
+    def _dispatch(self, now):
+        while True:
+            request = self._pop_request(now)
+            if request is None:
+                return
+            robot = self._pop_idle_robot(request)
+            if robot is None:
+                return
+            heapq.heappop(self._pending)
+
+            robot.state = "busy"
+            robot.job = request
+            robot.job_started = now
+            robot.job_seen_busy = False
+            request.state = "assigned"
+            request.robot_id = robot.id
+            request.assigned_at = now
+            self.wait_times.append(now - request.created)
+            self.stats["assigned"] += 1
+            if self.mqtt is not None:
+                # 작업 명령은 대체(coalesce)되면 안 된다. job id는 텔레메트리로 되돌아온다
+                self.mqtt.command(robot.cmd_topic, request.command, coalesce=False, job=request.id)
+
+    # ----- 수명 주기 -----
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        if self.mqtt is not None:
+            self.mqtt.subscribe("AGV/STATUS/+", self._on_status_message)
+        self._thread = threading.Thread(target=self._tick_loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        if self._thread:
+            self._thread.join(timeout=2.0)
+
+    def _on_status_message(self, topic, payload):
+        self.on_status(topic.rsplit("/", 1)[-1], decode_status(payload))
+
+    def _tick_loop(self):
+        while self._running:
+            self.tick()
+            time.sleep(0.5)
+
+    def snapshot(self):
+        now = time.monotonic()
+        with self._lock:
+            pending = [entry[3].snapshot() for entry in sorted(self._pending) if entry[3].deadline >= now]
+            waits = sorted(self.wait_times)
+            return {
+                "policy": self.policy,
+                "robots": [robot.snapshot(now) for robot in self.robots.values()],
+                "pending": pending,
+                "stats": dict(self.stats),
+                "wait_p50_s": round(waits[len(waits) // 2], 3) if waits else 0.0,
+                "wait_p95_s": round(waits[int(len(waits) * 0.95)], 3) if waits else 0.0,
+            }
@@ -0,0 +1,66 @@
+import os
+import threading
+import types
+
+_hardware = None
+_lock = threading.Lock()
+
+
+def _mock_hardware():
+    import numpy as np
+
+    class Robot:
+        def stop(self): pass
+        def forward(self, x): pass
+        def backward(self, x): pass
+        def left(self, x): pass
+        def right(self, x): pass
+        def set_motors(self, left, right): pass
+    class Camera:
+        @staticmethod
+        def instance(width, height): return Camera()
+        def start(self): pass
+        def stop(self): pass
+        @property
+        def value(self): return np.zeros((300, 300, 3), dtype=np.uint8)
+        def observe(self, callback, names): pass
+        def unobserve(self, callback, names): pass
+    class TTLServo:
+        @staticmethod
+        def servoAngleCtrl(*args): pass
+
+    def bgr8_to_jpeg(value, quality=75):
+        import cv2
+        return bytes(cv2.imencode('.jpg', value)[1])
+
+    return Robot, Camera, TTLServo, bgr8_to_jpeg
+
+
+def load():
+    """
+    jetbot/SCSCtrl 라이브러리를 처음 필요할 때 불러온다.
+    라이브러리가 없으면 mock 클래스로 대체한다.
+    AGV_FRAME_BUS가 설정되면 카메라 대신 공유 메모리 프레임 버스를 읽는다 (util.framebus).
+    """
+    global _hardware
+    with _lock:
+        if _hardware is None:
+            try:
+                from jetbot import Robot, Camera, bgr8_to_jpeg
+                from SCSCtrl import TTLServo
+            except ImportError:
+                print("Warning: Jetbot/SCSCtrl libraries not found. Running in mock mode.")
+                Robot, Camera, TTLServo, bgr8_to_jpeg = _mock_hardware()
+
+            bus = os.getenv("AGV_FRAME_BUS")
+            if bus:
+                from util.framebus import BusCamera
+                Camera = BusCamera.factory(bus)
+
+            _hardware = types.SimpleNamespace(
+                Robot=Robot,
+                Camera=Camera,
+                TTLServo=TTLServo,
+                bgr8_to_jpeg=bgr8_to_jpeg,
+            )
+        return _hardware
@@ -0,0 +1,285 @@
+"""
+LLM 라우팅 계층
+
+여러 provider(OpenAI, OpenAI 호환 로컬 서버 등)를 순서대로 두고 요청마다
+    - 전체 deadline 안에서만 기다리고
+    - 1순위 응답이 최근 지연의 p95(hedge_quantile)를 넘기면 다음 provider로 hedge 요청을 하나 더 보내 먼저 온 답을 쓰며
+    - 실패하면 다음 provider로 넘기고
+    - deadline을 넘기거나 모두 실패하면 규칙 기반 응답(RuleProvider)으로 유효한 Result를 만든다.
+
+provider 설정 (LLM_PROVIDERS, 쉼표 구분, 앞이 1순위):
+    gpt-4o                                  OpenAI
+    llama3.2:3b@http://localhost:11434/v1   OpenAI 호환 서버 (ollama, vLLM 등)
+"""
+import asyncio
+import collections
+import time
+
+from util import metrics
+from util.intent import classify, FAST_RESPONSES
+from schemas.chat_schema import Result
+
+PROVIDER_SECONDS = metrics.histogram("llm_provider_seconds", "LLM provider call latency", ["provider"])
+PROVIDER_ERRORS = metrics.counter("llm_provider_errors_total", "LLM provider call failures", ["provider"])
+HEDGES = metrics.counter("llm_hedges_total", "Hedged LLM requests")
+FALLBACKS = metrics.counter("llm_fallbacks_total", "Requests answered by the rule-based fallback", ["reason"])
+
+UNKNOWN_RESPONSE = "모르겠고 한잔하시죠."
+
+
+class LatencyTracker:
+    """최근 성공 지연(초) 기록. 표본이 적으면 percentile은 None"""
+
+    def __init__(self, size=200, min_samples=20):
+        self.samples = collections.deque(maxlen=size)
+        self.min_samples = min_samples
+
+    def add(self, seconds):
+        self.samples.append(seconds)
+
+    def percentile(self, q):
+        if len(self.samples) < self.min_samples:
+            return None
+        values = sorted(self.samples)
+        return values[min(len(values) - 1, int(len(values) * q))]
+
+
+class ChainProvider:
+    """
+    LangChain 체인 한 쌍을 감싼 provider.
+        chain        : ainvoke(inputs) -> Result 또는 include_raw dict {"raw", "parsed", "parsing_error"}
+        stream_chain : astream(inputs) -> 부분 dict
+    """
+
+    def __init__(self, name, chain, stream_chain=None):
+        self.name = name
+        self.chain = chain
+        self.stream_chain = stream_chain
+        self.latency = LatencyTracker()
+        self.stats = {"calls": 0, "errors": 0, "cancelled": 0, "wins": 0}
+        self._seconds = PROVIDER_SECONDS.labels(name)
+        self._errors = PROVIDER_ERRORS.labels(name)
+
+    async def invoke(self, inputs):
+        """(Result, 원본 메시지 또는 None)"""
+        result = await self.chain.ainvoke(inputs)
+        raw = None
+        if isinstance(result, dict):
+            raw = result.get("raw")
+            if result.get("parsing_error") is not None:
+                raise result["parsing_error"]
+            result = result["parsed"]
+        return result, raw
+
+    def record(self, seconds):
+        self.latency.add(seconds)
+        self._seconds.observe(seconds)
+
+    def record_error(self):
+        self.stats["errors"] += 1
+        self._errors.inc()
+
+    def report(self):
+        p50 = self.latency.percentile(0.5)
+        p95 = self.latency.percentile(0.95)
+        return dict(
+            self.stats,
+            p50_ms=None if p50 is None else round(p50 * 1000.0, 1),
+            p95_ms=None if p95 is None else round(p95 * 1000.0, 1),
+        )
+
+
+class RuleProvider:
+    """LLM 없이 응답하는 마지막 대안. 명백한 잔 채우기/거절만 명령으로 바꾸고 나머지는 페르소나 규칙 1-3 응답"""
+
+    name = "rules"
+
+    def answer(self, question):
+        command = classify(question)
+        if command is None:
+            return Result(response=UNKNOWN_RESPONSE, command="None")
+        return Result(response=FAST_RESPONSES[command], command=command)
+
+
+class LLMRouter:
+    """
+    deadline    : 요청 전체 제한 시간 (초). 넘기면 규칙 기반 응답
+    hedge       : hedge 요청 사용 여부
+    hedge_quantile / hedge_after : 1순위 provider 지연의 이 분위수를 넘기면 hedge (표본이 적으면 hedge_after 초)
+    """
+
+    def __init__(self, providers, fallback=None, deadline=8.0, hedge=True, hedge_quantile=0.95,
+                 hedge_after=3.0, hedge_min=0.2):
+        if not providers:
+            raise ValueError("LLMRouter requires at least one provider")
+        self.providers = list(providers)
+        self.fallback = fallback or RuleProvider()
+        self.deadline = deadline
+        self.hedge = hedge
+        self.hedge_quantile = hedge_quantile
+        self.hedge_after = hedge_after
+        self.hedge_min = hedge_min
+        self.stats = {"requests": 0, "hedged": 0, "hedge_wins": 0, "failovers": 0, "fallbacks": 0, "timeouts": 0}
+
+    def hedge_delay(self, provider):
+        delay = provider.latency.percentile(self.hedge_quantile)
+        return max(self.hedge_min, self.hedge_after if delay is None else delay)
+
+    async def _call(self, provider, inputs):
+        provider.stats["calls"] += 1
+        t0 = time.perf_counter()
+        try:
+            result = await provider.invoke(inputs)
+        except asyncio.CancelledError:
+            provider.stats["cancelled"] += 1
+            raise
+        except Exception:
+            provider.record_error()
+            raise
+        provider.record(time.perf_counter() - t0)
+        return result
+
+    def _fallback(self, question, reason, info):
+        self.stats["fallbacks"] += 1
+        FALLBACKS.labels(reason).inc()
+        info.update(provider=self.fallback.name, fallback=reason)
+        return self.fallback.answer(question)
+
+    async def invoke(self, inputs, info=None):
+        """
+        Result를 반환한다 (예외를 던지지 않음).
+        info에는 provider, attempts, hedged, fallback(사유), raw(원본 메시지)가 기록된다.
+        """
+        info = {} if info is None else info
+        info.update(provider=None, attempts=[], hedged=False, fallback=None, raw=None)
+        self.stats["requests"] += 1
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        deadline = start + self.deadline
+        queue = list(self.providers)
+        pending = {}
+
+        def launch(provider):
+            task = asyncio.ensure_future(self._call(provider, inputs))
+            pending[task] = provider
+            info["attempts"].append(provider.name)
+            return task
+
+        primary = queue.pop(0)
+        hedge_task = None
+        hedge_at = start + self.hedge_delay(primary) if self.hedge else None
+        launch(primary)
+        errors = []
+        try:
+            while pending:
+                now = loop.time()
+                if now >= deadline:
+                    self.stats["timeouts"] += 1
+                    break
+                wake = deadline if hedge_at is None else min(deadline, hedge_at)
+                done, _ = await asyncio.wait(pending, timeout=max(0.0, wake - now),
+                                             return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    provider = pending.pop(task)
+                    try:
+                        result, raw = task.result()
+                    except Exception as e:
+                        errors.append(f"{provider.name}: {e}")
+                        continue
+                    provider.stats["wins"] += 1
+                    if task is hedge_task:
+                        self.stats["hedge_wins"] += 1
+                    info.update(provider=provider.name, raw=raw)
+                    return result
+
+                # 실패한 요청만 남았으면 다음 provider로 넘긴다
+                if not pending and queue and loop.time() < deadline:
+                    self.stats["failovers"] += 1
+                    launch(queue.pop(0))
+                    hedge_at = None
+                # 1순위가 느리면 hedge 요청 (다음 provider, 없으면 같은 provider)
+                if hedge_at is not None and loop.time() >= hedge_at and pending:
+                    hedge_at = None
+                    self.stats["hedged"] += 1
+                    HEDGES.inc()
+                    info["hedged"] = True
+                    hedge_task = launch(queue.pop(0) if queue else primary)
+        finally:
+            for task in pending:
+                task.cancel()
+
+        if errors:
+            print(f"LLM providers failed: {'; '.join(errors)}")
+        reason = "deadline" if loop.time() >= deadline else "error"
+        return self._fallback(inputs["question"], reason, info)
+
+    async def stream(self, inputs, info=None):
+        """
+        부분 dict를 내보낸다. 첫 조각이 deadline 안에 오지 않거나 그 전에 실패하면 다음 provider,
+        모두 안 되면 규칙 기반 응답을 완성된 dict 하나로 내보낸다.
+        """
+        info = {} if info is None else info
+        info.update(provider=None, attempts=[], hedged=False, fallback=None, raw=None)
+        self.stats["requests"] += 1
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.deadline
+        reason = "error"
+        for i, provider in enumerate(self.providers):
+            if provider.stream_chain is None:
+                continue
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                reason = "deadline"
+                break
+            if i > 0:
+                self.stats["failovers"] += 1
+            info["attempts"].append(provider.name)
+            provider.stats["calls"] += 1
+            t0 = time.perf_counter()
+            chunks = provider.stream_chain.astream(inputs)
+            try:
+                first = await asyncio.wait_for(chunks.__anext__(), remaining)
+            except StopAsyncIteration:
+                continue
+            except asyncio.TimeoutError:
+                provider.record_error()
+                await chunks.aclose()
+                self.stats["timeouts"] += 1
+                reason = "deadline"
+                continue
+            except Exception as e:
+                print(f"LLM provider [{provider.name}] stream failed: {e}")
+                provider.record_error()
+                await chunks.aclose()
+                reason = "error"
+                continue
+
+            provider.stats["wins"] += 1
+            info["provider"] = provider.name
+            yield first
+            async for partial in chunks:
+                yield partial
+            provider.record(time.perf_counter() - t0)
+            return
+
+        result = self._fallback(inputs["question"], reason, info)
+        yield {"command": result.command, "response": result.response}
+
+    def report(self):
+        return dict(self.stats, providers={p.name: p.report() for p in self.providers})
+
+
+def build_providers(specs, make_chains):
+    """
+    "model" 또는 "model@base_url" 목록 -> ChainProvider 목록.
+    make_chains(model, base_url) -> (chain, stream_chain)
+    """
+    providers = []
+    for spec in specs.split(","):
+        spec = spec.strip()
+        if not spec:
+            continue
+        model, _, base_url = spec.partition("@")
+        chain, stream_chain = make_chains(model, base_url or None)
+        providers.append(ChainProvider(spec, chain, stream_chain))
+    return providers
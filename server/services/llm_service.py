@@ -1,47 +1,442 @@
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_openai import ChatOpenAI
+import asyncio
+import os
+import threading
+import time
+
 from dotenv import load_dotenv
 
 from services.mqtt_service import MQTTService
+from services.fleet_service import FleetService
+from util import metrics
 from util.prompt import getPersona
-from schemas.chat_schema import Result
+from util.cache import TTLCache, normalize
+from util.intent import classify, FAST_RESPONSES
+from util.conversation import SessionStore, count_tokens
+from schemas.chat_schema import ChatResponse, Result, command_first_schema
+from services.llm_router import LLMRouter, build_providers
 
 load_dotenv()
 
+REQUESTS = metrics.counter("llm_requests_total", "Chat requests by how they were answered", ["source"])
+UPSTREAM_SECONDS = metrics.histogram("llm_upstream_seconds", "LLM upstream call latency", ["mode"])
+TOKENS = metrics.counter("llm_tokens_total", "LLM token usage (non-streaming calls)", ["type"])
+ERRORS = metrics.counter("llm_errors_total", "Chat requests that failed", ["mode"])
+CACHE_ENTRIES = metrics.gauge("llm_cache_entries", "Cached chat answers")
+SESSIONS = metrics.gauge("llm_sessions", "Active chat sessions")
+PROMPT_TOKENS = metrics.histogram("llm_prompt_tokens", "Estimated prompt tokens per upstream call", ["mode"],
+                                  buckets=(250, 500, 1000, 1500, 2000, 3000, 4000, 6000, 8000, 16000))
+
+SUMMARY_PROMPT = (
+    "너는 대화 기록을 요약하는 도우미다. 기존 요약과 새 대화를 합쳐 한국어로 {max_tokens}토큰 이내로 요약한다. "
+    "사용자의 이름/취향/요청(특히 잔 채우기, 음주 거절 여부)과 아직 처리되지 않은 요청만 남기고, "
+    "말투나 농담은 생략한다. 요약문만 출력한다."
+)
+
 
 class LLMService:
     def __init__(self):
         self.mqtt = MQTTService()
-        self.mqtt.connect()
+        self.fleet = FleetService(self.mqtt)
+        for robot_id in os.getenv("AGV_FLEET", "1").split(","):
+            if robot_id.strip():
+                self.fleet.register(robot_id.strip())
+        self.router = None
+        self._load_lock = threading.Lock()
 
-        llm = ChatOpenAI(
-            model="gpt-4o",
-            temperature=0.5,
+        self.cache = TTLCache(
+            maxsize=int(os.getenv("LLM_CACHE_SIZE", "256")),
+            ttl=float(os.getenv("LLM_CACHE_TTL", "600")),
         )
+        self.fast_path = os.getenv("LLM_FAST_PATH", "0") == "1"
+        # 페르소나/few-shot은 모든 요청에서 같은 문자열이어야 provider prompt caching이 적용된다
+        self.persona = getPersona()
+        self.persona_tokens = count_tokens(self.persona)
+        self.sessions = SessionStore(
+            self._summarize,
+            max_sessions=int(os.getenv("LLM_MAX_SESSIONS", "1000")),
+            ttl=float(os.getenv("LLM_SESSION_TTL", "3600")),
+            history_budget=int(os.getenv("LLM_HISTORY_TOKENS", "1200")),
+            summary_budget=int(os.getenv("LLM_SUMMARY_TOKENS", "300")),
+        )
+        self._inflight = {}
+        self.stats = {
+            "requests": 0,
+            "cache_hits": 0,
+            "coalesced": 0,
+            "fast_path": 0,
+            "upstream_calls": 0,
+            "upstream_avg_ms": 0.0,
+            "saved_ms": 0.0,
+            "streams": 0,
+            "first_action_avg_ms": 0.0,
+            "prompt_tokens_avg": 0.0,
+        }
+
+    def load(self):
+        """MQTT 연결 및 LangChain 체인 생성 (서버 시작 시 백그라운드에서 호출)"""
+        with self._load_lock:
+            if self.router is not None:
+                return
+
+            # langchain은 import 비용이 커서 로드 시점에 불러온다
+            import httpx
+            from langchain_core.messages import SystemMessage
+            from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+            from langchain_openai import ChatOpenAI
+
+            self.mqtt.connect()
+            self.fleet.start()
+
+            deadline = float(os.getenv("LLM_DEADLINE", "8.0"))
+
+            # 모든 provider/요약 호출이 keep-alive 연결 풀 하나를 공유한다
+            # (ChatOpenAI 인스턴스마다 따로 만들면 요청마다 TLS 연결을 새로 맺는 경우가 생긴다)
+            limits = httpx.Limits(
+                max_connections=int(os.getenv("LLM_MAX_CONNECTIONS", "32")),
+                max_keepalive_connections=int(os.getenv("LLM_MAX_KEEPALIVE", "16")),
+                keepalive_expiry=float(os.getenv("LLM_KEEPALIVE_EXPIRY", "120")),
+            )
+            self.http_client = httpx.Client(limits=limits, timeout=deadline)
+            self.http_async_client = httpx.AsyncClient(limits=limits, timeout=deadline)
+
+            def make_llm(model, base_url, **kwargs):
+                # 재시도/대기는 라우터가 맡으므로 클라이언트 자체 재시도는 끈다
+                options = {"model": model, "timeout": deadline, "max_retries": 0,
+                           "http_client": self.http_client, "http_async_client": self.http_async_client, **kwargs}
+                if base_url:
+                    options.update(base_url=base_url, api_key=os.getenv("LLM_LOCAL_API_KEY", "local"))
+                return ChatOpenAI(**options)
+
+            # 고정 prefix(persona) -> 세션 요약/최근 턴 -> 질문 순서 (prefix가 같아야 캐시 적중)
+            # persona는 완성된 메시지로 한 번만 만들어 두고 요청마다 템플릿 치환하지 않는다
+            self.prompt = ChatPromptTemplate.from_messages([
+                SystemMessage(self.persona),
+                MessagesPlaceholder("history", optional=True),
+                ("human", "{question}"),
+            ])
+
+            def make_chains(model, base_url):
+                llm = make_llm(model, base_url, temperature=0.5)
+                # include_raw: 토큰 사용량(usage_metadata) 집계를 위해 원본 메시지도 받는다
+                structured = llm.with_structured_output(Result, include_raw=True)
+                # 스트리밍: 부분 dict를 받아 command가 정해지는 즉시 전송
+                streaming = llm.with_structured_output(command_first_schema(), method="function_calling")
+                return self.prompt | structured, self.prompt | streaming
+
+            specs = os.getenv("LLM_PROVIDERS", "gpt-4o")
+            providers = build_providers(specs, make_chains)
+            primary, _, primary_url = specs.split(",")[0].strip().partition("@")
+            self.summary_llm = make_llm(primary, primary_url or None, temperature=0.0,
+                                        max_tokens=self.sessions.summary_budget)
+            self.router = LLMRouter(
+                providers,
+                deadline=deadline,
+                hedge=os.getenv("LLM_HEDGE", "1") == "1",
+                hedge_quantile=float(os.getenv("LLM_HEDGE_QUANTILE", "0.95")),
+            )
+
+    @property
+    def is_ready(self):
+        return self.router is not None
+
+    def bind_metrics(self):
+        """수집 시점 메트릭을 이 인스턴스에 연결 (앱 시작 시 한 번, 종료 시 unbind_metrics())"""
+        CACHE_ENTRIES.set_function(lambda: len(self.cache))
+        SESSIONS.set_function(lambda: len(self.sessions))
+
+    def unbind_metrics(self):
+        CACHE_ENTRIES.set_function(None)
+        SESSIONS.set_function(None)
+
+    def close(self):
+        if self.router is not None:
+            self.fleet.stop()
+            self.mqtt.disconnect()
+            self.http_client.close()
+
+    async def aclose(self):
+        """close() + 비동기 연결 풀 정리 (lifespan 종료 시 호출)"""
+        self.close()
+        if self.router is not None:
+            await self.http_async_client.aclose()
+
+    def dispatch(self, command: str):
+        """drink 요청은 디스패처 큐로, 그 외 명령은 기본 AGV로 전송"""
+        if command == "drink":
+            self.fleet.submit(command)
+        else:
+            self.mqtt.command(self.fleet.default_topic, command)
+
+    def metrics(self):
+        stats = dict(self.stats)
+        served = stats["cache_hits"] + stats["coalesced"] + stats["fast_path"]
+        stats["hit_rate"] = round(served / stats["requests"], 3) if stats["requests"] else 0.0
+        stats["cache_size"] = len(self.cache)
+        stats["upstream_avg_ms"] = round(stats["upstream_avg_ms"], 1)
+        stats["saved_ms"] = round(stats["saved_ms"], 1)
+        stats["first_action_avg_ms"] = round(stats["first_action_avg_ms"], 1)
+        stats["prompt_tokens_avg"] = round(stats["prompt_tokens_avg"], 1)
+        stats["sessions"] = dict(self.sessions.stats, active=len(self.sessions))
+        stats["mqtt"] = self.mqtt.metrics()
+        if self.router is not None:
+            stats["router"] = self.router.report()
+        return stats
+
+    def _record_saved(self, kind):
+        self.stats[kind] += 1
+        self.stats["saved_ms"] += self.stats["upstream_avg_ms"]
+        REQUESTS.labels(kind).inc()
+
+    def _record_upstream(self, mode, seconds):
+        ms = seconds * 1000.0
+        self.stats["upstream_calls"] += 1
+        self.stats["upstream_avg_ms"] += (ms - self.stats["upstream_avg_ms"]) / self.stats["upstream_calls"]
+        REQUESTS.labels("upstream").inc()
+        UPSTREAM_SECONDS.labels(mode).observe(seconds)
+
+    def _record_usage(self, message, usage):
+        """응답 메시지의 usage_metadata를 메트릭과 요청별 usage dict에 반영"""
+        metadata = getattr(message, "usage_metadata", None) or {}
+        if metadata:
+            cached = (metadata.get("input_token_details") or {}).get("cache_read", 0)
+            TOKENS.labels("input").inc(metadata.get("input_tokens", 0))
+            TOKENS.labels("output").inc(metadata.get("output_tokens", 0))
+            TOKENS.labels("cached").inc(cached)
+            usage["input_tokens"] = metadata.get("input_tokens", 0)
+            usage["cached_tokens"] = cached
+            usage["output_tokens"] = metadata.get("output_tokens", 0)
+
+    def _inputs(self, question: str, session, usage: dict, mode: str) -> dict:
+        """프롬프트 입력 구성 + 예상 프롬프트 토큰 기록"""
+        history = []
+        history_tokens = 0
+        if session is not None:
+            summary, turns, history_tokens = self.sessions.context(session)
+            if summary:
+                history.append(("system", f"[이전 대화 요약]\n{summary}"))
+            history.extend((turn.role, turn.text) for turn in turns)
 
-        self.structured_llm = llm.with_structured_output(Result)
+        prompt_tokens = self.persona_tokens + history_tokens + count_tokens(question)
+        usage["prompt_tokens"] = prompt_tokens
+        usage["history_tokens"] = history_tokens
+        calls = self.stats["upstream_calls"] + 1
+        self.stats["prompt_tokens_avg"] += (prompt_tokens - self.stats["prompt_tokens_avg"]) / calls
+        PROMPT_TOKENS.labels(mode).observe(prompt_tokens)
+        return {"history": history, "question": question}
 
-        self.prompt = ChatPromptTemplate.from_messages([
-            ("system", "{persona}"),
-            ("human", "{question}"),
+    async def _summarize(self, summary: str, turns, max_tokens: int) -> str:
+        """SessionStore용 요약기: 기존 요약 + 밀려난 턴 -> 새 요약"""
+        if self.router is None:
+            await asyncio.to_thread(self.load)
+        lines = "\n".join(f"{'User' if turn.role == 'human' else 'Assistant'}: {turn.text}" for turn in turns)
+        t0 = time.perf_counter()
+        message = await self.summary_llm.ainvoke([
+            ("system", SUMMARY_PROMPT.format(max_tokens=max_tokens)),
+            ("human", f"[기존 요약]\n{summary or '(없음)'}\n\n[새 대화]\n{lines}"),
         ])
+        UPSTREAM_SECONDS.labels("summary").observe(time.perf_counter() - t0)
+        self._record_usage(message, {})
+        return message.content
 
-        self.chain = self.prompt | self.structured_llm
+    def session_info(self, session_id: str):
+        session = self.sessions.peek(session_id)
+        return None if session is None else self.sessions.describe(session)
 
-    async def ask(self, question: str) -> Result:
+    def reset_session(self, session_id: str):
+        self.sessions.reset(session_id)
+
+    async def ask(self, question: str, session_id: str | None = None) -> ChatResponse:
+        self.stats["requests"] += 1
+        session = self.sessions.get(session_id) if session_id else None
+        usage = {}
+        t0 = time.perf_counter()
         try:
-            result = await self.chain.ainvoke({
-                "persona": getPersona(),
-                "question": question
-            })
+            result = await self._answer(question, session, usage)
             print(result)
-            self.mqtt.publish("AGV/CMD/1", result.command)
-            return result
+            self.dispatch(result.command)
+            if session is not None:
+                self.sessions.record(session, question, result.response)
+            usage["latency_ms"] = round((time.perf_counter() - t0) * 1000.0, 1)
+            return ChatResponse(**result.model_dump(), session_id=session_id, usage=usage)
 
         except Exception as e:
             print(f"LLM Error: {e}")
+            ERRORS.labels("ask").inc()
+
+            return ChatResponse(
+                response="죄송합니다. 처리 중 오류가 발생했습니다.",
+                command="None",
+                session_id=session_id
+            )
+
+    async def ask_stream(self, question: str, session_id: str | None = None):
+        """
+        (event, data) 스트림을 생성한다. event: command | token | done | error
+        command는 결정되는 즉시 MQTT로 전송한다. done에는 session_id와 usage가 추가된다.
+        """
+        self.stats["requests"] += 1
+        self.stats["streams"] += 1
+        session = self.sessions.get(session_id) if session_id else None
+        usage = {}
+        t0 = time.perf_counter()
+        try:
+            async for event, data in self._stream_answer(question, session, usage):
+                if event == "command":
+                    self.dispatch(data)
+                    ms = (time.perf_counter() - t0) * 1000.0
+                    self.stats["first_action_avg_ms"] += (ms - self.stats["first_action_avg_ms"]) / self.stats["streams"]
+                elif event == "done":
+                    if session is not None:
+                        self.sessions.record(session, question, data["response"])
+                    usage["latency_ms"] = round((time.perf_counter() - t0) * 1000.0, 1)
+                    data = dict(data, session_id=session_id, usage=usage)
+                yield event, data
+
+        except Exception as e:
+            print(f"LLM Stream Error: {e}")
+            ERRORS.labels("stream").inc()
 
-            return Result(
+            yield "error", Result(
                 response="죄송합니다. 처리 중 오류가 발생했습니다.",
                 command="None"
-            )
\ No newline at end of file
+            ).model_dump()
+
+    @staticmethod
+    def _cache_key(question: str, session=None):
+        """
+        캐시/합류 키. 대화 맥락(최근 턴/요약)이 있는 세션의 답은 맥락에 따라 달라지므로
+        (예: "한 잔 더?" 뒤의 "응" -> drink) 공유하지 않는다 (None)
+        """
+        if session is not None and (session.turns or session.summary):
+            return None
+        return normalize(question)
+
+    async def _stream_answer(self, question: str, session=None, usage=None):
+        usage = {} if usage is None else usage
+        if self.fast_path:
+            command = classify(question)
+            if command is not None:
+                self._record_saved("fast_path")
+                usage["source"] = "fast_path"
+                async for item in self._replay(Result(response=FAST_RESPONSES[command], command=command)):
+                    yield item
+                return
+
+        # 스트림은 진행 중인 _answer 호출에 합류만 하고 자신은 등록하지 않는다.
+        # 스트림은 클라이언트가 소비하는 속도로 진행되고 연결이 끊기면 중간에 닫히므로
+        # 다른 요청이 그 결과를 기다리게 하지 않는다
+        key = self._cache_key(question, session)
+        cached = None
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is None and key in self._inflight:
+                self._record_saved("coalesced")
+                usage["source"] = "coalesced"
+                cached = await asyncio.shield(self._inflight[key])
+            elif cached is not None:
+                self._record_saved("cache_hits")
+                usage["source"] = "cache"
+        if cached is not None:
+            async for item in self._replay(cached):
+                yield item
+            return
+
+        if self.router is None:
+            await asyncio.to_thread(self.load)
+
+        inputs = self._inputs(question, session, usage, "stream")
+        usage["source"] = "upstream"
+        info = {}
+        t0 = time.perf_counter()
+        command = None
+        sent = ""
+        partial = {}
+        async for partial in self.router.stream(inputs, info):
+            if not partial:
+                continue
+            # command가 먼저 생성되므로 response 키가 나타나면 command는 완성된 상태
+            if command is None and "command" in partial and "response" in partial:
+                command = partial["command"]
+                yield "command", command
+            text = partial.get("response") or ""
+            if len(text) > len(sent):
+                yield "token", text[len(sent):]
+                sent = text
+
+        result = Result(**partial)
+        self._record_upstream("stream", time.perf_counter() - t0)
+        usage.update(provider=info["provider"], fallback=info["fallback"])
+        # 규칙 기반 대체 응답은 캐시하지 않는다 (provider가 회복되면 다시 LLM 응답)
+        if info["fallback"] is None and key is not None:
+            self.cache.put(key, result)
+
+        if command is None:
+            yield "command", result.command
+        yield "done", result.model_dump()
+
+    async def _replay(self, result: Result):
+        yield "command", result.command
+        yield "token", result.response
+        yield "done", result.model_dump()
+
+    async def _answer(self, question: str, session=None, usage=None) -> Result:
+        """
+        fast-path -> 캐시 -> 진행 중 요청 합류 -> LLM 호출 순서로 응답을 구한다.
+        캐시/합류는 맥락 없는 질문(세션 없음 또는 첫 턴)끼리만 질문 기준으로 공유한다.
+        """
+        usage = {} if usage is None else usage
+        if self.fast_path:
+            command = classify(question)
+            if command is not None:
+                self._record_saved("fast_path")
+                usage["source"] = "fast_path"
+                return Result(response=FAST_RESPONSES[command], command=command)
+
+        key = self._cache_key(question, session)
+        if key is None:
+            return await self._invoke(question, session, usage)
+
+        cached = self.cache.get(key)
+        if cached is not None:
+            self._record_saved("cache_hits")
+            usage["source"] = "cache"
+            return cached
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self._record_saved("coalesced")
+            usage["source"] = "coalesced"
+            return await asyncio.shield(pending)
+
+        # 호출은 독립된 task로 돌린다. 먼저 온 요청(클라이언트)이 취소되어도
+        # 합류한 요청들은 같은 결과를 받는다 (CancelledError가 전파되지 않음)
+        task = asyncio.ensure_future(self._invoke(question, session, usage))
+        self._inflight[key] = task
+        task.add_done_callback(lambda done: self._settle(key, done, usage))
+        return await asyncio.shield(task)
+
+    def _settle(self, key, task, usage):
+        """공유 호출 종료: 합류 대상에서 빼고, 정상 LLM 응답만 캐시한다"""
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # exception()으로 예외를 회수해 둔다 (합류한 요청이 없을 때 미회수 경고 방지)
+        if task.cancelled() or task.exception() is not None:
+            return
+        if usage.get("fallback") is None:
+            self.cache.put(key, task.result())
+
+    async def _invoke(self, question: str, session=None, usage=None) -> Result:
+        if self.router is None:
+            await asyncio.to_thread(self.load)
+
+        usage = {} if usage is None else usage
+        inputs = self._inputs(question, session, usage, "invoke")
+        usage["source"] = "upstream"
+        info = {}
+        t0 = time.perf_counter()
+        # 라우터는 예외 대신 deadline/실패 시 규칙 기반 Result를 돌려준다
+        result = await self.router.invoke(inputs, info)
+        self._record_upstream("invoke", time.perf_counter() - t0)
+        self._record_usage(info["raw"], usage)
+        usage.update(provider=info["provider"], hedged=info["hedged"], fallback=info["fallback"])
+        return result
@@ -1,49 +1,307 @@
+import asyncio
+import collections
 import json
+import os
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError
+
 import paho.mqtt.client as mqtt
 
+from util import metrics
+from util.pipeline import StageStats
+
+PUBLISH_SECONDS = metrics.histogram("mqtt_publish_seconds", "MQTT publish latency from enqueue to PUBACK")
+EVENTS = metrics.counter("mqtt_publish_events_total", "MQTT publisher events", ["event"])
+
+
+def _resolve(future, value):
+    """완료되지 않은 Future만 결과를 설정 (다른 스레드에서 먼저 완료/취소될 수 있음)"""
+    if future.done():
+        return
+    try:
+        future.set_result(value)
+    except InvalidStateError:
+        pass
+
+
+class _Outbound:
+    __slots__ = ("topic", "message", "qos", "coalesce", "future", "enqueued")
+
+    def __init__(self, topic, message, qos, coalesce):
+        self.topic = topic
+        self.message = message
+        self.qos = qos
+        self.coalesce = coalesce
+        self.future = Future()
+        self.enqueued = time.perf_counter()
+
+
 class MQTTService:
-    def __init__(self):
-        self.client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2)
+    """
+    논블로킹 MQTT 퍼블리셔.
+    publish()는 큐에 넣고 즉시 반환하며, 전송은 별도 스레드가 연결 상태일 때 수행한다.
+    반환된 Future는 브로커 PUBACK 시 True, 대체/버려지면 False로 완료된다.
+    """
+
+    def __init__(self, broker_ip=None, port=None, max_queue=100, client=None):
+        self.client = client or mqtt.Client(mqtt.CallbackAPIVersion.VERSION2)
         self.client.on_connect = self.on_connect
-        self.broker_ip = "127.0.0.1"
-        self.port = 1883
+        self.client.on_disconnect = self.on_disconnect
+        self.client.on_publish = self.on_publish
+        self.client.on_message = self.on_message
+        self.broker_ip = broker_ip or os.getenv("MQTT_BROKER_IP", "127.0.0.1")
+        self.port = int(port or os.getenv("MQTT_PORT", "1883"))
+        self.max_queue = max_queue
+
+        self.connected = False
+        self._ever_connected = False
+        self._running = False
+        self._sender = None
+        self._cond = threading.Condition()
+        self._queue = collections.deque()
+        self._latest = {}      # topic -> 대기 중인 coalesce 항목
+        self._inflight = {}    # mid -> 전송 후 PUBACK 대기 항목
+        self._early_acks = set()  # 등록 전에 on_publish가 먼저 온 mid
+        self._sent_qos0 = set()   # 완료 처리한 QoS0 mid (뒤늦게 오는 on_publish 무시용, mid 재사용 시 정리)
+        self._subscriptions = {}  # topic filter -> [callback(topic, payload)]
+
+        self.latency = StageStats("mqtt_publish")
+        self.stats = {
+            "sent": 0,
+            "acked": 0,
+            "failed": 0,
+            "superseded": 0,
+            "dropped": 0,
+            "timeouts": 0,
+            "reconnects": 0,
+        }
 
     def connect(self):
         try:
-            self.client.connect(self.broker_ip, self.port, 60)
+            self.client.reconnect_delay_set(min_delay=1, max_delay=30)
+            # 브로커가 아직 없어도 loop 스레드가 재접속을 계속 시도한다
+            self.client.connect_async(self.broker_ip, self.port, 60)
             self.client.loop_start()
+            self._start_sender()
             print(f"✅ MQTT Publisher Ready: {self.broker_ip}")
         except Exception as e:
             print(f"MQTT Connection Failed: {e}")
 
     def disconnect(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._sender:
+            self._sender.join(timeout=1.0)
         self.client.loop_stop()
         self.client.disconnect()
         print("MQTT Publisher Stopped")
 
     def on_connect(self, client, userdata, flags, reason_code, properties):
         if reason_code == 0:
-            print(">> Connected to Broker (Publish Only)")
+            print(">> Connected to Broker")
+            with self._cond:
+                if self._ever_connected:
+                    self._count("reconnects")
+                self._ever_connected = True
+                self.connected = True
+                self._cond.notify_all()
+                subscriptions = list(self._subscriptions)
+            for topic in subscriptions:
+                client.subscribe(topic, qos=1)
         else:
             print(f">> Connection Failed code: {reason_code}")
 
-    def publish(self, topic: str, payload: dict[str, str]):
+    def on_disconnect(self, client, userdata, flags, reason_code, properties):
+        # 대기 큐는 그대로 유지되고, 재접속 후 순서대로 전송된다.
+        # PUBACK을 받지 못한 QoS1 메시지는 paho가 재접속 시 재전송한다.
+        print(f">> Disconnected from Broker: {reason_code}")
+        with self._cond:
+            self.connected = False
+
+    def on_publish(self, client, userdata, mid, reason_code=None, properties=None):
+        with self._cond:
+            entry = self._inflight.pop(mid, None)
+            if entry is None:
+                if mid in self._sent_qos0:
+                    # QoS0은 전송 즉시 완료 처리했으므로 무시
+                    self._sent_qos0.discard(mid)
+                    return
+                # publish() 반환 전에 PUBACK(QoS0은 전송 완료)이 먼저 도착한 경우
+                self._early_acks.add(mid)
+                return
+        self._complete(entry)
+
+    def on_message(self, client, userdata, msg):
         try:
-            message = json.dumps(payload)
+            payload = json.loads(msg.payload.decode('utf-8'))
+        except ValueError:
+            payload = msg.payload
+        for topic, callbacks in list(self._subscriptions.items()):
+            if not mqtt.topic_matches_sub(topic, msg.topic):
+                continue
+            for callback in callbacks:
+                try:
+                    callback(msg.topic, payload)
+                except Exception as e:
+                    print(f"Subscription Callback Error ({msg.topic}): {e}")
+
+    def subscribe(self, topic: str, callback):
+        """topic 필터 구독. 재접속 시 자동으로 다시 구독한다. callback(topic, payload)"""
+        with self._cond:
+            new = topic not in self._subscriptions
+            self._subscriptions.setdefault(topic, []).append(callback)
+            connected = self.connected
+        if connected and new:
+            self.client.subscribe(topic, qos=1)
 
-            info = self.client.publish(topic, message, qos=1)
+    def _count(self, event):
+        self.stats[event] += 1
+        EVENTS.labels(event).inc()
 
+    def _complete(self, entry):
+        self._count("acked")
+        dt = time.perf_counter() - entry.enqueued
+        self.latency.record(dt)
+        PUBLISH_SECONDS.observe(dt)
+        _resolve(entry.future, True)
+
+    def _start_sender(self):
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+        self._sender = threading.Thread(target=self._send_loop, daemon=True)
+        self._sender.start()
+
+    def _send_loop(self):
+        while True:
+            with self._cond:
+                while self._running and not (self.connected and self._queue):
+                    self._cond.wait()
+                if not self._running:
+                    return
+                entry = self._queue.popleft()
+                if entry.coalesce and self._latest.get(entry.topic) is entry:
+                    del self._latest[entry.topic]
+
+            # paho 내부 락과의 교착을 피하기 위해 _cond 밖에서 전송
+            try:
+                info = self.client.publish(entry.topic, entry.message, qos=entry.qos)
+            except Exception as e:
+                info = None
+                print(f"Publish Error: {e}")
+
+            if info is None or info.rc != mqtt.MQTT_ERR_SUCCESS:
+                self._count("failed")
+                with self._cond:
+                    # 연결이 끊겨 실패한 경우 큐 앞에 되돌려 재접속 후 재전송
+                    if not self.connected and not self._is_superseded(entry):
+                        self._queue.appendleft(entry)
+                        if entry.coalesce:
+                            self._latest[entry.topic] = entry
+                        continue
+                _resolve(entry.future, False)
+                continue
+
+            self._count("sent")
+            # paho는 QoS0도 on_publish를 호출한다. 어느 쪽이 먼저 와도 mid가 한 번씩 정리되도록
+            # 여기서 early ack을 지우거나, 아직 안 왔으면 _sent_qos0에 남겨 on_publish에서 지운다
+            with self._cond:
+                early = info.mid in self._early_acks
+                self._early_acks.discard(info.mid)
+                # mid는 65535 후 재사용되므로 이전 QoS0 기록이 새 메시지의 ack을 가로채지 않게 한다
+                self._sent_qos0.discard(info.mid)
+                if entry.qos == 0:
+                    if not early:
+                        self._sent_qos0.add(info.mid)
+                elif not early:
+                    self._inflight[info.mid] = entry
+            if entry.qos == 0 or early:
+                self._complete(entry)
+
+    def _is_superseded(self, entry):
+        return entry.coalesce and entry.topic in self._latest and self._latest[entry.topic] is not entry
+
+    def _enqueue(self, topic, message, qos, coalesce):
+        entry = _Outbound(topic, message, qos, coalesce)
+        dropped = []
+        with self._cond:
+            if coalesce and topic in self._latest:
+                # 아직 전송되지 않은 이전 명령은 새 명령으로 대체
+                old = self._latest[topic]
+                self._queue.remove(old)
+                dropped.append(old)
+                self._count("superseded")
+            while len(self._queue) >= self.max_queue:
+                old = self._queue.popleft()
+                if old.coalesce and self._latest.get(old.topic) is old:
+                    del self._latest[old.topic]
+                dropped.append(old)
+                self._count("dropped")
+            self._queue.append(entry)
+            if coalesce:
+                self._latest[topic] = entry
+            self._cond.notify_all()
+
+        for old in dropped:
+            _resolve(old.future, False)
+        return entry.future
+
+    def publish(self, topic: str, payload, qos: int = 1, coalesce: bool = False) -> Future:
+        """payload를 JSON으로 직렬화해 전송 큐에 넣는다. 완료 Future를 반환한다."""
+        try:
+            message = json.dumps(payload)
+            future = self._enqueue(topic, message, qos, coalesce)
             print(f"[SEND] {topic} : {message}")
+            return future
 
         except Exception as e:
             print(f"Publish Error: {e}")
+            future = Future()
+            future.set_result(False)
+            return future
 
-    def command(self, topic: str, cmd: str):
+    async def publish_async(self, topic: str, payload, qos: int = 1,
+                            coalesce: bool = False, timeout: float = 5.0) -> bool:
+        """PUBACK까지 기다린다. 시간 초과나 대체 시 False"""
+        future = self.publish(topic, payload, qos, coalesce)
+        try:
+            # shield: 호출 쪽 시간 초과가 큐에 남은 항목의 Future를 취소하지 않도록 한다
+            return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), timeout)
+        except asyncio.TimeoutError:
+            self._count("timeouts")
+            return False
+
+    def command(self, topic: str, cmd: str, coalesce: bool = True, **fields):
+        """
+        명령 전송. coalesce=True면 같은 토픽의 미전송 명령은 최신 명령으로 대체된다.
+        작업 명령처럼 하나도 빠지면 안 되는 경우 coalesce=False. fields는 payload에 추가된다 (job 등)
+        """
         try:
             if cmd != "None":
                 payload = {
                     "command": cmd,
+                    **fields,
                 }
-                self.publish(topic, payload)
+                return self.publish(topic, payload, coalesce=coalesce)
         except Exception as e:
             print(f"Command Error: {e}")
+
+    async def command_async(self, topic: str, cmd: str, timeout: float = 5.0) -> bool:
+        if cmd == "None":
+            return True
+        return await self.publish_async(topic, {"command": cmd}, coalesce=True, timeout=timeout)
+
+    def metrics(self):
+        with self._cond:
+            depth = len(self._queue)
+            inflight = len(self._inflight)
+        return {
+            "connected": self.connected,
+            "queue_depth": depth,
+            "inflight": inflight,
+            **self.stats,
+            "publish_latency": self.latency.snapshot(),
+        }
@@ -0,0 +1,167 @@
+import threading
+import time
+
+from util import metrics
+from util.broadcast import Broadcast
+
+ENCODE_SECONDS = metrics.histogram("preview_encode_seconds", "Annotated preview frame encode time")
+VIEWERS = metrics.gauge("preview_viewers", "Connected preview viewers")
+
+
+def _encode_jpeg(image, quality):
+    import cv2
+    ok, buf = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, int(quality)])
+    return bytes(buf) if ok else None
+
+
+def _annotate(image, annotation):
+    """bbox / ROI / 행동 문구를 그린 사본을 반환 (원본 프레임은 건드리지 않음)"""
+    import cv2
+
+    canvas = image.copy()
+    if annotation is None:
+        return canvas
+    best, roi, message = annotation
+    if roi is not None:
+        x1, y1, x2, y2 = (int(v) for v in roi)
+        cv2.rectangle(canvas, (x1, y1), (x2, y2), (0, 0, 255), 1)
+    if best is not None:
+        (x1, y1, x2, y2), conf, cls, iou = best[0], best[1], best[2], best[3]
+        cv2.rectangle(canvas, (int(x1), int(y1)), (int(x2), int(y2)), (0, 255, 0), 2)
+        cv2.putText(canvas, f"{cls} {conf:.2f} IoU {iou:.2f}", (int(x1), max(10, int(y1) - 4)),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.35, (0, 255, 0), 1)
+    if message:
+        cv2.putText(canvas, message[:48], (4, 12), cv2.FONT_HERSHEY_SIMPLEX, 0.35, (255, 255, 255), 1)
+    return canvas
+
+
+class PreviewService:
+    """
+    주석이 달린 미리보기 프레임을 만들어 여러 시청자에게 나눠준다.
+    - 제어 경로(offer_frame / annotate)는 참조만 저장하는 O(1) 호출
+    - 인코딩은 전용 스레드에서 max_fps로 제한하며, 시청자가 없으면 하지 않음
+    - 인코딩 시간이 budget을 넘으면 품질을 낮추고, 여유가 있으면 다시 올림
+    - 인코딩된 JPEG 하나를 모든 시청자가 공유 (시청자 수와 무관한 인코딩 비용)
+    """
+
+    def __init__(self, max_fps=15.0, quality=75, min_quality=35, max_quality=85,
+                 budget=0.012, encode=_encode_jpeg, annotate=_annotate):
+        self.max_fps = max_fps
+        self.quality = quality
+        self.min_quality = min_quality
+        self.max_quality = max_quality
+        self.budget = budget
+        self.encode = encode
+        self.annotate_fn = annotate
+
+        self._cond = threading.Condition()
+        self._frame = None        # (seq, image)
+        self._annotation = None   # (best, roi, message)
+        self._running = False
+        self._thread = None
+
+        self.frames_out = Broadcast()  # (인코딩 번호, JPEG)
+        self.stats = {"encoded": 0, "skipped": 0, "encode_ms": 0.0, "bytes": 0}
+
+    def bind_metrics(self):
+        VIEWERS.set_function(lambda: self.viewers)
+
+    def unbind_metrics(self):
+        VIEWERS.set_function(None)
+
+    @property
+    def viewers(self):
+        return self.frames_out.subscribers
+
+    # --- 제어 경로 (O(1)) ---
+    def offer_frame(self, seq, image):
+        if not self.viewers:
+            return
+        with self._cond:
+            if self._frame is not None:
+                self.stats["skipped"] += 1
+            self._frame = (seq, image)
+            self._cond.notify()
+
+    def annotate(self, best, roi, message):
+        self._annotation = (best, roi, message)
+
+    # --- 인코더 스레드 ---
+    def start(self):
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+        self._thread = threading.Thread(target=self._run, name="preview-encoder", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def _run(self):
+        interval = 1.0 / self.max_fps
+        next_t = 0.0
+        while True:
+            with self._cond:
+                while self._running and self._frame is None:
+                    self._cond.wait()
+                if not self._running:
+                    return
+            # 프레임 간격 제한: 기다리는 동안 들어온 프레임 중 최신 것만 인코딩
+            delay = next_t - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            with self._cond:
+                frame, self._frame = self._frame, None
+            if frame is None:
+                continue
+            next_t = time.monotonic() + interval
+            try:
+                self._encode(frame)
+            except Exception as e:
+                print(f"Preview encode error: {e}")
+                time.sleep(1)
+
+    def _encode(self, frame):
+        seq, image = frame
+        t0 = time.perf_counter()
+        jpeg = self.encode(self.annotate_fn(image, self._annotation), self.quality)
+        dt = time.perf_counter() - t0
+        if jpeg is None:
+            return
+        ENCODE_SECONDS.observe(dt)
+        self._adapt(dt)
+
+        n = self.stats["encoded"] = self.stats["encoded"] + 1
+        self.stats["encode_ms"] += (dt * 1000.0 - self.stats["encode_ms"]) / n
+        self.stats["bytes"] = len(jpeg)
+        self.frames_out.publish(jpeg)
+
+    def _adapt(self, dt):
+        if dt > self.budget and self.quality > self.min_quality:
+            self.quality = max(self.min_quality, self.quality - 5)
+        elif dt < self.budget * 0.5 and self.quality < self.max_quality:
+            self.quality = min(self.max_quality, self.quality + 1)
+
+    # --- 시청자 (이벤트 루프) ---
+    async def frames(self):
+        """새로 인코딩된 JPEG를 순서대로 내보낸다. 느린 시청자는 중간 프레임을 건너뛴다."""
+        self.start()
+        async for seq, jpeg in self.frames_out.subscribe():
+            yield seq, jpeg
+
+    def report(self):
+        return {
+            "viewers": self.viewers,
+            "quality": self.quality,
+            "seq": self.frames_out.seq,
+            "encoded": self.stats["encoded"],
+            "skipped": self.stats["skipped"],
+            "encode_avg_ms": round(self.stats["encode_ms"], 2),
+            "last_bytes": self.stats["bytes"],
+        }
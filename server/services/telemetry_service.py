@@ -0,0 +1,47 @@
+import collections
+import threading
+import time
+
+from util.telemetry import decode_status
+
+
+class TelemetryService:
+    """AGV/STATUS/+ 상태 프레임을 로봇별 링 버퍼에 보관"""
+
+    def __init__(self, mqtt=None, size=600):
+        self.size = size
+        self._buffers = {}
+        self._lock = threading.Lock()
+        self.received = 0
+        if mqtt is not None:
+            mqtt.subscribe("AGV/STATUS/+", self._on_message)
+
+    def _on_message(self, topic, payload):
+        self.record(topic.rsplit("/", 1)[-1], decode_status(payload))
+
+    def record(self, robot_id, frame):
+        frame["received"] = time.time()
+        with self._lock:
+            buffer = self._buffers.get(robot_id)
+            if buffer is None:
+                buffer = self._buffers[robot_id] = collections.deque(maxlen=self.size)
+            buffer.append(frame)
+            self.received += 1
+
+    def robots(self):
+        with self._lock:
+            return list(self._buffers)
+
+    def history(self, robot_id, limit=100):
+        with self._lock:
+            buffer = self._buffers.get(robot_id)
+            if not buffer:
+                return []
+            return list(buffer)[-limit:]
+
+    def summary(self):
+        with self._lock:
+            return {
+                robot_id: {"frames": len(buffer), "latest": buffer[-1] if buffer else None}
+                for robot_id, buffer in self._buffers.items()
+            }
@@ -0,0 +1,125 @@
+"""
+AGVService 제어 루프 오프라인 시뮬레이션 / 재생 하네스
+
+실제 capture -> inference -> control 스레드를 그대로 돌리고,
+카메라/로봇/서보만 시뮬레이션 객체로 바꿔 끼운다.
+    synthetic : 운동학 로봇 + 합성 장면 (폐루프, 색상 탐지기 사용)
+    replay    : 녹화 이미지 재생 (개루프, --weights 모델 필요)
+
+실행 (server 디렉토리에서):
+    python -m sim.harness --duration 30 --control servo
+    python -m sim.harness --source replay --replay-dir ../utils/dataset_full4 --weights ../utils/best.pt
+"""
+import argparse
+import json
+import time
+
+from services.agv_service import AGVService
+from sim.sources import ReplayCamera, SyntheticCamera
+from sim.world import ColorBoxDetector, SimWorld
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+def build(source="synthetic", control_mode="pulse", inference_mode="full", detector_latency=0.02,
+          replay_dir=None, fps=30.0, weights=None, wobble=0.0, seed=0):
+    agv = AGVService()
+    agv.control_mode = control_mode
+    agv.inference_mode = inference_mode
+    world = SimWorld(wobble=wobble, hold=agv.grap_hold, seed=seed)
+
+    if source == "replay":
+        if not replay_dir:
+            raise ValueError("replay source requires replay_dir")
+        camera = ReplayCamera(replay_dir, fps=fps)
+    else:
+        camera = SyntheticCamera(world)
+    agv.hw = world.hardware(camera)
+    agv.capture_interval = 1.0 / fps
+
+    if weights:
+        agv.model_path = weights
+        agv.load_model()
+        if agv.model is None:
+            raise RuntimeError(agv.status_message)
+    else:
+        agv.model = ColorBoxDetector(latency=detector_latency)
+        agv.names = agv.model.names
+    return agv, world, camera
+
+
+def run(duration=20.0, **options):
+    agv, world, camera = build(**options)
+    t0 = time.monotonic()
+    agv.start(wait=True)
+    try:
+        time.sleep(duration)
+    finally:
+        elapsed = time.monotonic() - t0
+        report = agv.latency_report()
+        agv.stop(wait=True)
+        agv.motor.close()
+
+    times = [t for t, _ in world.grabs]
+    return {
+        "duration_s": round(elapsed, 2),
+        "frames": camera.frames,
+        "capture_hz": report["capture"]["rate_hz"],
+        "control_hz": report["end_to_end"]["rate_hz"],
+        "stages_ms": {name: report[name]["avg_ms"]
+                      for name in ("capture", "inference", "actuation", "end_to_end")},
+        "end_to_end_max_ms": report["end_to_end"]["max_ms"],
+        "dropped_frames": report["dropped_frames"],
+        "grabs": len(times),
+        "grab_iou_avg": round(sum(iou for _, iou in world.grabs) / len(times), 3) if times else 0.0,
+        "time_to_grab_p50_s": round(percentile(times, 0.5), 2),
+        "time_to_grab_max_s": round(max(times), 2) if times else 0.0,
+        "motor_commands": world.robot.commands,
+        "actions": report["actions"],
+        "scheduler": report.get("scheduler"),
+        # multires: 프레임당 실제 추론 시간(infer_avg_ms)과 추론 횟수(inferences_per_frame)
+        "multires": report.get("multires"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--source", default="synthetic", choices=["synthetic", "replay"])
+    parser.add_argument("--replay-dir")
+    parser.add_argument("--fps", type=float, default=30.0)
+    parser.add_argument("--control", default="pulse", choices=["pulse", "servo"])
+    parser.add_argument("--inference", default="full", choices=["full", "multires"])
+    parser.add_argument("--weights", help="실제 탐지 모델 (없으면 색상 탐지기)")
+    parser.add_argument("--detector-latency", type=float, default=0.02, help="색상 탐지기 추론 지연 (초)")
+    parser.add_argument("--wobble", type=float, default=0.0, help="물체 좌우 흔들림 진폭 (m)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="JSON으로 출력")
+    args = parser.parse_args()
+
+    result = run(
+        args.duration,
+        source=args.source,
+        control_mode=args.control,
+        inference_mode=args.inference,
+        detector_latency=args.detector_latency,
+        replay_dir=args.replay_dir,
+        fps=args.fps,
+        weights=args.weights,
+        wobble=args.wobble,
+        seed=args.seed,
+    )
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+    for name, value in result.items():
+        print(f"{name:20s} {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+import glob
+import os
+import threading
+import time
+
+
+class FrameSource:
+    """jetbot.Camera 대체 인터페이스 (value 속성 + start/stop)"""
+
+    def __init__(self):
+        self.frames = 0
+        self.running = False
+        self._callbacks = []
+
+    def start(self):
+        self.running = True
+
+    def stop(self):
+        self.running = False
+
+    def read(self):
+        raise NotImplementedError
+
+    @property
+    def value(self):
+        image = self.read()
+        if image is not None:
+            self.frames += 1
+        return image
+
+    def observe(self, callback, names):
+        self._callbacks.append(callback)
+
+    def unobserve(self, callback, names):
+        if callback in self._callbacks:
+            self._callbacks.remove(callback)
+
+
+class SyntheticCamera(FrameSource):
+    """SimWorld를 로봇 시점에서 렌더링 (로봇 움직임이 화면에 반영되는 폐루프)"""
+
+    def __init__(self, world):
+        super().__init__()
+        self.world = world
+
+    def read(self):
+        return self.world.render()
+
+
+class ReplayCamera(FrameSource):
+    """
+    녹화된 이미지(예: utils/data.py의 dataset_full4)를 fps 속도로 재생.
+    로봇 움직임과 무관한 개루프 재생이므로 지연/처리량 측정용.
+    """
+
+    PATTERNS = ("*.jpg", "*.jpeg", "*.png")
+
+    def __init__(self, directory, fps=30.0, loop=True, size=(300, 300)):
+        super().__init__()
+        self.paths = sorted(p for pattern in self.PATTERNS
+                            for p in glob.glob(os.path.join(directory, pattern)))
+        if not self.paths:
+            raise FileNotFoundError(f"No images found in {directory}")
+        self.fps = fps
+        self.loop = loop
+        self.size = size
+        self._cache = {}
+        self._lock = threading.Lock()
+        self._t0 = None
+
+    def start(self):
+        super().start()
+        self._t0 = time.monotonic()
+
+    def read(self):
+        import cv2
+
+        if self._t0 is None:
+            self._t0 = time.monotonic()
+        index = int((time.monotonic() - self._t0) * self.fps)
+        if index >= len(self.paths):
+            if not self.loop:
+                return None
+            index %= len(self.paths)
+        with self._lock:
+            image = self._cache.get(index)
+            if image is None:
+                image = cv2.imread(self.paths[index])
+                if image is not None and image.shape[1::-1] != self.size:
+                    image = cv2.resize(image, self.size)
+                self._cache[index] = image
+        return image
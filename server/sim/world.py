@@ -0,0 +1,227 @@
+import math
+import random
+import threading
+import time
+import types
+
+import numpy as np
+
+FRAME = 300
+FOCAL = 150.0                 # px (수평 화각 90도)
+OBJ_W, OBJ_H = 0.04, 0.06     # 물체 크기 (m)
+CAM_DROP = 0.04               # 카메라와 물체 중심의 높이 차 (m)
+WHEEL_BASE = 0.12             # m
+MAX_WHEEL = 0.5               # 모터 값 1.0일 때 바퀴 속도 (m/s)
+TARGET_BGR = (0, 0, 220)
+
+
+class KinematicRobot:
+    """
+    jetbot.Robot과 같은 인터페이스의 차동 구동 모델.
+    명령 사이에는 바퀴 속도가 일정하다고 보고, 자세는 조회할 때 실제 경과 시간만큼 적분한다.
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self._lock = threading.Lock()
+        self.x = 0.0
+        self.y = 0.0
+        self.theta = 0.0
+        self.left_value = 0.0
+        self.right_value = 0.0
+        self.commands = 0
+        self._t = clock()
+
+    def set_motors(self, left, right):
+        with self._lock:
+            self._integrate()
+            self.left_value = float(left)
+            self.right_value = float(right)
+            self.commands += 1
+
+    def forward(self, speed=1.0):
+        self.set_motors(speed, speed)
+
+    def backward(self, speed=1.0):
+        self.set_motors(-speed, -speed)
+
+    def left(self, speed=1.0):
+        self.set_motors(-speed, speed)
+
+    def right(self, speed=1.0):
+        self.set_motors(speed, -speed)
+
+    def stop(self):
+        self.set_motors(0.0, 0.0)
+
+    def pose(self):
+        with self._lock:
+            self._integrate()
+            return self.x, self.y, self.theta
+
+    def _integrate(self):
+        now = self.clock()
+        dt, self._t = now - self._t, now
+        vl = self.left_value * MAX_WHEEL
+        vr = self.right_value * MAX_WHEEL
+        v = (vl + vr) / 2.0
+        w = (vr - vl) / WHEEL_BASE
+        if abs(w) < 1e-9:
+            self.x += v * math.cos(self.theta) * dt
+            self.y += v * math.sin(self.theta) * dt
+        else:
+            # 등속 원호 적분
+            theta = self.theta + w * dt
+            self.x += v / w * (math.sin(theta) - math.sin(self.theta))
+            self.y -= v / w * (math.cos(theta) - math.cos(self.theta))
+            self.theta = theta
+
+
+class SimArm:
+    """
+    SCSCtrl.TTLServo 대체. 팔을 집기 자세로 내리는 명령(2번 -> 120)을 집기 이벤트로 본다.
+    (물체를 든 채 다시 집을 때는 그리퍼가 이미 닫혀 있어 5번 명령이 생략된다)
+    latency: 명령 한 번의 버스 전송 시간 (초, 호출 스레드를 그만큼 막는다)
+    """
+
+    def __init__(self, on_grab=None, latency=0.0):
+        self.on_grab = on_grab
+        self.latency = latency
+        self.calls = []
+
+    def servoAngleCtrl(self, servo_id, angle, direction=1, speed=150):
+        if self.latency:
+            time.sleep(self.latency)
+        self.calls.append((servo_id, angle))
+        if servo_id == 2 and angle == 120 and self.on_grab is not None:
+            self.on_grab()
+
+
+class SimWorld:
+    """
+    로봇 한 대와 목표 물체 하나가 있는 평면 장면.
+    집기가 끝나면 (hold 초 후) 로봇 주변 임의 위치에 새 물체를 배치한다.
+        distance : 새 물체까지의 거리 범위 (m)
+        bearing  : 새 물체의 방위 범위 (도, 오른쪽 양수)
+        wobble   : 물체 좌우 흔들림 진폭 (m), period 주기 (s)
+    """
+
+    def __init__(self, distance=(0.3, 0.8), bearing=(-25.0, 25.0), wobble=0.0, period=4.0,
+                 hold=3.5, roi=None, seed=0, clock=time.monotonic):
+        self.rng = random.Random(seed)
+        self.clock = clock
+        self.distance = distance
+        self.bearing = bearing
+        self.wobble = wobble
+        self.period = period
+        self.hold = hold
+        self.roi = roi or (130, FRAME - 140, 170, FRAME - 80)
+
+        self.robot = KinematicRobot(clock)
+        self.arm = SimArm(self._on_grab)
+        self.grabs = []           # (time_to_grab, ground-truth IoU)
+        self._lock = threading.Lock()
+        self.spawn()
+
+    def hardware(self, camera):
+        """services.hardware.load()와 같은 형태의 네임스페이스. camera는 sim.sources의 소스"""
+
+        class Camera:
+            @staticmethod
+            def instance(width=FRAME, height=FRAME):
+                return camera
+
+        return types.SimpleNamespace(
+            Robot=lambda: self.robot,
+            Camera=Camera,
+            TTLServo=self.arm,
+            bgr8_to_jpeg=bgr8_to_jpeg,
+        )
+
+    def spawn(self, delay=0.0):
+        x, y, theta = self.robot.pose()
+        d = self.rng.uniform(*self.distance)
+        phi = math.radians(self.rng.uniform(*self.bearing))
+        heading = theta - phi
+        with self._lock:
+            self.anchor = (x + d * math.cos(heading), y + d * math.sin(heading))
+            self.normal = (-math.sin(heading), math.cos(heading))
+            self.spawn_t = self.clock() + delay
+
+    def target(self, now=None):
+        now = self.clock() if now is None else now
+        with self._lock:
+            ax, ay = self.anchor
+            if not self.wobble:
+                return ax, ay
+            offset = self.wobble * math.sin(2 * math.pi * max(0.0, now - self.spawn_t) / self.period)
+            return ax + offset * self.normal[0], ay + offset * self.normal[1]
+
+    def project(self):
+        """현재 시점 목표 물체의 bbox (x1, y1, x2, y2). 화면 밖이면 None"""
+        x, y, theta = self.robot.pose()
+        tx, ty = self.target()
+        dx, dy = tx - x, ty - y
+        d = math.hypot(dx, dy)
+        err = theta - math.atan2(dy, dx)
+        phi = math.atan2(math.sin(err), math.cos(err))
+        if d < 0.05 or abs(phi) >= math.radians(60):
+            return None
+        cx = FRAME / 2 + FOCAL * math.tan(phi)
+        cy = FRAME / 2 + FOCAL * CAM_DROP / d
+        w = FOCAL * OBJ_W / d
+        h = FOCAL * OBJ_H / d
+        return cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2
+
+    def render(self):
+        image = np.full((FRAME, FRAME, 3), 90, dtype=np.uint8)
+        image[FRAME // 2:] = 60  # 바닥
+        box = self.project()
+        if box is not None:
+            x1, y1, x2, y2 = (int(round(v)) for v in box)
+            x1, y1 = max(0, x1), max(0, y1)
+            x2, y2 = min(FRAME, x2), min(FRAME, y2)
+            if x2 > x1 and y2 > y1:
+                image[y1:y2, x1:x2] = TARGET_BGR
+        return image
+
+    def _on_grab(self):
+        from util.detection import bbox_iou_xyxy
+
+        box = self.project()
+        iou = bbox_iou_xyxy(box, self.roi) if box is not None else 0.0
+        self.grabs.append((self.clock() - self.spawn_t, iou))
+        # 집기 동작이 끝난 뒤부터 다음 물체까지의 시간을 잰다
+        self.spawn(delay=self.hold)
+
+
+class ColorBoxDetector:
+    """
+    렌더링된 장면의 단색 물체를 찾는 탐지기 (YOLO 대체).
+    latency 초만큼 대기하여 모델 추론 시간을 흉내낸다.
+    """
+
+    def __init__(self, latency=0.0, color=TARGET_BGR, tol=30):
+        self.latency = latency
+        self.color = np.array(color, dtype=np.int16)
+        self.tol = tol
+        self.names = {0: "target"}
+        self.dynamic_size = True
+
+    def input_size(self, size=None):
+        return size or FRAME
+
+    def __call__(self, image, size=None):
+        if self.latency:
+            time.sleep(self.latency)
+        mask = (np.abs(image.astype(np.int16) - self.color) <= self.tol).all(-1)
+        ys = np.flatnonzero(mask.any(1))
+        xs = np.flatnonzero(mask.any(0))
+        if len(xs) == 0:
+            return np.zeros((0, 6), dtype=np.float32)
+        return np.array([[xs[0], ys[0], xs[-1] + 1, ys[-1] + 1, 0.9, 0]], dtype=np.float32)
+
+
+def bgr8_to_jpeg(value, quality=75):
+    import cv2
+    return bytes(cv2.imencode('.jpg', value, [cv2.IMWRITE_JPEG_QUALITY, quality])[1])
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# 서버 모듈은 server 디렉토리 기준으로 import 한다 (services.*, util.* ...)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
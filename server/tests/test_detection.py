@@ -0,0 +1,26 @@
+import numpy as np
+import pytest
+
+from bench.bench_detection import ROI, make_predictions
+from util.detection import POLICIES, score_candidates, select_target, to_targets
+
+
+@pytest.mark.parametrize("policy", POLICIES)
+def test_single_frame_path_matches_scorer(policy):
+    for seed in range(300):
+        pred = make_predictions(int(np.random.default_rng(seed).integers(1, 40)), seed=seed)
+        expected = to_targets(score_candidates(pred, ROI, 0.5, policy, (2, 0)))[0]
+        actual = select_target(pred, ROI, 0.5, policy, (2, 0))
+        if expected is None:
+            assert actual is None
+            continue
+        assert actual[0] == expected[0] and actual[2] == expected[2]
+        assert np.allclose(actual[1], expected[1])
+        assert np.allclose(actual[3:], expected[3:], rtol=1e-5, atol=1e-4)
+
+
+def test_no_candidate_above_threshold():
+    pred = make_predictions(10)
+    pred[:, 4] = 0.1
+    assert select_target(pred, ROI, 0.5) is None
+    assert select_target(np.zeros((0, 6), dtype=np.float32), ROI) is None
@@ -0,0 +1,60 @@
+import numpy as np
+
+from services.detector import MultiResolutionDetector
+
+ROI = (130, 160, 170, 220)
+BOX = np.array([[140, 170, 160, 210, 0.9, 0]], dtype=np.float32)
+
+
+class FakeDetector:
+    """호출 시 받은 (이미지 shape, size)를 기록하는 탐지기"""
+
+    name = "fake"
+
+    def __init__(self, dynamic_size, imgsz=320, pred=BOX):
+        self.dynamic_size = dynamic_size
+        self.imgsz = imgsz
+        self.pred = pred
+        self.names = {0: "target"}
+        self.calls = []
+
+    def input_size(self, size=None):
+        return size if size and self.dynamic_size else self.imgsz
+
+    def __call__(self, image, size=None):
+        self.calls.append((image.shape[:2], size))
+        return self.pred.copy()
+
+
+def test_fixed_shape_backend_runs_one_full_frame_pass():
+    detector = FakeDetector(dynamic_size=False)
+    multires = MultiResolutionDetector(detector)
+    image = np.zeros((300, 300, 3), dtype=np.uint8)
+
+    for _ in range(3):
+        pred = multires(image, ROI, last_box=(140, 170, 160, 210))
+    assert detector.calls == [((300, 300), None)] * 3
+    assert np.array_equal(pred, BOX)
+    report = multires.report()
+    assert report["enabled"] is False and report["full"] == 3
+    assert report["inferences_per_frame"] == 1.0
+
+
+def test_dynamic_backend_uses_fine_window_and_counts_misses():
+    detector = FakeDetector(dynamic_size=True)
+    multires = MultiResolutionDetector(detector)
+    image = np.zeros((300, 300, 3), dtype=np.uint8)
+
+    pred = multires(image, ROI, last_box=(140, 170, 160, 210))
+    wx1, wy1, wx2, wy2 = multires.window(ROI, image.shape)
+    assert detector.calls == [((wy2 - wy1, wx2 - wx1), multires.fine_size)]
+    assert np.allclose(pred[0, :4], BOX[0, :4] + [wx1, wy1, wx1, wy1])
+
+    # 창 안에서 못 찾으면 전체 프레임 저해상도 탐지까지 두 번 추론한다
+    detector.pred = np.zeros((0, 6), dtype=np.float32)
+    multires(image, ROI, last_box=(140, 170, 160, 210))
+    assert detector.calls[-1] == ((300, 300), multires.coarse_size)
+    report = multires.report()
+    assert report["fine"] == 1 and report["fine_miss"] == 1 and report["coarse"] == 1
+    assert report["inferences_per_frame"] == 1.5
+    assert report["infer_avg_ms"] >= 0.0
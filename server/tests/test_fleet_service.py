@@ -0,0 +1,117 @@
+from concurrent.futures import Future
+
+from services.fleet_service import FleetService
+from services.mqtt_service import MQTTService
+from tests.test_mqtt_service import FakeClient
+from util.telemetry import COMMANDS, FRAME, MAGIC, NO_SEQ, STATES, decode_status
+
+
+class RecordingMQTT:
+    def __init__(self):
+        self.sent = []
+
+    def command(self, topic, cmd, coalesce=True, **fields):
+        self.sent.append((topic, cmd, coalesce, fields))
+        future = Future()
+        future.set_result(True)
+        return future
+
+
+def make_fleet(**kwargs):
+    mqtt = RecordingMQTT()
+    fleet = FleetService(mqtt, **kwargs)
+    fleet.register("1", now=0.0)
+    return fleet, mqtt
+
+
+def test_job_command_is_not_coalesced_and_carries_job_id():
+    fleet, mqtt = make_fleet()
+    request = fleet.submit("drink", now=0.0)
+    assert mqtt.sent == [("AGV/CMD/1", "drink", False, {"job": request.id})]
+
+
+def test_rejected_status_releases_matching_job():
+    fleet, mqtt = make_fleet()
+    first = fleet.submit("drink", now=0.0)
+    second = fleet.submit("drink", now=0.0)
+
+    # 명령 수신 전 idle 프레임으로는 풀리지 않는다
+    fleet.on_status("1", {"state": "idle", "job": None}, now=0.1)
+    assert first.state == "assigned"
+
+    fleet.on_status("1", {"state": "rejected", "last_command": "drink", "job": first.id}, now=0.2)
+    assert first.state == "rejected"
+    assert second.state == "assigned" and len(mqtt.sent) == 2
+
+    # 이전 작업의 rejected 프레임이 늦게 와도 새 작업은 풀리지 않는다
+    fleet.on_status("1", {"state": "rejected", "last_command": "drink", "job": first.id}, now=0.3)
+    assert second.state == "assigned"
+    assert fleet.stats["rejected"] == 1 and fleet.stats["completed"] == 0
+
+
+def test_idle_after_busy_completes_job():
+    fleet, _ = make_fleet()
+    request = fleet.submit("forward", now=0.0)
+    fleet.on_status("1", {"state": "busy"}, now=0.1)
+    fleet.on_status("1", {"state": "idle"}, now=0.5)
+    assert request.state == "done"
+    assert fleet.stats["completed"] == 1
+
+
+def test_timed_out_job_is_not_reported_done():
+    fleet, mqtt = make_fleet(job_timeout=5.0)
+    first = fleet.submit("drink", now=0.0)
+    second = fleet.submit("drink", now=0.0)
+    fleet.tick(now=4.0)
+    assert first.state == "assigned"
+    fleet.tick(now=5.5)
+    assert first.state == "timeout"
+    assert second.state == "assigned"
+    assert fleet.stats["timeouts"] == 1 and fleet.stats["completed"] == 0
+
+
+def test_later_command_does_not_replace_queued_job():
+    """브로커 연결 전 큐에 있는 drink 작업 명령을 같은 토픽의 일반 명령이 대체하지 않는다"""
+    mqtt = MQTTService(client=FakeClient())
+    fleet = FleetService(mqtt)
+    fleet.register("1", now=0.0)
+    fleet.submit("drink", now=0.0)
+    job = next(iter(mqtt._queue)).future
+    mqtt.command(fleet.default_topic, "no")
+    assert not job.done()
+    assert [entry.message for entry in mqtt._queue] == ['{"command": "drink", "job": 1}', '{"command": "no"}']
+    assert mqtt.stats["superseded"] == 0
+
+
+def status_frame(seq, now, state, last_command=None, job=None):
+    """JetBot struct 텔레메트리 프레임"""
+    return FRAME.pack(MAGIC, 2, seq, now, 0.0, 0.0, STATES.index(state), COMMANDS.index(last_command),
+                      NO_SEQ, 1.0, 0.0, 0, NO_SEQ if job is None else job)
+
+
+def test_drink_jobs_release_on_telemetry_before_timeout():
+    """
+    drink 2건을 로봇 하나에 보내고 10Hz 텔레메트리를 가상 시간으로 흘린다.
+    JetBot은 명령을 50ms 뒤에 받아 rejected(job)로 보고한다. 첫 작업이 job_timeout 전에 풀려야 한다.
+    """
+    job_timeout, period, link_delay = 5.0, 0.1, 0.05
+    fleet, mqtt = make_fleet(job_timeout=job_timeout)
+    fleet.submit("drink", now=0.0)
+    fleet.submit("drink", now=0.0)
+
+    received = {}  # job id -> JetBot 수신 시각
+    now, seq = 0.0, 0
+    while len(mqtt.sent) < 2:
+        assert now < job_timeout, "drink job was not released by telemetry before job_timeout"
+        for _, _, _, fields in mqtt.sent:
+            received.setdefault(fields["job"], now + link_delay)
+        arrived = [job for job, t in received.items() if t <= now]
+        frame = (status_frame(seq, now, "rejected", "drink", max(arrived)) if arrived
+                 else status_frame(seq, now, "idle"))
+        fleet.on_status("1", decode_status(frame), now=now)
+        fleet.tick(now=now)
+        now += period
+        seq += 1
+
+    assert now <= 3 * period
+    assert fleet.stats["rejected"] == 1 and fleet.stats["timeouts"] == 0
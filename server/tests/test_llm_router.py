@@ -0,0 +1,124 @@
+import asyncio
+import time
+
+from bench.bench_router import StubChain
+from bench.stub_llm import Behaviour, StubLLMServer
+from schemas.chat_schema import Result
+from services.llm_router import ChainProvider, LLMRouter, RuleProvider
+
+QUESTION = "잔 채워줘"
+
+
+def provider(name, delay, fail_rate=0.0):
+    return ChainProvider(name, StubChain(delay, fail_rate=fail_rate), StubChain(delay, fail_rate=fail_rate))
+
+
+def invoke(router, question=QUESTION):
+    info = {}
+    t0 = time.perf_counter()
+    result = asyncio.run(router.invoke({"question": question}, info))
+    return result, info, time.perf_counter() - t0
+
+
+def test_hedge_fires_when_primary_is_slow():
+    router = LLMRouter([provider("primary", 1.0), provider("secondary", 0.01)],
+                       deadline=2.0, hedge_after=0.05, hedge_min=0.05)
+    result, info, elapsed = invoke(router)
+    assert result.command == "drink"
+    assert info["hedged"] is True
+    assert info["attempts"] == ["primary", "secondary"]
+    assert info["provider"] == "secondary"
+    assert router.stats["hedged"] == 1 and router.stats["hedge_wins"] == 1
+    assert elapsed < 0.5
+    # 진 요청은 취소된다
+    assert router.providers[0].stats["cancelled"] == 1
+
+
+def test_no_hedge_when_primary_answers_in_time():
+    router = LLMRouter([provider("primary", 0.01), provider("secondary", 0.01)],
+                       deadline=2.0, hedge_after=0.2, hedge_min=0.2)
+    _, info, _ = invoke(router)
+    assert info["hedged"] is False
+    assert info["attempts"] == ["primary"]
+    assert router.stats["hedged"] == 0
+
+
+def test_failover_follows_provider_order():
+    router = LLMRouter([provider("a", 0.01, fail_rate=1.0), provider("b", 0.01, fail_rate=1.0),
+                        provider("c", 0.01)], deadline=2.0, hedge=False)
+    result, info, _ = invoke(router)
+    assert info["attempts"] == ["a", "b", "c"]
+    assert info["provider"] == "c"
+    assert info["fallback"] is None
+    assert router.stats["failovers"] == 2
+    assert result.command == "drink"
+
+
+def test_rule_fallback_within_deadline():
+    deadline = 0.2
+    router = LLMRouter([provider("primary", 5.0), provider("secondary", 5.0)],
+                       deadline=deadline, hedge_after=0.05, hedge_min=0.05)
+    result, info, elapsed = invoke(router)
+    assert info["fallback"] == "deadline"
+    assert info["provider"] == "rules"
+    assert result == RuleProvider().answer(QUESTION)
+    assert deadline <= elapsed < deadline + 0.1
+    assert router.stats["timeouts"] == 1
+
+
+def test_rule_fallback_when_all_providers_fail():
+    router = LLMRouter([provider("a", 0.01, fail_rate=1.0), provider("b", 0.01, fail_rate=1.0)],
+                       deadline=2.0, hedge=False)
+    result, info, elapsed = invoke(router, "아무 말")
+    assert info["fallback"] == "error"
+    assert result.command == "None"
+    assert elapsed < 0.5
+
+
+def test_stream_fails_over_then_falls_back():
+    async def collect(router):
+        info = {}
+        chunks = [chunk async for chunk in router.stream({"question": QUESTION}, info)]
+        return chunks, info
+
+    router = LLMRouter([provider("a", 0.01, fail_rate=1.0), provider("b", 0.01)], deadline=2.0)
+    chunks, info = asyncio.run(collect(router))
+    assert info["attempts"] == ["a", "b"] and info["provider"] == "b"
+    assert chunks[-1]["command"] == "drink"
+
+    router = LLMRouter([provider("a", 5.0)], deadline=0.1)
+    chunks, info = asyncio.run(collect(router))
+    assert info["fallback"] == "deadline"
+    assert chunks == [RuleProvider().answer(QUESTION).model_dump()]
+
+
+def test_hedge_and_failover_against_stub_server():
+    """OpenAI 호환 스텁 서버 + 실제 ChatOpenAI 체인"""
+    from langchain_core.prompts import ChatPromptTemplate
+    from langchain_openai import ChatOpenAI
+
+    server = StubLLMServer({
+        "slow": Behaviour(1.0),
+        "fast": Behaviour(0.01),
+        "broken": Behaviour(0.01, fail_rate=1.0),
+    }).start()
+    prompt = ChatPromptTemplate.from_messages([("human", "{question}")])
+
+    def http_provider(model):
+        llm = ChatOpenAI(model=model, base_url=server.url, api_key="stub", timeout=2.0, max_retries=0)
+        return ChainProvider(model, prompt | llm.with_structured_output(Result, include_raw=True))
+
+    try:
+        router = LLMRouter([http_provider("slow"), http_provider("fast")],
+                           deadline=2.0, hedge_after=0.1, hedge_min=0.1)
+        result, info, elapsed = invoke(router)
+        assert info["hedged"] is True and info["provider"] == "fast"
+        assert result.command == "drink"
+        assert elapsed < 0.8
+
+        router = LLMRouter([http_provider("broken"), http_provider("fast")], deadline=2.0, hedge=False)
+        result, info, _ = invoke(router)
+        assert info["attempts"] == ["broken", "fast"] and info["provider"] == "fast"
+        assert server.failures["broken"] == 1
+    finally:
+        server.stop()
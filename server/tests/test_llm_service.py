@@ -0,0 +1,51 @@
+import asyncio
+
+from schemas.chat_schema import Result
+from services.llm_router import ChainProvider, LLMRouter
+from services.llm_service import LLMService
+
+REPLY = Result(response="잔이 비었네요... 바로 채워드릴게요!", command="drink")
+
+
+class GatedChain:
+    """release()가 호출될 때까지 응답을 미루는 체인"""
+
+    def __init__(self):
+        self.calls = 0
+        self.gate = asyncio.Event()
+
+    async def ainvoke(self, inputs):
+        self.calls += 1
+        await self.gate.wait()
+        return REPLY
+
+
+def make_service(chain):
+    service = LLMService()
+    service.router = LLMRouter([ChainProvider("stub", chain)], hedge=False)
+    return service
+
+
+def test_coalesced_waiter_survives_leader_cancel():
+    async def scenario():
+        chain = GatedChain()
+        service = make_service(chain)
+        leader = asyncio.create_task(service._answer("잔 채워줄래?"))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(service._answer("잔 채워줄래?"))
+        await asyncio.sleep(0)
+
+        leader.cancel()
+        await asyncio.sleep(0)
+        chain.gate.set()
+
+        assert await waiter == REPLY
+        assert leader.cancelled()
+        assert chain.calls == 1
+        assert service.stats["coalesced"] == 1
+        assert service._inflight == {}
+        # 취소된 요청이 시작한 호출도 끝까지 진행되어 캐시된다
+        assert await service._answer("잔 채워줄래?") == REPLY
+        assert service.stats["cache_hits"] == 1
+
+    asyncio.run(scenario())
@@ -0,0 +1,40 @@
+from services.agv_service import AGVService
+from util import metrics
+
+
+def sample(name):
+    """REGISTRY 출력에서 name{...} 값 dict (라벨 문자열 -> 값)"""
+    values = {}
+    for line in metrics.REGISTRY.render().splitlines():
+        if line.startswith(name) and not line.startswith(name + "_"):
+            key, _, value = line.rpartition(" ")
+            values[key[len(name):]] = float(value)
+    return values
+
+
+def test_only_bound_instance_feeds_callback_metrics():
+    app_service = AGVService()
+    app_service.bind_metrics()
+    try:
+        app_service.frame_queue.put(1)
+        app_service.frame_queue.put(2)
+        assert app_service.frame_queue.dropped == 1
+
+        # 다른 인스턴스(벤치/시뮬레이션)를 만들어도 앱 인스턴스의 값이 유지된다
+        AGVService()
+        assert sample("agv_dropped_total")['{queue="frame"}'] == 1.0
+    finally:
+        app_service.unbind_metrics()
+
+    # 해제 후에는 서비스 인스턴스를 참조하지 않는다
+    assert sample("agv_dropped_total")['{queue="frame"}'] == 0.0
+    assert sample("preview_viewers") == {"": 0.0}
+
+
+def test_preview_encoder_thread_stops():
+    preview = AGVService().preview
+    preview.start()
+    thread = preview._thread
+    assert thread.is_alive()
+    preview.stop()
+    assert not thread.is_alive() and preview._thread is None
@@ -0,0 +1,139 @@
+import asyncio
+import time
+
+import paho.mqtt.client as mqtt
+
+from services.mqtt_service import MQTTService
+
+
+class FakeClient:
+    """
+    paho Client 대체. 전송만 기록하고 on_publish는 테스트가 직접 호출한다.
+    early=True면 publish() 안에서 (반환 전에) on_publish를 호출한다.
+    """
+
+    class Info:
+        def __init__(self, mid):
+            self.mid = mid
+            self.rc = mqtt.MQTT_ERR_SUCCESS
+
+    def __init__(self, early=False):
+        self.early = early
+        self.on_connect = self.on_disconnect = self.on_publish = self.on_message = None
+        self.sent = []  # (mid, topic, payload, qos)
+        self._mid = 0
+
+    def subscribe(self, topic, qos=0):
+        pass
+
+    def publish(self, topic, payload=None, qos=0):
+        self._mid = self._mid % 65535 + 1
+        self.sent.append((self._mid, topic, payload, qos))
+        if self.early:
+            self.on_publish(self, None, self._mid, 0, None)
+        return self.Info(self._mid)
+
+    def ack(self, mid):
+        self.on_publish(self, None, mid, 0, None)
+
+
+def make_service(client, connected=True):
+    service = MQTTService(client=client, max_queue=1000)
+    service._start_sender()
+    if connected:
+        service.on_connect(client, None, None, 0, None)
+    return service
+
+
+def wait_until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.002)
+
+
+def shutdown(service):
+    with service._cond:
+        service._running = False
+        service._cond.notify_all()
+    service._sender.join(timeout=1.0)
+
+
+def test_qos0_acks_before_publish_returns_are_not_kept():
+    client = FakeClient(early=True)
+    service = make_service(client)
+    try:
+        futures = [service.publish("jetbot/1", {"seq": i}, qos=0) for i in range(500)]
+        assert all(f.result(timeout=2.0) for f in futures)
+        assert service._early_acks == set()
+        assert service._sent_qos0 == set()
+    finally:
+        shutdown(service)
+
+
+def test_qos0_acks_after_publish_returns_are_not_kept():
+    client = FakeClient()
+    service = make_service(client)
+    try:
+        futures = [service.publish("jetbot/1", {"seq": i}, qos=0) for i in range(500)]
+        assert all(f.result(timeout=2.0) for f in futures)
+        for mid, *_ in client.sent:
+            client.ack(mid)
+        assert service._early_acks == set()
+        assert service._sent_qos0 == set()
+    finally:
+        shutdown(service)
+
+
+def test_qos1_early_ack_completes_future():
+    client = FakeClient(early=True)
+    service = make_service(client)
+    try:
+        future = service.publish("jetbot/1", {"command": "forward"}, qos=1)
+        assert future.result(timeout=2.0) is True
+        assert service._inflight == {} and service._early_acks == set()
+    finally:
+        shutdown(service)
+
+
+def test_reused_qos0_mid_does_not_swallow_qos1_ack():
+    client = FakeClient()
+    service = make_service(client)
+    try:
+        # QoS0의 on_publish가 오지 않은 채 mid가 한 바퀴 돌아 QoS1 메시지에 재사용된 경우
+        assert service.publish("jetbot/1", {"seq": 0}, qos=0).result(timeout=2.0)
+        client._mid = 0
+        future = service.publish("jetbot/1", {"command": "forward"}, qos=1)
+        wait_until(lambda: 1 in service._inflight)
+        client.ack(1)
+        assert future.result(timeout=2.0) is True
+    finally:
+        shutdown(service)
+
+
+def test_coalesced_publish_after_caller_timeout():
+    client = FakeClient()
+    service = make_service(client, connected=False)
+
+    async def scenario():
+        # 연결 전이라 큐에 머무는 동안 호출 쪽이 시간 초과
+        assert await service.publish_async("jetbot/1", {"command": "forward"}, coalesce=True, timeout=0.05) is False
+        first = next(iter(service._queue)).future
+        assert not first.cancelled()
+
+        # 같은 토픽의 새 명령이 시간 초과된 항목을 대체해도 예외 없이 False로 완료
+        second = service.publish("jetbot/1", {"command": "stop"}, coalesce=True)
+        assert first.result(timeout=1.0) is False
+
+        service.on_connect(client, None, None, 0, None)
+        wait_until(lambda: client.sent)
+        mid, _, payload, _ = client.sent[0]
+        client.ack(mid)
+        assert second.result(timeout=2.0) is True
+        assert [p for _, _, p, _ in client.sent] == ['{"command": "stop"}']
+        assert service.stats["timeouts"] == 1 and service.stats["superseded"] == 1
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        shutdown(service)
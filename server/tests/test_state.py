@@ -0,0 +1,39 @@
+import time
+
+from util.state import StateMachine
+
+TRANSITIONS = {"idle": {"tracking"}, "tracking": {"idle"}}
+
+
+def test_message_updates_are_rate_limited_with_trailing_publish():
+    machine = StateMachine(TRANSITIONS, "idle", message_interval=0.05)
+    start = machine.updates.seq
+    for i in range(200):
+        machine.set_message(f"Tracking cup: forward (IoU={i / 200:.3f})")
+    # 첫 변경은 이전 발행에서 간격이 지났으므로 즉시, 나머지는 구간 끝에 한 번
+    assert machine.updates.seq - start <= 1
+    assert machine.message.endswith("(IoU=0.995)")
+
+    time.sleep(0.15)
+    assert machine.updates.seq - start <= 2
+    assert machine.snapshot()["message"] == machine.message
+
+
+def test_transitions_publish_immediately():
+    machine = StateMachine(TRANSITIONS, "idle", message_interval=10.0)
+    machine.set_message("a")
+    seq = machine.updates.seq
+    machine.transition("tracking", "Tracking")
+    assert machine.updates.seq == seq + 1
+    assert machine.snapshot()["state"] == "tracking"
+    # 같은 메시지는 발행하지 않는다
+    machine.set_message("Tracking")
+    assert machine.updates.seq == seq + 1
+
+
+def test_default_interval_publishes_every_change():
+    machine = StateMachine(TRANSITIONS, "idle")
+    seq = machine.updates.seq
+    for i in range(5):
+        machine.set_message(str(i))
+    assert machine.updates.seq == seq + 5
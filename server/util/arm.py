@@ -0,0 +1,190 @@
+"""
+로봇 팔(TTLServo) 궤적 스케줄러
+
+이름 붙은 자세(pose)와 시퀀스를 시간이 정해진 다중 서보 명령으로 바꿔 전용 스레드에서 실행한다.
+호출 쪽(control 스레드)은 Future만 받아 바로 돌아가므로, 팔이 움직이는 동안에도 인식/주행이 계속된다.
+
+    arm = ArmScheduler(hw.TTLServo)
+    arm.move("home")                              # Future
+    done = arm.run(grab_sequence(hold=3.5))       # 완료되면 done.result() == 경과 시간(초)
+
+버스 쓰기:
+    - 한 단계의 명령은 버스 잠금을 한 번 잡고 연달아 보낸다
+    - 이미 그 각도로 명령한 서보는 건너뛴다
+    - 버스가 syncAngleCtrl([(id, angle, direction, speed), ...])을 제공하면 한 번에 보낸다
+"""
+import collections
+import threading
+import time
+from concurrent.futures import Future
+
+# 자세: {서보 번호: (각도, 속도)}
+POSES = {
+    "home": {4: (40, 300), 1: (0, 150), 2: (0, 150), 3: (0, 150), 5: (10, 150)},
+    # 정렬 중 미리 취하는 자세: 그리퍼를 열고 관절 2/3을 집기 자세의 중간까지 내려 둔다
+    "pre_grab": {5: (10, 150), 2: (60, 150), 3: (55, 150)},
+    "grab": {5: (60, 150), 2: (120, 150), 3: (110, 150)},
+    "stow": {4: (-20, 150)},
+    # 잡은 물체를 놓는다 (holding 해제)
+    "release": {5: (10, 150)},
+}
+
+# 그리퍼 서보. 물체를 잡은 동안(holding)에는 release/home 외의 자세가 그리퍼를 열지 못한다
+GRIPPER = 5
+HOLD_POSES = ("grab",)
+RELEASE_POSES = ("release", "home")
+
+# 속도 1 단위당 각속도 추정치 (deg/s). 완료 시각 계산에만 쓰인다.
+DEG_PER_S_PER_SPEED = 1.0
+SETTLE = 0.05
+
+
+def grab_sequence(hold=3.5, prepositioned=True):
+    """
+    집기: 그리퍼를 닫으며 팔을 내리고, 시작 hold초 뒤 4번 관절을 접는다.
+    미리 pre_grab 자세가 아니면 먼저 그리퍼를 열고 내려간다 (이미 물체를 잡고 있으면 그리퍼는 닫힌 채로 둔다).
+    grab 단계가 실행되면 스케줄러는 holding 상태가 되고, release/home 자세로만 해제된다.
+    [(시작 오프셋 또는 None(앞 단계 완료 직후), 자세), ...]
+    """
+    steps = [] if prepositioned else [(0.0, "pre_grab")]
+    return steps + [(None if steps else 0.0, "grab"), (hold, "stow")]
+
+
+class ArmScheduler:
+    """
+    팔 명령을 순서대로 실행하는 단일 워커.
+    run(preempt=True)은 대기/실행 중인 작업을 취소하고 바로 새 작업을 시작한다 (취소된 Future는 cancelled()).
+    """
+
+    def __init__(self, bus, poses=POSES, deg_per_s=DEG_PER_S_PER_SPEED, settle=SETTLE):
+        self.bus = bus
+        self.poses = poses
+        self.deg_per_s = deg_per_s
+        self.settle = settle
+        self.angles = {}  # 서보별 마지막 명령 각도
+        self.holding = False  # 그리퍼가 물체를 잡고 있는지
+        self.stats = {"jobs": 0, "done": 0, "cancelled": 0, "writes": 0, "skipped": 0, "batches": 0}
+
+        self._sync = getattr(bus, "syncAngleCtrl", None)
+        self._bus_lock = threading.Lock()
+        self._cond = threading.Condition()
+        self._jobs = collections.deque()
+        self._current = None
+        self._thread = threading.Thread(target=self._run, name="arm-scheduler", daemon=True)
+        self._thread.start()
+
+    # --- 호출 쪽 (논블로킹) ---
+    def move(self, pose, preempt=False):
+        return self.run([(0.0, pose)], preempt)
+
+    def run(self, steps, preempt=True):
+        future = Future()
+        with self._cond:
+            if preempt:
+                self._cancel_locked()
+            self._jobs.append((steps, future))
+            self.stats["jobs"] += 1
+            self._cond.notify()
+        return future
+
+    def cancel(self):
+        with self._cond:
+            self._cancel_locked()
+            self._cond.notify()
+
+    def _cancel_locked(self):
+        jobs = list(self._jobs)
+        self._jobs.clear()
+        if self._current is not None:
+            jobs.append(self._current)
+        for _, future in jobs:
+            if future.cancel():
+                self.stats["cancelled"] += 1
+
+    @property
+    def busy(self):
+        return self._current is not None or bool(self._jobs)
+
+    # --- 워커 ---
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._jobs:
+                    self._current = None
+                    self._cond.wait()
+                job = self._current = self._jobs.popleft()
+            steps, future = job
+            if future.cancelled():
+                continue
+            try:
+                elapsed = self._execute(steps, future)
+            except Exception as e:
+                print(f"Arm job failed: {e}")
+                if not future.done():
+                    future.set_exception(e)
+                continue
+            if elapsed is not None and not future.done():
+                self.stats["done"] += 1
+                future.set_result(elapsed)
+
+    def _wait_until(self, deadline, future):
+        """deadline까지 대기. 도중에 취소되면 False"""
+        with self._cond:
+            while not future.cancelled():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return True
+                self._cond.wait(remaining)
+        return False
+
+    def _execute(self, steps, future):
+        t0 = time.monotonic()
+        finish = t0
+        for offset, pose in steps:
+            deadline = finish if offset is None else t0 + offset
+            if not self._wait_until(deadline, future):
+                return None
+            duration = self._write(pose)
+            finish = max(finish, time.monotonic() + duration)
+        if not self._wait_until(finish, future):
+            return None
+        return time.monotonic() - t0
+
+    def _write(self, pose):
+        """자세 한 단계를 버스에 쓰고 예상 동작 시간(초)을 반환"""
+        targets = self.poses[pose] if isinstance(pose, str) else pose
+        releasing = pose in RELEASE_POSES
+        commands = []
+        duration = 0.0
+        for servo_id, (angle, speed) in targets.items():
+            if servo_id == GRIPPER and self.holding and not releasing:
+                self.stats["skipped"] += 1
+                continue
+            previous = self.angles.get(servo_id)
+            if previous == angle:
+                self.stats["skipped"] += 1
+                continue
+            commands.append((servo_id, angle, 1, speed))
+            delta = abs(angle - previous) if previous is not None else 180.0
+            duration = max(duration, delta / (speed * self.deg_per_s))
+        if releasing:
+            self.holding = False
+        elif pose in HOLD_POSES:
+            self.holding = True
+        if not commands:
+            return 0.0
+
+        with self._bus_lock:
+            if self._sync is not None:
+                self._sync(commands)
+            else:
+                for command in commands:
+                    self.bus.servoAngleCtrl(*command)
+        for servo_id, angle, _, _ in commands:
+            self.angles[servo_id] = angle
+        self.stats["writes"] += len(commands)
+        self.stats["batches"] += 1
+        return duration + self.settle
+
+    def report(self):
+        return dict(self.stats, busy=self.busy, holding=self.holding, angles=dict(self.angles))
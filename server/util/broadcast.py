@@ -0,0 +1,60 @@
+import asyncio
+import threading
+
+
+class Broadcast:
+    """
+    스레드에서 발행하고 asyncio 구독자들이 받아 가는 최신값 브로드캐스트.
+    - publish는 어느 스레드에서나 호출 가능하며, 구독자 수와 무관하게 이벤트 루프당 한 번만 깨운다
+    - 값은 (seq, value) 하나로 보관하므로 느린 구독자는 중간 값을 건너뛰고 최신 값만 받는다
+    """
+
+    def __init__(self):
+        self.latest = (0, None)
+        self.subscribers = 0
+        self._lock = threading.Lock()
+        self._waiters = {}  # loop -> asyncio.Event
+
+    @property
+    def seq(self):
+        return self.latest[0]
+
+    def publish(self, value):
+        with self._lock:
+            seq = self.latest[0] + 1
+            self.latest = (seq, value)
+            waiters = list(self._waiters.items())
+        for loop, event in waiters:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                # 닫힌 이벤트 루프
+                with self._lock:
+                    self._waiters.pop(loop, None)
+        return seq
+
+    async def _wait(self, last):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            event = self._waiters.get(loop)
+            if event is None or event.is_set():
+                event = self._waiters[loop] = asyncio.Event()
+            if self.latest[0] != last:
+                return
+        await event.wait()
+
+    async def subscribe(self, last=0):
+        """last 이후 발행된 값을 (seq, value)로 내보낸다. 이미 값이 있으면 최신 값부터 시작."""
+        with self._lock:
+            self.subscribers += 1
+        try:
+            while True:
+                seq, value = self.latest
+                if seq == last:
+                    await self._wait(last)
+                    continue
+                last = seq
+                yield seq, value
+        finally:
+            with self._lock:
+                self.subscribers -= 1
@@ -0,0 +1,42 @@
+import collections
+import re
+import time
+import unicodedata
+
+
+def normalize(text: str) -> str:
+    """캐시 키용 정규화: 유니코드 정규화, 소문자, 공백/문장부호 제거"""
+    text = unicodedata.normalize("NFKC", text).lower()
+    return re.sub(r"[\W_]+", "", text)
+
+
+class TTLCache:
+    """TTL 만료 + LRU 제거를 지원하는 단순 캐시 (단일 이벤트 루프에서 사용)"""
+
+    def __init__(self, maxsize: int = 256, ttl: float = 600.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._items = collections.OrderedDict()
+
+    def get(self, key):
+        item = self._items.get(key)
+        if item is None:
+            return None
+        expires, value = item
+        if expires < time.monotonic():
+            del self._items[key]
+            return None
+        self._items.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        self._items[key] = (time.monotonic() + self.ttl, value)
+        self._items.move_to_end(key)
+        while len(self._items) > self.maxsize:
+            self._items.popitem(last=False)
+
+    def clear(self):
+        self._items.clear()
+
+    def __len__(self):
+        return len(self._items)
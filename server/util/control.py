@@ -0,0 +1,86 @@
+class PID:
+    def __init__(self, kp, ki=0.0, kd=0.0, integral_limit=1.0):
+        self.kp = kp
+        self.ki = ki
+        self.kd = kd
+        self.integral_limit = integral_limit
+        self.reset()
+
+    def reset(self):
+        self.integral = 0.0
+        self.prev_error = None
+
+    def update(self, error, dt):
+        if dt > 0:
+            self.integral += error * dt
+            self.integral = max(-self.integral_limit, min(self.integral_limit, self.integral))
+        derivative = 0.0
+        if self.prev_error is not None and dt > 0:
+            derivative = (error - self.prev_error) / dt
+        self.prev_error = error
+        return self.kp * error + self.ki * self.integral + self.kd * derivative
+
+
+def _clamp(value, limit):
+    return max(-limit, min(limit, value))
+
+
+class VisualServoController:
+    """
+    bbox 중심 오차와 크기 비율 오차로 좌/우 모터 속도를 매 프레임 계산한다.
+        전진 속도 v : 1 - size_ratio (작으면 전진, 크면 후진)
+        회전 속도 w : 중심 오프셋 / (프레임 폭 / 2) (양수면 우회전)
+        left = v + w, right = v - w
+    출력은 max_accel [speed/s] 로 변화량이 제한된다.
+    """
+
+    def __init__(self, frame_width=300, max_speed=0.3, max_turn=0.25, max_accel=1.5,
+                 min_speed=0.08, center_tol=0.02, ratio_tol=0.05):
+        self.half_width = frame_width / 2.0
+        self.max_speed = max_speed
+        self.max_turn = max_turn
+        self.max_accel = max_accel
+        self.min_speed = min_speed
+        self.center_tol = center_tol
+        self.ratio_tol = ratio_tol
+
+        self.range_pid = PID(kp=0.6, ki=0.1, kd=0.02)
+        self.center_pid = PID(kp=0.5, ki=0.05, kd=0.03)
+        self.reset()
+
+    def reset(self):
+        self.range_pid.reset()
+        self.center_pid.reset()
+        self.left = 0.0
+        self.right = 0.0
+
+    def update(self, center_offset, size_ratio, dt):
+        """(left, right, aligned) 반환"""
+        ex = _clamp(center_offset / self.half_width, 1.0)
+        er = _clamp(1.0 - size_ratio, 1.0)
+
+        v = 0.0
+        if abs(er) > self.ratio_tol:
+            v = _clamp(self.range_pid.update(er, dt), self.max_speed)
+        else:
+            self.range_pid.reset()
+        w = 0.0
+        if abs(ex) > self.center_tol:
+            w = _clamp(self.center_pid.update(ex, dt), self.max_turn)
+        else:
+            self.center_pid.reset()
+
+        aligned = v == 0.0 and w == 0.0
+        self.left = self._limit(self.left, self._deadzone(v + w), dt)
+        self.right = self._limit(self.right, self._deadzone(v - w), dt)
+        return self.left, self.right, aligned
+
+    def _deadzone(self, value):
+        # 모터가 실제로 움직이는 최소 출력 보장
+        if value == 0.0 or abs(value) >= self.min_speed:
+            return _clamp(value, self.max_speed + self.max_turn)
+        return self.min_speed if value > 0 else -self.min_speed
+
+    def _limit(self, prev, target, dt):
+        step = self.max_accel * max(dt, 1e-3)
+        return prev + _clamp(target - prev, step)
@@ -0,0 +1,173 @@
+"""
+서버 측 대화 세션
+
+클라이언트 id별로 최근 대화를 보관하고, 요청마다 토큰 예산 안에 드는 최근 턴만 프롬프트에 넣는다.
+예산 밖으로 밀려난 오래된 턴은 백그라운드에서 요약문에 합쳐 넣으므로, 대화가 길어져도
+요청당 프롬프트 크기(= 비용/지연)는 일정하게 유지된다.
+
+프롬프트 배치 (앞부분이 매 요청 동일해야 provider 측 prompt caching이 적용된다):
+    [system] 페르소나 + few-shot          고정 prefix (모든 세션 공통)
+    [system] 이전 대화 요약               세션별, 요약이 갱신될 때만 바뀜
+    [human/ai] 최근 턴 (토큰 예산 이내)
+    [human] 이번 질문
+"""
+import asyncio
+import collections
+import time
+
+from util.cache import TTLCache
+
+_encoder = None
+
+
+def count_tokens(text: str) -> int:
+    """tiktoken이 있으면 o200k_base로, 없으면 UTF-8 바이트 기반 근사 (한글 1자 ~ 1토큰)"""
+    global _encoder
+    if _encoder is None:
+        try:
+            import tiktoken
+            _encoder = tiktoken.get_encoding("o200k_base").encode
+        except Exception:
+            _encoder = False
+    if _encoder:
+        return len(_encoder(text))
+    return len(text.encode("utf-8")) // 3 + 1
+
+
+class Turn:
+    __slots__ = ("role", "text", "tokens")
+
+    def __init__(self, role, text):
+        self.role = role  # human | ai
+        self.text = text
+        self.tokens = count_tokens(text) + 4  # 메시지 포맷 오버헤드
+
+
+class Session:
+    def __init__(self, session_id):
+        self.id = session_id
+        self.summary = ""
+        self.summary_tokens = 0
+        self.turns = collections.deque()
+        self.history_tokens = 0   # turns 전체 토큰
+        self.summarized_turns = 0
+        self.requests = 0
+        self.created = time.time()
+        self._summarizing = None  # 진행 중인 요약 Task
+
+    def append(self, role, text):
+        turn = Turn(role, text)
+        self.turns.append(turn)
+        self.history_tokens += turn.tokens
+
+    def window(self, budget):
+        """예산 안에 드는 최근 턴 목록 (오래된 것부터). 턴 쌍이 잘리지 않도록 human부터 시작한다."""
+        selected = []
+        used = 0
+        for turn in reversed(self.turns):
+            if used + turn.tokens > budget:
+                break
+            selected.append(turn)
+            used += turn.tokens
+        selected.reverse()
+        while selected and selected[0].role != "human":
+            used -= selected.pop(0).tokens
+        return selected, used
+
+    def overflow(self, budget):
+        """window 밖으로 밀려난 가장 오래된 턴 수"""
+        selected, _ = self.window(budget)
+        return len(self.turns) - len(selected)
+
+
+class SessionStore:
+    """
+    세션 저장소 (단일 이벤트 루프에서 사용).
+        history_budget   : 프롬프트에 넣을 최근 턴 토큰 상한
+        summary_budget   : 요약문 토큰 상한
+        summarize_after  : window 밖 턴이 이만큼 쌓이면 요약을 갱신
+    summarizer: async (이전 요약, [Turn, ...], 최대 토큰) -> 새 요약. None이면 오래된 턴은 버린다.
+    """
+
+    def __init__(self, summarizer=None, max_sessions=1000, ttl=3600.0,
+                 history_budget=1200, summary_budget=300, summarize_after=6):
+        self.sessions = TTLCache(maxsize=max_sessions, ttl=ttl)
+        self.summarizer = summarizer
+        self.history_budget = history_budget
+        self.summary_budget = summary_budget
+        self.summarize_after = summarize_after
+        self.stats = {"summaries": 0, "summary_errors": 0, "dropped_turns": 0}
+
+    def get(self, session_id):
+        session = self.sessions.get(session_id)
+        if session is None:
+            session = Session(session_id)
+        # 접근할 때마다 TTL 갱신
+        self.sessions.put(session_id, session)
+        return session
+
+    def peek(self, session_id):
+        return self.sessions.get(session_id)
+
+    def reset(self, session_id):
+        session = self.sessions.get(session_id)
+        if session is not None and session._summarizing is not None:
+            session._summarizing.cancel()
+        self.sessions.put(session_id, Session(session_id))
+
+    def context(self, session):
+        """프롬프트에 넣을 (요약, 최근 턴, 토큰 수)"""
+        turns, tokens = session.window(self.history_budget)
+        return session.summary, turns, tokens + session.summary_tokens
+
+    def record(self, session, question, answer):
+        """한 턴을 기록하고, window 밖 턴이 충분히 쌓였으면 요약을 시작한다."""
+        session.requests += 1
+        session.append("human", question)
+        session.append("ai", answer)
+        # 요약이 계속 실패해도 보관 턴이 무한히 늘지 않도록 가장 오래된 턴부터 버린다
+        overflow = session.overflow(self.history_budget)
+        while overflow > self.summarize_after * 4 and session._summarizing is None:
+            session.history_tokens -= session.turns.popleft().tokens
+            self.stats["dropped_turns"] += 1
+            overflow -= 1
+        if session._summarizing is None and session.overflow(self.history_budget) >= self.summarize_after:
+            session._summarizing = asyncio.ensure_future(self._summarize(session))
+
+    async def _summarize(self, session):
+        count = session.overflow(self.history_budget)
+        old = list(session.turns)[:count]
+        try:
+            if self.summarizer is not None:
+                summary = await self.summarizer(session.summary, old, self.summary_budget)
+                session.summary = summary.strip()
+                session.summary_tokens = count_tokens(session.summary) + 4
+                self.stats["summaries"] += 1
+            else:
+                self.stats["dropped_turns"] += count
+            for _ in range(count):
+                session.history_tokens -= session.turns.popleft().tokens
+            session.summarized_turns += count
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # 요약 실패: 오래된 턴은 window 밖에 남아 있다가 다음 기회에 다시 시도
+            print(f"Session summary failed ({session.id}): {e}")
+            self.stats["summary_errors"] += 1
+        finally:
+            session._summarizing = None
+
+    def describe(self, session):
+        _, turns, tokens = self.context(session)
+        return {
+            "session_id": session.id,
+            "requests": session.requests,
+            "turns": len(session.turns),
+            "window_turns": len(turns),
+            "summarized_turns": session.summarized_turns,
+            "context_tokens": tokens,
+            "summary": session.summary,
+        }
+
+    def __len__(self):
+        return len(self.sessions)
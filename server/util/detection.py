@@ -0,0 +1,193 @@
+import numpy as np
+
+POLICIES = ("confidence", "iou", "largest", "class_priority")
+
+# 결과 행 레이아웃: x1, y1, x2, y2, conf, cls, iou, size_ratio, center_offset, valid
+RESULT_COLS = 10
+
+
+def _xp(a):
+    """입력 배열 타입에 맞는 연산 모듈 (torch 또는 numpy)"""
+    if type(a).__module__.startswith("torch"):
+        import torch
+        return torch
+    return np
+
+
+def _arange(xp, n, like):
+    if xp is np:
+        return np.arange(n)
+    return xp.arange(n, device=like.device)
+
+
+def bbox_iou_xyxy(a, b):
+    """단일 박스 쌍의 IoU (스칼라 기준 구현)"""
+    ax1, ay1, ax2, ay2 = a
+    bx1, by1, bx2, by2 = b
+    ix1, iy1 = max(ax1, bx1), max(ay1, by1)
+    ix2, iy2 = min(ax2, bx2), min(ay2, by2)
+    iw, ih = max(0, ix2 - ix1), max(0, iy2 - iy1)
+    inter = iw * ih
+    area_a = max(0, (ax2 - ax1)) * max(0, (ay2 - ay1))
+    area_b = max(0, (bx2 - bx1)) * max(0, (by2 - by1))
+    union = area_a + area_b - inter
+    return 0.0 if union <= 0 else float(inter / union)
+
+
+def shift_predictions(pred, dx, dy):
+    """크롭 좌표계 예측을 원본 프레임 좌표계로 이동 (복사본 반환)"""
+    offset = [dx, dy, dx, dy, 0, 0]
+    if _xp(pred) is np:
+        return pred + np.asarray(offset, dtype=pred.dtype)
+    return pred + pred.new_tensor(offset)
+
+
+def pad_predictions(preds):
+    """프레임별 (Ni, 6) 예측 리스트를 (B, N, 6) 배열로 패딩. 패딩 행은 conf=0."""
+    if not preds:
+        return np.zeros((0, 0, 6), dtype=np.float32)
+    xp = _xp(preds[0])
+    n = max(max(len(p) for p in preds), 1)
+    if xp is np:
+        out = np.zeros((len(preds), n, 6), dtype=np.float32)
+    else:
+        out = preds[0].new_zeros((len(preds), n, 6))
+    for i, p in enumerate(preds):
+        if len(p):
+            out[i, :len(p)] = p
+    return out
+
+
+def _roi_iou(x1, y1, x2, y2, area, roi):
+    rx1, ry1, rx2, ry2 = (float(v) for v in roi)
+    iw = (x2.clip(max=rx2) - x1.clip(min=rx1)).clip(min=0)
+    ih = (y2.clip(max=ry2) - y1.clip(min=ry1)).clip(min=0)
+    inter = iw * ih
+    roi_area = max(0.0, rx2 - rx1) * max(0.0, ry2 - ry1)
+    return inter / (area + roi_area - inter).clip(min=1e-9)
+
+
+def _class_rank(xp, cls, class_priority):
+    priority = tuple(class_priority or ())
+    rank = xp.full_like(cls, len(priority))
+    for r, c in reversed(list(enumerate(priority))):
+        rank = xp.where(cls == c, xp.full_like(cls, r), rank)
+    return rank
+
+
+def score_candidates(pred, roi, conf_threshold=0.5, policy="confidence", class_priority=None):
+    """
+    모든 후보 박스의 ROI IoU, 크기 비율, 중심 오프셋을 한 번에 계산하고
+    정책에 따라 프레임마다 하나의 타깃을 고른다.
+
+    pred: (N, 6) 또는 (B, N, 6) [x1, y1, x2, y2, conf, cls] (torch.Tensor 또는 np.ndarray)
+    roi: (x1, y1, x2, y2)
+    반환: (B, RESULT_COLS) 배열. 호스트 동기화 없이 입력과 같은 디바이스에 남는다.
+    """
+    if policy not in POLICIES:
+        raise ValueError(f"Unknown target policy: {policy}")
+
+    xp = _xp(pred)
+    if pred.ndim == 2:
+        pred = pred[None]
+    pred = pred.float() if xp is not np else pred.astype(np.float32, copy=False)
+
+    x1, y1, x2, y2 = pred[..., 0], pred[..., 1], pred[..., 2], pred[..., 3]
+    conf, cls = pred[..., 4], pred[..., 5]
+    rx1, ry1, rx2, ry2 = (float(v) for v in roi)
+
+    area = (x2 - x1).clip(min=0) * (y2 - y1).clip(min=0)
+    roi_area = max(0.0, rx2 - rx1) * max(0.0, ry2 - ry1)
+    iou = _roi_iou(x1, y1, x2, y2, area, roi)
+
+    # 기존 로직과 동일하게 최소 1픽셀 폭/높이로 크기 비율 계산
+    size_ratio = ((x2 - x1).clip(min=1) * (y2 - y1).clip(min=1)) / max(1.0, roi_area)
+    center_offset = (x1 + x2) / 2.0 - (rx1 + rx2) / 2.0
+
+    valid = conf >= conf_threshold
+    if policy == "confidence":
+        score = conf
+    elif policy == "iou":
+        score = iou + conf * 1e-3
+    elif policy == "largest":
+        score = area + conf * 1e-3
+    else:
+        score = conf - _class_rank(xp, cls, class_priority) * 2.0
+    score = xp.where(valid, score, xp.full_like(score, -np.inf))
+
+    idx = score.argmax(-1)
+    rows = _arange(xp, pred.shape[0], pred)
+    picked = [a[rows, idx] for a in (x1, y1, x2, y2, conf, cls, iou, size_ratio, center_offset)]
+    picked.append(valid[rows, idx] * 1.0)
+    return xp.stack(picked, -1)
+
+
+def to_targets(scored):
+    """
+    score_candidates 결과를 프레임별 타깃 리스트로 변환 (단일 호스트 전송).
+    각 항목은 None 또는 ((x1, y1, x2, y2), conf, cls, iou, size_ratio, center_offset)
+    """
+    targets = []
+    for x1, y1, x2, y2, conf, cls, iou, ratio, offset, valid in scored.tolist():
+        if not valid:
+            targets.append(None)
+            continue
+        targets.append(((int(x1), int(y1), int(x2), int(y2)), float(conf), int(cls),
+                        float(iou), float(ratio), float(offset)))
+    return targets
+
+
+def _select_single(pred, roi, conf_threshold, policy, class_priority):
+    """
+    단일 프레임 numpy 경로: 정책 점수와 argmax만 배열 연산으로 하고,
+    IoU/크기 비율/중심 오프셋은 선택된 박스 하나에 대해서만 스칼라로 계산한다.
+    (프레임당 박스 수가 적어 score_candidates의 전체 지표 계산/stack 비용이 더 크다)
+    """
+    conf = pred[:, 4]
+    valid = conf >= conf_threshold
+    if not valid.any():
+        return None
+    if policy == "confidence":
+        score = conf
+    else:
+        x1, y1, x2, y2, cls = pred[:, 0], pred[:, 1], pred[:, 2], pred[:, 3], pred[:, 5]
+        area = (x2 - x1).clip(min=0) * (y2 - y1).clip(min=0)
+        if policy == "iou":
+            score = _roi_iou(x1, y1, x2, y2, area, roi) + conf * 1e-3
+        elif policy == "largest":
+            score = area + conf * 1e-3
+        else:
+            score = conf - _class_rank(np, cls, class_priority) * 2.0
+    idx = int(np.argmax(np.where(valid, score, -np.inf)))
+
+    x1, y1, x2, y2, conf, cls = pred[idx, :6].tolist()
+    rx1, ry1, rx2, ry2 = (float(v) for v in roi)
+    roi_area = max(0.0, rx2 - rx1) * max(0.0, ry2 - ry1)
+    size_ratio = max(1.0, x2 - x1) * max(1.0, y2 - y1) / max(1.0, roi_area)
+    center_offset = (x1 + x2) / 2.0 - (rx1 + rx2) / 2.0
+    return ((int(x1), int(y1), int(x2), int(y2)), float(conf), int(cls),
+            bbox_iou_xyxy((x1, y1, x2, y2), (rx1, ry1, rx2, ry2)), float(size_ratio), float(center_offset))
+
+
+def select_target(pred, roi, conf_threshold=0.5, policy="confidence", class_priority=None):
+    """단일 프레임 타깃 선택. 후보가 없으면 None"""
+    if policy not in POLICIES:
+        raise ValueError(f"Unknown target policy: {policy}")
+    if pred is None or len(pred) == 0:
+        return None
+    if _xp(pred) is np and pred.ndim == 2:
+        return _select_single(pred, roi, conf_threshold, policy, class_priority)
+    scored = score_candidates(pred, roi, conf_threshold, policy, class_priority)
+    return to_targets(scored)[0]
+
+
+def select_targets(preds, roi, conf_threshold=0.5, policy="confidence", class_priority=None):
+    """N개 프레임 타깃 일괄 선택. preds는 프레임별 예측 리스트 또는 (B, N, 6) 배열"""
+    if isinstance(preds, (list, tuple)):
+        if not preds:
+            return []
+        preds = pad_predictions(list(preds))
+    if preds.shape[-2] == 0:
+        return [None] * preds.shape[0]
+    scored = score_candidates(preds, roi, conf_threshold, policy, class_priority)
+    return to_targets(scored)
@@ -0,0 +1,276 @@
+"""
+공유 메모리 프레임 버스
+
+카메라를 소유한 프로세스 하나가 프레임을 링 버퍼에 쓰고, 여러 프로세스(탐지기, 녹화기,
+MJPEG 미리보기 등)가 복사/피클 없이 같은 메모리에서 읽는다.
+
+레이아웃 (little-endian):
+    header : magic u32, version u32, slots u32, height u32, width u32, channels u32, write_seq u64
+    slot i : seq u64, timestamp f64, frame bytes (height * width * channels)
+
+각 슬롯은 seqlock으로 보호된다. 쓰는 동안 슬롯 seq를 0으로 두고 다 쓴 뒤 새 seq를 기록하므로,
+읽는 쪽은 읽기 전/후 seq가 같은지로 찢어진 프레임을 걸러낸다.
+
+카메라 퍼블리셔 실행 (server 디렉토리에서):
+    python -m util.framebus --name agv_camera
+AGVService는 AGV_FRAME_BUS=agv_camera 로 실행하면 카메라 대신 버스를 읽는다.
+"""
+import argparse
+import struct
+import sys
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+MAGIC = 0xFB05
+VERSION = 1
+HEADER = struct.Struct("<IIIIIIQ")
+SLOT_HEADER = struct.Struct("<Qd")
+WRITE_SEQ_OFFSET = HEADER.size - 8
+
+
+def _attach(name):
+    """
+    기존 세그먼트에 연결. 3.13 미만에서는 연결만 해도 resource_tracker가 종료 시 unlink하므로
+    소비자 프로세스가 끝날 때 버스가 사라지지 않도록 추적에서 뺀다.
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    shm = shared_memory.SharedMemory(name=name)
+    resource_tracker.unregister(shm._name, "shared_memory")
+    return shm
+
+
+class _Layout:
+    def __init__(self, slots, shape):
+        self.slots = slots
+        self.shape = tuple(shape)
+        self.frame_bytes = int(np.prod(self.shape))
+        # 슬롯 시작 위치를 64바이트 단위로 정렬
+        self.slot_stride = (SLOT_HEADER.size + self.frame_bytes + 63) // 64 * 64
+        self.header_size = 64
+        self.size = self.header_size + self.slot_stride * slots
+
+    def slot_offset(self, i):
+        return self.header_size + self.slot_stride * i
+
+
+class FrameBus:
+    """링 버퍼 쓰기 쪽. 프로세스당 하나만 만든다."""
+
+    def __init__(self, name, shape=(300, 300, 3), slots=8):
+        self.layout = _Layout(slots, shape)
+        try:
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=self.layout.size)
+        except FileExistsError:
+            # 이전 퍼블리셔가 비정상 종료해 남은 세그먼트는 재사용
+            self.shm = shared_memory.SharedMemory(name=name)
+            if self.shm.size < self.layout.size:
+                raise ValueError(f"Frame bus {name} exists with a smaller size")
+        self.name = name
+        self.seq = 0
+        HEADER.pack_into(self.shm.buf, 0, MAGIC, VERSION, slots, *self._shape3(), 0)
+        self._frames = [self._frame_view(i) for i in range(slots)]
+        for i in range(slots):
+            SLOT_HEADER.pack_into(self.shm.buf, self.layout.slot_offset(i), 0, 0.0)
+
+    def _shape3(self):
+        shape = self.layout.shape
+        return (shape[0], shape[1], shape[2] if len(shape) > 2 else 1)
+
+    def _frame_view(self, i):
+        start = self.layout.slot_offset(i) + SLOT_HEADER.size
+        return np.ndarray(self.layout.shape, dtype=np.uint8, buffer=self.shm.buf, offset=start)
+
+    def publish(self, frame, timestamp=None):
+        """프레임을 다음 슬롯에 복사하고 seq를 반환"""
+        if frame.shape != self.layout.shape:
+            raise ValueError(f"Frame shape {frame.shape} != bus shape {self.layout.shape}")
+        seq = self.seq + 1
+        i = seq % self.layout.slots
+        offset = self.layout.slot_offset(i)
+        buf = self.shm.buf
+        SLOT_HEADER.pack_into(buf, offset, 0, 0.0)
+        self._frames[i][...] = frame
+        SLOT_HEADER.pack_into(buf, offset, seq, time.time() if timestamp is None else timestamp)
+        struct.pack_into("<Q", buf, WRITE_SEQ_OFFSET, seq)
+        self.seq = seq
+        return seq
+
+    def close(self, unlink=True):
+        self._frames = []
+        self.shm.close()
+        if unlink:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+
+
+class FrameBusReader:
+    """
+    읽기 쪽. 소비자마다 하나씩 만들며, 마지막으로 읽은 seq를 기준으로 놓친 프레임 수를 센다.
+        dropped : 읽지 못하고 지나간 프레임 수 (소비자가 느리면 증가)
+        torn    : 읽는 도중 덮어써져 버린 횟수
+    """
+
+    def __init__(self, name):
+        self.shm = _attach(name)
+        magic, version, slots, h, w, c, _ = HEADER.unpack_from(self.shm.buf, 0)
+        if magic != MAGIC or version != VERSION:
+            self.shm.close()
+            raise ValueError(f"{name} is not a frame bus (magic={magic:#x}, version={version})")
+        shape = (h, w, c) if c > 1 else (h, w)
+        self.layout = _Layout(slots, shape)
+        self.name = name
+        self.last_seq = 0
+        self.dropped = 0
+        self.torn = 0
+        self.received = 0
+        self._frames = []
+        for i in range(slots):
+            start = self.layout.slot_offset(i) + SLOT_HEADER.size
+            self._frames.append(np.ndarray(shape, dtype=np.uint8, buffer=self.shm.buf, offset=start))
+
+    @property
+    def write_seq(self):
+        return struct.unpack_from("<Q", self.shm.buf, WRITE_SEQ_OFFSET)[0]
+
+    def _slot_header(self, i):
+        return SLOT_HEADER.unpack_from(self.shm.buf, self.layout.slot_offset(i))
+
+    def read(self, seq, copy=True):
+        """
+        seq 프레임을 읽는다. (timestamp, frame) 또는 이미 덮어써졌으면 None.
+        copy=False면 공유 메모리 뷰를 돌려주므로, 사용 후 still_valid(seq)로 확인해야 한다.
+        """
+        i = seq % self.layout.slots
+        before, timestamp = self._slot_header(i)
+        if before != seq:
+            return None
+        frame = self._frames[i].copy() if copy else self._frames[i]
+        if copy and self._slot_header(i)[0] != seq:
+            self.torn += 1
+            return None
+        return timestamp, frame
+
+    def still_valid(self, seq):
+        return self._slot_header(seq % self.layout.slots)[0] == seq
+
+    def latest(self, copy=True):
+        """가장 최근 프레임 (seq, timestamp, frame). 아직 없으면 None. 중간 프레임은 dropped로 센다."""
+        for _ in range(self.layout.slots):
+            seq = self.write_seq
+            if seq == 0:
+                return None
+            if seq == self.last_seq:
+                return None
+            item = self.read(seq, copy)
+            if item is None:
+                continue
+            if self.last_seq:
+                self.dropped += max(0, seq - self.last_seq - 1)
+            self.last_seq = seq
+            self.received += 1
+            return (seq, *item)
+        return None
+
+    def next(self, timeout=None, poll=0.001, copy=True):
+        """새 프레임이 올 때까지 기다린다. timeout이면 None"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            item = self.latest(copy)
+            if item is not None:
+                return item
+            if deadline is not None and time.monotonic() >= deadline:
+                return None
+            time.sleep(poll)
+
+    def stats(self):
+        return {
+            "received": self.received,
+            "dropped": self.dropped,
+            "torn": self.torn,
+            "last_seq": self.last_seq,
+            "write_seq": self.write_seq,
+        }
+
+    def close(self):
+        self._frames = []
+        self.shm.close()
+
+
+class BusCamera:
+    """jetbot.Camera 대체. value는 버스의 최신 프레임 (새 프레임이 없으면 직전 프레임)."""
+
+    def __init__(self, name):
+        self.name = name
+        self.reader = None
+        self._last = None
+
+    @classmethod
+    def factory(cls, name):
+        """hardware 네임스페이스용 Camera 클래스 (instance(width, height) 지원)"""
+        class Camera:
+            @staticmethod
+            def instance(width=300, height=300):
+                return cls(name)
+        return Camera
+
+    def start(self):
+        if self.reader is None:
+            self.reader = FrameBusReader(self.name)
+
+    def stop(self):
+        if self.reader is not None:
+            self.reader.close()
+            self.reader = None
+        self._last = None
+
+    @property
+    def value(self):
+        if self.reader is None:
+            return None
+        item = self.reader.latest()
+        if item is not None:
+            self._last = item[2]
+        return self._last
+
+
+def serve(name, width=300, height=300, slots=8):
+    """jetbot 카메라 프레임을 버스로 내보낸다 (카메라를 소유하는 유일한 프로세스)."""
+    from jetbot import Camera
+
+    camera = Camera.instance(width=width, height=height)
+    bus = FrameBus(name, (height, width, 3), slots)
+
+    def on_frame(change):
+        bus.publish(change["new"])
+
+    camera.observe(on_frame, names="value")
+    print(f"Frame bus [{name}] publishing {width}x{height} ({slots} slots)")
+    try:
+        while True:
+            time.sleep(5)
+            print(f"Frame bus [{name}] seq={bus.seq}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        camera.unobserve(on_frame, names="value")
+        camera.stop()
+        bus.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--name", default="agv_camera")
+    parser.add_argument("--width", type=int, default=300)
+    parser.add_argument("--height", type=int, default=300)
+    parser.add_argument("--slots", type=int, default=8)
+    args = parser.parse_args()
+    serve(args.name, args.width, args.height, args.slots)
+
+
+if __name__ == "__main__":
+    main()
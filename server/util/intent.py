@@ -0,0 +1,29 @@
+from util.cache import normalize
+
+# 정규화된 문장(공백/문장부호 제거)에 대해 매칭
+DRINK_KEYWORDS = ("채워", "따라줘", "따라주", "한잔더", "더줘", "더주세요", "잔이비", "잔비었", "리필", "프로세스가동")
+REFUSE_KEYWORDS = ("그만마", "그만먹", "안마실", "안마셔", "못마시", "못마셔", "술끊")
+NEGATION_KEYWORDS = ("지마", "말아", "말고", "않")
+
+FAST_RESPONSES = {
+    "drink": "[잔채우기 프로세스 가동]\n아이! 잔이 비면 안되지요~ 금방 채워드릴게요오!",
+    "no": "그러기엔... 너무 멀리 떠나왔어요! 한 잔만 더 드셔야해요~",
+}
+
+
+def classify(text: str) -> str | None:
+    """
+    명백한 잔 채우기/거절 요청을 drink/no 명령으로 분류한다.
+    애매하면 None을 반환하여 LLM으로 넘긴다.
+    """
+    key = normalize(text)
+    if not key:
+        return None
+
+    refuse = any(k in key for k in REFUSE_KEYWORDS)
+    drink = any(k in key for k in DRINK_KEYWORDS)
+    if refuse and not drink:
+        return "no"
+    if drink and not refuse and not any(k in key for k in NEGATION_KEYWORDS):
+        return "drink"
+    return None
@@ -0,0 +1,136 @@
+import collections
+import threading
+import time
+
+
+class LatestQueue:
+    """크기가 제한된 latest-frame-wins 큐. 가득 차면 가장 오래된 항목을 버린다."""
+
+    def __init__(self, maxsize: int = 1):
+        self._items = collections.deque(maxlen=maxsize)
+        self._cond = threading.Condition()
+        self.dropped = 0
+
+    def put(self, item):
+        with self._cond:
+            if len(self._items) == self._items.maxlen:
+                self.dropped += 1
+            self._items.append(item)
+            self._cond.notify()
+
+    def get(self, timeout: float | None = None):
+        with self._cond:
+            if not self._items:
+                self._cond.wait(timeout)
+            if not self._items:
+                return None
+            return self._items.popleft()
+
+    def clear(self):
+        with self._cond:
+            self._items.clear()
+            self._cond.notify_all()
+
+    def __len__(self):
+        return len(self._items)
+
+
+class StageStats:
+    """파이프라인 단계별 지연 시간 통계 (ms)"""
+
+    def __init__(self, name: str, alpha: float = 0.1):
+        self.name = name
+        self.alpha = alpha
+        self.count = 0
+        self.last_ms = 0.0
+        self.avg_ms = 0.0
+        self.max_ms = 0.0
+        self._last_end = None
+        self.rate_hz = 0.0
+
+    def record(self, dt: float):
+        ms = dt * 1000.0
+        self.count += 1
+        self.last_ms = ms
+        self.avg_ms = ms if self.count == 1 else (1 - self.alpha) * self.avg_ms + self.alpha * ms
+        self.max_ms = max(self.max_ms, ms)
+
+        now = time.perf_counter()
+        if self._last_end is not None:
+            period = now - self._last_end
+            if period > 0:
+                hz = 1.0 / period
+                self.rate_hz = hz if self.count == 2 else (1 - self.alpha) * self.rate_hz + self.alpha * hz
+        self._last_end = now
+
+    def reset(self):
+        self.__init__(self.name, self.alpha)
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.count,
+            "last_ms": round(self.last_ms, 2),
+            "avg_ms": round(self.avg_ms, 2),
+            "max_ms": round(self.max_ms, 2),
+            "rate_hz": round(self.rate_hz, 2),
+        }
+
+
+class TimedMotor:
+    """
+    robot 모터 명령을 duration 동안 유지한 뒤 자동으로 정지시키는 논블로킹 드라이버.
+    새 명령은 진행 중인 펄스를 즉시 대체한다.
+    """
+
+    def __init__(self, robot):
+        self.robot = robot
+        self._cond = threading.Condition()
+        self._deadline = None
+        self._running = True
+        self._thread = threading.Thread(target=self._watch, daemon=True)
+        self._thread.start()
+
+    @property
+    def busy(self) -> bool:
+        deadline = self._deadline
+        return deadline is not None and time.monotonic() < deadline
+
+    def pulse(self, action: str, speed: float, duration: float):
+        with self._cond:
+            getattr(self.robot, action)(speed)
+            self._deadline = time.monotonic() + duration
+            self._cond.notify()
+
+    def drive(self, left: float, right: float, watchdog: float):
+        """좌/우 모터 속도 설정. watchdog 안에 다시 호출되지 않으면 정지"""
+        with self._cond:
+            self.robot.set_motors(left, right)
+            self._deadline = time.monotonic() + watchdog
+            self._cond.notify()
+
+    def stop(self):
+        with self._cond:
+            self._deadline = None
+            self.robot.stop()
+            self._cond.notify()
+
+    def close(self):
+        with self._cond:
+            self._running = False
+            self._deadline = None
+            self._cond.notify()
+        self._thread.join(timeout=1.0)
+        self.robot.stop()
+
+    def _watch(self):
+        with self._cond:
+            while self._running:
+                if self._deadline is None:
+                    self._cond.wait()
+                    continue
+                remaining = self._deadline - time.monotonic()
+                if remaining > 0:
+                    self._cond.wait(remaining)
+                    continue
+                self._deadline = None
+                self.robot.stop()
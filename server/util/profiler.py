@@ -0,0 +1,114 @@
+import collections
+import os
+import sys
+import threading
+import time
+
+
+class SamplingProfiler:
+    """
+    모든 스레드의 콜스택을 interval 간격으로 샘플링하는 저비용 프로파일러.
+    실행 중에 start()/stop()으로 켜고 끌 수 있고, 결과는 flamegraph용 folded 형식으로 내보낸다.
+    꺼져 있을 때는 비용이 없다.
+    """
+
+    def __init__(self, interval=0.005, max_depth=48):
+        self.interval = interval
+        self.max_depth = max_depth
+        self.samples = collections.Counter()
+        self.total = 0
+        self.started_at = None
+        self.duration = 0.0
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._samples_lock = threading.Lock()  # samples/total (샘플러 스레드와 조회 쪽이 공유)
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, interval=None, reset=True):
+        with self._lock:
+            if self.running:
+                return False
+            if interval:
+                self.interval = interval
+            if reset:
+                with self._samples_lock:
+                    self.samples.clear()
+                    self.total = 0
+                self.duration = 0.0
+            self._stop.clear()
+            self.started_at = time.monotonic()
+            self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+            self._thread.start()
+            return True
+
+    def stop(self):
+        with self._lock:
+            if not self.running:
+                return False
+            self._stop.set()
+            thread = self._thread
+        thread.join(timeout=1.0)
+        self.duration += time.monotonic() - self.started_at
+        self._thread = None
+        return True
+
+    def _run(self):
+        own = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            stacks = []
+            for ident, frame in frames.items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None and len(stack) < self.max_depth:
+                    code = frame.f_code
+                    stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                    frame = frame.f_back
+                if ident not in names:
+                    names = {t.ident: t.name for t in threading.enumerate()}
+                stack.append(names.get(ident, str(ident)))
+                stacks.append(";".join(reversed(stack)))
+            with self._samples_lock:
+                self.samples.update(stacks)
+                self.total += 1
+
+    def snapshot(self):
+        """(스택별 샘플 수 복사본, tick 수)"""
+        with self._samples_lock:
+            return dict(self.samples), self.total
+
+    def folded(self):
+        """'thread;file:func;... count' 형식 (flamegraph.pl / speedscope 입력)"""
+        samples, _ = self.snapshot()
+        ordered = sorted(samples.items(), key=lambda item: item[1], reverse=True)
+        return "\n".join(f"{stack} {count}" for stack, count in ordered) + "\n"
+
+    def top(self, limit=20):
+        """샘플에서 가장 자주 등장한 함수 (self time 기준)"""
+        samples, _ = self.snapshot()
+        leaf = collections.Counter()
+        for stack, count in samples.items():
+            leaf[stack.rsplit(";", 1)[-1]] += count
+        n = sum(leaf.values()) or 1
+        return [{"function": name, "samples": count, "ratio": round(count / n, 4)}
+                for name, count in leaf.most_common(limit)]
+
+    def report(self, limit=20):
+        duration = self.duration + (time.monotonic() - self.started_at if self.running else 0.0)
+        _, ticks = self.snapshot()
+        return {
+            "running": self.running,
+            "interval": self.interval,
+            "ticks": ticks,
+            "duration_s": round(duration, 2),
+            "top": self.top(limit),
+        }
+
+
+profiler = SamplingProfiler()
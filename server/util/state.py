@@ -0,0 +1,120 @@
+import threading
+import time
+
+from util.broadcast import Broadcast
+
+
+class InvalidTransition(Exception):
+    pass
+
+
+class StateMachine:
+    """
+    스레드 안전 상태 머신. 허용된 전이만 수행하고, 상태/메시지가 바뀔 때마다
+    스냅샷을 한 번 만들어 Broadcast로 발행한다 (구독자 수와 무관한 발행 비용).
+
+    transitions: {현재 상태: {다음 상태, ...}}
+    message_interval: 메시지만 바뀌는 발행의 최소 간격 (초). 상태 전이는 항상 즉시 발행한다
+    """
+
+    def __init__(self, transitions, initial, message="", message_interval=0.0):
+        self.transitions = {state: frozenset(targets) for state, targets in transitions.items()}
+        self.message_interval = message_interval
+        self.updates = Broadcast()
+        self._cond = threading.Condition()
+        self._state = initial
+        self._message = message
+        self._since = time.time()
+        self._published = 0.0   # 마지막 발행 시각 (monotonic)
+        self._pending = False   # 간격 제한으로 미뤄진 메시지가 있음
+        self._flush = None      # 미뤄진 메시지 발행 타이머
+        with self._cond:
+            self._publish()
+
+    @property
+    def state(self):
+        return self._state
+
+    @property
+    def message(self):
+        return self._message
+
+    def snapshot(self):
+        """마지막으로 발행된 상태 {"seq", "state", "message", "since", "time"}"""
+        return self.updates.latest[1]
+
+    def _publish(self):
+        # self._cond를 잡은 상태에서 호출
+        snapshot = {
+            "seq": self.updates.seq + 1,
+            "state": self._state,
+            "message": self._message,
+            "since": self._since,
+            "time": time.time(),
+        }
+        self.updates.publish(snapshot)
+        self._published = time.monotonic()
+        self._pending = False
+        self._cond.notify_all()
+
+    def can(self, target):
+        return target in self.transitions.get(self._state, ())
+
+    def transition(self, target, message=None, expect=None):
+        """
+        target으로 전이. expect가 주어지면 현재 상태가 그 중 하나일 때만 전이한다.
+        전이할 수 없으면 InvalidTransition.
+        """
+        with self._cond:
+            current = self._state
+            if expect is not None and current not in expect:
+                raise InvalidTransition(f"{current} -> {target} (expected {'/'.join(expect)})")
+            if target != current and target not in self.transitions.get(current, ()):
+                raise InvalidTransition(f"{current} -> {target}")
+            if target != current:
+                self._state = target
+                self._since = time.time()
+            if message is not None:
+                self._message = message
+            self._publish()
+            return current
+
+    def try_transition(self, target, message=None, expect=None):
+        """transition과 같지만 실패 시 예외 대신 False"""
+        try:
+            self.transition(target, message, expect)
+            return True
+        except InvalidTransition:
+            return False
+
+    def set_message(self, message):
+        """
+        상태는 그대로 두고 메시지만 갱신 (같은 메시지면 발행하지 않음).
+        message_interval 안에 다시 바뀌면 발행을 미루고, 구간이 끝날 때 마지막 메시지만 발행한다.
+        (제어 루프가 프레임마다 IoU가 담긴 메시지를 갱신해도 구독자에게는 간격당 한 번)
+        """
+        with self._cond:
+            if message == self._message:
+                return
+            self._message = message
+            wait = self._published + self.message_interval - time.monotonic()
+            if wait <= 0:
+                self._publish()
+                return
+            self._pending = True
+            if self._flush is None:
+                self._flush = threading.Timer(wait, self._flush_message)
+                self._flush.daemon = True
+                self._flush.start()
+
+    def _flush_message(self):
+        with self._cond:
+            self._flush = None
+            # 그 사이 상태 전이로 이미 발행되었으면 건너뜀
+            if self._pending:
+                self._publish()
+
+    def wait_for(self, states, timeout=None):
+        """상태가 states 중 하나가 될 때까지 대기. 도달하면 True"""
+        with self._cond:
+            return self._cond.wait_for(lambda: self._state in states, timeout)
@@ -0,0 +1,51 @@
+import struct
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# JetBot 상태 프레임 디코더. jetbot/mqtt/telemetry.py 와 동일한 레이아웃
+FRAME = struct.Struct("<BBIdffBBIffHI")
+MAGIC = 0xA7
+NO_SEQ = 0xFFFFFFFF
+
+STATES = ("idle", "busy", "stopped", "rejected")
+COMMANDS = (None, "forward", "backward", "left", "right", "stop", "grab", "drink", "no")
+
+
+def decode_status(payload):
+    """
+    AGV/STATUS/<id> 페이로드를 dict로 변환.
+    MQTTService가 이미 JSON을 파싱한 dict, 바이너리 struct 프레임, msgpack을 모두 처리한다.
+    """
+    if isinstance(payload, dict):
+        return payload
+    if not isinstance(payload, (bytes, bytearray)):
+        return {}
+
+    if len(payload) == FRAME.size and payload[0] == MAGIC:
+        (_, _, seq, timestamp, left, right, state, last_cmd,
+         last_seq, loop_ms, latency_ms, queue_depth, job) = FRAME.unpack(payload)
+        return {
+            "seq": seq,
+            "timestamp": timestamp,
+            "left": left,
+            "right": right,
+            "state": STATES[state] if state < len(STATES) else None,
+            "last_command": COMMANDS[last_cmd] if last_cmd < len(COMMANDS) else None,
+            "last_seq": None if last_seq == NO_SEQ else last_seq,
+            "loop_ms": loop_ms,
+            "cmd_latency_ms": latency_ms,
+            "queue_depth": queue_depth,
+            "job": None if job == NO_SEQ else job,
+        }
+
+    if msgpack is not None:
+        try:
+            frame = msgpack.unpackb(payload)
+            if isinstance(frame, dict):
+                return frame
+        except Exception:
+            pass
+    return {}
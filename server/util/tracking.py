@@ -0,0 +1,150 @@
+import numpy as np
+
+
+class BoxKalman:
+    """bbox (cx, cy, w, h)에 대한 등속 모델 칼만 필터"""
+
+    def __init__(self, process_noise=4.0, measurement_noise=4.0):
+        self.q = process_noise
+        self.r = measurement_noise
+        self.x = None
+        self.P = None
+        self.H = np.hstack([np.eye(4), np.zeros((4, 4))])
+
+    @property
+    def initialized(self):
+        return self.x is not None
+
+    def reset(self):
+        self.x = None
+        self.P = None
+
+    def init(self, box):
+        self.x = np.zeros(8)
+        self.x[:4] = self._to_cxcywh(box)
+        self.P = np.diag([10.0] * 4 + [100.0] * 4)
+
+    def predict(self, dt):
+        F = np.eye(8)
+        F[:4, 4:] = np.eye(4) * dt
+        Q = np.eye(8) * self.q * max(dt, 1e-3)
+        self.x = F @ self.x
+        self.P = F @ self.P @ F.T + Q
+        return self.box
+
+    def update(self, box):
+        z = self._to_cxcywh(box)
+        S = self.H @ self.P @ self.H.T + np.eye(4) * self.r
+        K = self.P @ self.H.T @ np.linalg.inv(S)
+        self.x = self.x + K @ (z - self.H @ self.x)
+        self.P = (np.eye(8) - K @ self.H) @ self.P
+
+    @property
+    def box(self):
+        cx, cy, w, h = self.x[:4]
+        return (cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2)
+
+    @staticmethod
+    def _to_cxcywh(box):
+        x1, y1, x2, y2 = box
+        return np.array([(x1 + x2) / 2, (y1 + y2) / 2, x2 - x1, y2 - y1], dtype=float)
+
+
+class InferenceScheduler:
+    """
+    전체 탐지가 필요한 프레임만 골라낸다.
+        skip   : 쿨다운/집기 중 (결과를 쓰지 않으므로 추론하지 않음)
+        detect : 로봇이 움직였거나, 타깃/ROI 주변 변화가 크거나, max_interval 경과
+        track  : 장면 변화가 작아 칼만 예측 박스로 대체
+    """
+
+    def __init__(self, diff_threshold=6.0, max_interval=0.5, downsample=6, margin=12):
+        self.diff_threshold = diff_threshold
+        self.max_interval = max_interval
+        self.downsample = downsample
+        self.margin = margin
+        self.tracker = BoxKalman()
+        self.counts = {"frames": 0, "detect": 0, "track": 0, "skip": 0}
+        self.reset()
+
+    def reset(self):
+        self.tracker.reset()
+        self._key = None
+        self._last_detect = 0.0
+        self._last_t = 0.0
+        self._target = None
+        self._moved = True
+        self._reinit = True
+        for k in self.counts:
+            self.counts[k] = 0
+
+    def notify_motion(self):
+        """로봇이 움직이면 카메라 시점이 바뀌므로 다음 프레임은 전체 탐지"""
+        self._moved = True
+        # 자체 이동에 의한 박스 변화를 타깃 속도로 학습하지 않도록 필터 재시작
+        self._reinit = True
+
+    def decide(self, image, now, cooldown, roi):
+        self.counts["frames"] += 1
+        if cooldown:
+            mode = "skip"
+        elif self._moved or self._key is None or now - self._last_detect >= self.max_interval:
+            mode = "detect"
+        elif self._change(image, roi) > self.diff_threshold:
+            mode = "detect"
+        else:
+            mode = "track"
+        if mode == "detect":
+            # 탐지 도중 notify_motion()이 오면 다시 True가 되어 다음 프레임도 탐지
+            self._moved = False
+        self.counts[mode] += 1
+        return mode
+
+    def on_detection(self, image, now, best):
+        self._key = self._thumb(image)
+        self._last_detect = now
+        if best is None:
+            self.tracker.reset()
+            self._target = None
+        else:
+            bbox, conf, cls = best[0], best[1], best[2]
+            if self.tracker.initialized and not self._reinit:
+                self.tracker.predict(now - self._last_t)
+                self.tracker.update(bbox)
+            else:
+                self.tracker.init(bbox)
+                self._reinit = False
+            self._target = (conf, cls)
+        self._last_t = now
+
+    def track(self, now):
+        """예측 박스를 (N, 6) 예측 배열로 반환. 추적 중인 타깃이 없으면 None"""
+        if self._target is None or not self.tracker.initialized:
+            return None
+        box = self.tracker.predict(now - self._last_t)
+        self._last_t = now
+        conf, cls = self._target
+        return np.array([[*box, conf, cls]], dtype=np.float32)
+
+    def _thumb(self, image):
+        return image[::self.downsample, ::self.downsample, 1].astype(np.int16)
+
+    def _change(self, image, roi):
+        """마지막 탐지 프레임 대비 타깃+ROI 영역의 평균 밝기 변화"""
+        thumb = self._thumb(image)
+        boxes = [roi]
+        if self.tracker.initialized:
+            boxes.append(self.tracker.box)
+        x1 = min(b[0] for b in boxes) - self.margin
+        y1 = min(b[1] for b in boxes) - self.margin
+        x2 = max(b[2] for b in boxes) + self.margin
+        y2 = max(b[3] for b in boxes) + self.margin
+
+        ds = self.downsample
+        h, w = thumb.shape
+        sx1, sy1 = max(0, int(x1 // ds)), max(0, int(y1 // ds))
+        sx2, sy2 = min(w, int(x2 // ds) + 1), min(h, int(y2 // ds) + 1)
+        if sx2 <= sx1 or sy2 <= sy1:
+            return float("inf")
+        diff = np.abs(thumb[sy1:sy2, sx1:sx2] - self._key[sy1:sy2, sx1:sx2])
+        return float(diff.mean())
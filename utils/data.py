@@ -3,49 +3,120 @@ import time
 import random
 import os
 import csv
-from jetbot import Robot, Camera  # [Changed] Import Camera
-from SCSCtrl import TTLServo
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 # ==========================================
 # 1. Configuration Variables
 # ==========================================
-robot = Robot()
-
-# [Camera Setup]
-# Using Jetbot Camera class as requested
-# 300x300 is standard for Jetbot models (like ResNet)
-camera = Camera.instance(width=300, height=300) 
-
 MOTOR_SPEED = 0.3     # 0.4 means 40% speed
 MAX_DURATION = 0.4    # Max rotation duration
 MIN_DURATION = 0.1    # Min rotation duration
-NUM_SAMPLES = 100     # Number of samples
+NUM_SAMPLES = 100     # Number of samples (step mode)
+NUM_FRAMES = 3000     # Number of frames (continuous mode)
 SAVE_DIR = "dataset_full4"
 CSV_FILE = "body_angle_data_full4.csv"
+CONT_CSV_FILE = "body_motion_data_full4.csv"
+
+SETTLE_TIME = 0.5     # Wait for vibration before capture (step mode)
+RETURN_WAIT = 1.0     # Wait after returning to origin (step mode)
+
+WRITER_THREADS = 2    # JPEG encode/write workers (cv2 releases the GIL while encoding)
+MAX_PENDING = 64      # Max frames waiting for the writer pool (bounds memory)
+FLUSH_EVERY = 50      # Label rows buffered before one CSV append
+JPEG_QUALITY = 95
+
+STEP_HEADER = ["filename", "direction", "duration", "motor_speed"]
+CONT_HEADER = ["filename", "timestamp", "left_motor", "right_motor", "direction", "segment_duration", "segment_elapsed"]
+
 
 # ==========================================
-# 2. Initialization
+# 2. Background Writer
 # ==========================================
-if not os.path.exists(SAVE_DIR):
-    os.makedirs(SAVE_DIR)
+class CaptureWriter:
+    """
+    Encodes and writes frames on a thread pool so the capture loop never waits on disk.
+    Label rows are buffered and appended to the CSV in batches.
+    """
+
+    def __init__(self, save_dir, csv_file, header, threads=WRITER_THREADS,
+                 max_pending=MAX_PENDING, flush_every=FLUSH_EVERY, quality=JPEG_QUALITY):
+        self.save_dir = save_dir
+        self.csv_file = csv_file
+        self.flush_every = flush_every
+        self.params = [cv2.IMWRITE_JPEG_QUALITY, quality]
+        self.saved = 0
+        self.dropped = 0
+        self.failed = 0
+
+        if not os.path.exists(save_dir):
+            os.makedirs(save_dir)
+        if not os.path.exists(csv_file):
+            with open(csv_file, mode='w', newline='') as file:
+                csv.writer(file).writerow(header)
+
+        self._pool = ThreadPoolExecutor(max_workers=threads)
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._rows = []
+        self._lock = threading.Lock()
+
+    def submit(self, frame, filename, row, block=True):
+        """Queue a frame for writing. Returns False if the queue is full and block=False."""
+        if not self._slots.acquire(block):
+            self.dropped += 1
+            return False
+        # camera.value may be reused by the driver; keep our own copy
+        self._pool.submit(self._write, frame.copy(), filename, row)
+        return True
+
+    def _write(self, frame, filename, row):
+        try:
+            ok, buf = cv2.imencode('.jpg', frame, self.params)
+            if not ok:
+                raise IOError("JPEG encode failed")
+            with open(os.path.join(self.save_dir, filename), 'wb') as f:
+                f.write(buf.tobytes())
+            with self._lock:
+                self._rows.append(row)
+                self.saved += 1
+                rows = self._take_rows() if len(self._rows) >= self.flush_every else None
+            if rows:
+                self._append(rows)
+        except Exception as e:
+            self.failed += 1
+            print("Write error ({}): {}".format(filename, e))
+        finally:
+            self._slots.release()
 
-# Wait for camera to start up
-print("Waiting for camera to initialize...")
-time.sleep(2.0)
+    def _take_rows(self):
+        rows, self._rows = self._rows, []
+        return rows
+
+    def _append(self, rows):
+        with open(self.csv_file, mode='a', newline='') as file:
+            csv.writer(file).writerows(rows)
+
+    def flush(self):
+        with self._lock:
+            rows = self._take_rows()
+        if rows:
+            self._append(rows)
+
+    def close(self):
+        self._pool.shutdown(wait=True)
+        self.flush()
+        print("Writer: saved={} dropped={} failed={}".format(self.saved, self.dropped, self.failed))
 
-# Write CSV Header
-if not os.path.exists(CSV_FILE):
-    with open(CSV_FILE, mode='w', newline='') as file:
-        writer = csv.writer(file)
-        writer.writerow(["filename", "direction", "duration", "motor_speed"])
 
 # ==========================================
 # 3. Define Motor Control Functions
 # ==========================================
-def stop_robot():
+def stop_robot(robot):
     robot.stop()
 
-def turn_robot(direction, duration):
+
+def turn_robot(robot, direction, duration):
     """
     direction: 1 (Right Turn), -1 (Left Turn)
     duration: movement time (seconds)
@@ -56,66 +127,161 @@ def turn_robot(direction, duration):
     else:
         # Left Turn
         robot.set_motors(-MOTOR_SPEED, MOTOR_SPEED)
-    
+
     time.sleep(duration)
-    stop_robot()
+    stop_robot(robot)
 
-# ==========================================
-# 4. Data Collection Loop
-# ==========================================
-print("Start collecting {} samples...".format(NUM_SAMPLES))
 
-try:
-    TTLServo.servoAngleCtrl(1, 3, 1, 500)
-    TTLServo.servoAngleCtrl(2, -5, 1, 500)
-    TTLServo.servoAngleCtrl(3, 0, 1, 500)
-    TTLServo.servoAngleCtrl(4, 0, 1, 150)
-    TTLServo.servoAngleCtrl(5, 30, 1, 150)
+def init_arm(servo):
+    servo.servoAngleCtrl(1, 3, 1, 500)
+    servo.servoAngleCtrl(2, -5, 1, 500)
+    servo.servoAngleCtrl(3, 0, 1, 500)
+    servo.servoAngleCtrl(4, 0, 1, 150)
+    servo.servoAngleCtrl(5, 30, 1, 150)
+
 
-    for i in range(NUM_SAMPLES):
+# ==========================================
+# 4. Data Collection Loops
+# ==========================================
+def collect_step(robot, camera, writer, num_samples=NUM_SAMPLES):
+    """Stop-and-go: turn, settle, capture, return. Writing overlaps with the return turn."""
+    print("Start collecting {} samples...".format(num_samples))
+    for i in range(num_samples):
         # 1. Determine random action
         rand_dir = random.choice([1, -1])
         rand_dur = random.uniform(MIN_DURATION, MAX_DURATION)
-        
+
         # 2. Rotate Robot
-        turn_robot(rand_dir, rand_dur)
-        
+        turn_robot(robot, rand_dir, rand_dur)
+
         # 3. Wait for vibration
-        time.sleep(0.5)
-        
+        time.sleep(SETTLE_TIME)
+
         # 4. Capture Image from Jetbot Camera
-        # camera.value holds the current frame as a numpy array
         frame = camera.value
-        
+
         if frame is None:
             print("Frame error (None), skipping...")
         else:
-            # 5. Save Image
+            # 5. Queue image + label for the writer pool
             direction_str = 'R' if rand_dir == 1 else 'L'
             filename = "body_{:04d}_{}_{:.2f}s.jpg".format(i, direction_str, rand_dur)
-            
-            filepath = os.path.join(SAVE_DIR, filename)
-            cv2.imwrite(filepath, frame)
-            
-            # 6. Save Label
-            with open(CSV_FILE, mode='a', newline='') as file:
-                writer = csv.writer(file)
-                writer.writerow([filename, rand_dir, rand_dur, MOTOR_SPEED])
-            
-            print("[{}/{}] Saved: {}".format(i+1, NUM_SAMPLES, filename))
-
-        # 7. Return to Origin
-        turn_robot(-rand_dir, rand_dur)
-        
+            writer.submit(frame, filename, [filename, rand_dir, rand_dur, MOTOR_SPEED])
+            print("[{}/{}] Captured: {}".format(i + 1, num_samples, filename))
+
+        # 6. Return to Origin
+        turn_robot(robot, -rand_dir, rand_dur)
+
         # Wait before next loop
-        time.sleep(1.0)
+        time.sleep(RETURN_WAIT)
+
+
+class MotionState:
+    """Current motor command, shared between the motion loop and the camera callback."""
+
+    def __init__(self):
+        self.left = 0.0
+        self.right = 0.0
+        self.direction = 0
+        self.duration = 0.0
+        self.started = time.time()
+
+    def set(self, robot, direction, duration):
+        speed = MOTOR_SPEED * direction
+        self.left, self.right = speed, -speed
+        self.direction = direction
+        self.duration = duration
+        self.started = time.time()
+        robot.set_motors(self.left, self.right)
+
+
+def collect_continuous(robot, camera, writer, num_frames=NUM_FRAMES):
+    """
+    Keeps turning in random segments (and back, to stay near the origin)
+    while every camera frame is recorded with its timestamp and motor state.
+    """
+    print("Start continuous capture of {} frames...".format(num_frames))
+    state = MotionState()
+    done = threading.Event()
+    count = [0]
+
+    def on_frame(change):
+        if done.is_set():
+            return
+        frame = change['new']
+        t = time.time()
+        i = count[0]
+        filename = "motion_{:06d}_{:.3f}.jpg".format(i, t)
+        row = [filename, "{:.4f}".format(t), state.left, state.right, state.direction,
+               "{:.3f}".format(state.duration), "{:.3f}".format(t - state.started)]
+        # never block the camera thread; drop the frame if the writers fall behind
+        if writer.submit(frame, filename, row, block=False):
+            count[0] += 1
+            if count[0] % 100 == 0:
+                print("[{}/{}] frames (dropped {})".format(count[0], num_frames, writer.dropped))
+            if count[0] >= num_frames:
+                done.set()
+
+    camera.observe(on_frame, names='value')
+    try:
+        while not done.is_set():
+            direction = random.choice([1, -1])
+            duration = random.uniform(MIN_DURATION, MAX_DURATION)
+            for d in (direction, -direction):
+                state.set(robot, d, duration)
+                if done.wait(duration):
+                    break
+    finally:
+        camera.unobserve(on_frame, names='value')
+        stop_robot(robot)
+        state.set(robot, 0, 0.0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JetBot body-angle dataset capture")
+    parser.add_argument("--mode", default="step", choices=["step", "continuous"])
+    parser.add_argument("--samples", type=int, default=NUM_SAMPLES, help="step mode sample count")
+    parser.add_argument("--frames", type=int, default=NUM_FRAMES, help="continuous mode frame count")
+    parser.add_argument("--save-dir", default=SAVE_DIR)
+    parser.add_argument("--threads", type=int, default=WRITER_THREADS)
+    args = parser.parse_args()
+
+    from jetbot import Robot, Camera
+    from SCSCtrl import TTLServo
+
+    robot = Robot()
+    # 300x300 is standard for Jetbot models (like ResNet)
+    camera = Camera.instance(width=300, height=300)
+
+    # Wait for camera to start up
+    print("Waiting for camera to initialize...")
+    time.sleep(2.0)
+
+    if args.mode == "step":
+        writer = CaptureWriter(args.save_dir, CSV_FILE, STEP_HEADER, threads=args.threads)
+    else:
+        writer = CaptureWriter(args.save_dir, CONT_CSV_FILE, CONT_HEADER, threads=args.threads)
+
+    t0 = time.time()
+    try:
+        init_arm(TTLServo)
+        if args.mode == "step":
+            collect_step(robot, camera, writer, args.samples)
+        else:
+            collect_continuous(robot, camera, writer, args.frames)
+
+    except KeyboardInterrupt:
+        print("\nInterrupted! Stopping motors.")
+
+    finally:
+        stop_robot(robot)
+        writer.close()
+        # Jetbot Camera usually doesn't need explicit release like cv2,
+        # but stopping the camera allows other apps to use it.
+        camera.stop()
+        elapsed = time.time() - t0
+        print("Done. {} frames in {:.1f}s ({:.1f} fps)".format(writer.saved, elapsed, writer.saved / max(elapsed, 1e-6)))
 
-except KeyboardInterrupt:
-    print("\nInterrupted! Stopping motors.")
 
-finally:
-    stop_robot()
-    # Jetbot Camera usually doesn't need explicit release like cv2, 
-    # but stopping the camera allows other apps to use it.
-    camera.stop()
-    print("Done.")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
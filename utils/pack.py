@@ -0,0 +1,234 @@
+"""
+Sharded dataset packer + memory-mapped loader
+
+Converts a capture directory (loose JPEGs + label CSV from data.py) into a few
+large shards so training reads a handful of files instead of tens of thousands:
+
+    out_dir/
+        index.json          format version, columns, shard list
+        shard_0000.bin      concatenated encoded images (JPEG bytes as captured)
+        shard_0000.npy      structured label table: offset, length, filename, label columns
+        ...
+
+Pack:
+    python pack.py dataset_full4 body_angle_data_full4.csv packed_full4
+Read:
+    ds = ShardDataset("packed_full4")
+    image, label = ds[0]
+    for images, labels in ds.batches(64, shuffle=True, workers=4): ...
+"""
+import argparse
+import csv
+import json
+import os
+import time
+
+import numpy as np
+
+FORMAT_VERSION = 1
+SHARD_BYTES = 256 * 1024 * 1024
+FILENAME_BYTES = 64
+
+
+def _column_type(values):
+    """CSV column -> numpy dtype (int32 / float64, otherwise fixed-width bytes)"""
+    try:
+        ints = [int(v) for v in values]
+        if all(-2 ** 31 <= v < 2 ** 31 for v in ints):
+            return "<i4"
+    except ValueError:
+        pass
+    try:
+        [float(v) for v in values]
+        # float64: continuous-mode timestamps need sub-second precision
+        return "<f8"
+    except ValueError:
+        width = max([len(v.encode("utf-8")) for v in values] + [1])
+        return "S{}".format(width)
+
+
+def read_labels(csv_file):
+    with open(csv_file, newline='') as f:
+        rows = list(csv.DictReader(f))
+    if not rows:
+        raise ValueError("No rows in {}".format(csv_file))
+    columns = [c for c in rows[0].keys() if c != "filename"]
+    dtypes = [(c, _column_type([r[c] for r in rows])) for c in columns]
+    return rows, dtypes
+
+
+def pack(image_dir, csv_file, out_dir, shard_bytes=SHARD_BYTES):
+    """Packs every labeled image into shards. Rows whose image is missing are skipped."""
+    rows, label_dtypes = read_labels(csv_file)
+    dtype = np.dtype([("offset", "<u8"), ("length", "<u4"), ("filename", "S{}".format(FILENAME_BYTES))]
+                     + label_dtypes)
+    if not os.path.exists(out_dir):
+        os.makedirs(out_dir)
+
+    shards = []
+    table = []
+    out = None
+    offset = 0
+    missing = 0
+    t0 = time.time()
+
+    def close_shard():
+        out.close()
+        name = "shard_{:04d}".format(len(shards))
+        np.save(os.path.join(out_dir, name + ".npy"), np.array(table, dtype=dtype))
+        shards.append({"name": name, "count": len(table), "bytes": offset})
+
+    for row in rows:
+        path = os.path.join(image_dir, row["filename"])
+        if not os.path.exists(path):
+            missing += 1
+            continue
+        with open(path, "rb") as f:
+            data = f.read()
+        if out is not None and offset + len(data) > shard_bytes:
+            close_shard()
+            out = None
+        if out is None:
+            out = open(os.path.join(out_dir, "shard_{:04d}.bin".format(len(shards))), "wb")
+            table, offset = [], 0
+        out.write(data)
+        record = [offset, len(data), row["filename"].encode("utf-8")[:FILENAME_BYTES]]
+        for name, kind in label_dtypes:
+            value = row[name]
+            record.append(int(value) if kind == "<i4" else float(value) if kind == "<f8" else value.encode("utf-8"))
+        table.append(tuple(record))
+        offset += len(data)
+    if out is not None:
+        close_shard()
+
+    index = {
+        "version": FORMAT_VERSION,
+        "source": os.path.abspath(image_dir),
+        "labels": [name for name, _ in label_dtypes],
+        "count": sum(s["count"] for s in shards),
+        "shards": shards,
+    }
+    with open(os.path.join(out_dir, "index.json"), "w") as f:
+        json.dump(index, f, indent=2)
+    print("Packed {} images into {} shard(s) in {:.1f}s (missing {})".format(
+        index["count"], len(shards), time.time() - t0, missing))
+    return index
+
+
+def decode(data):
+    import cv2
+    return cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+
+
+class ShardDataset:
+    """
+    Random-access reader over packed shards. Image bytes are memory-mapped, so opening
+    the dataset reads only the small label tables; pages are loaded on first access.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        with open(os.path.join(root, "index.json")) as f:
+            self.index = json.load(f)
+        if self.index["version"] != FORMAT_VERSION:
+            raise ValueError("Unsupported shard format version: {}".format(self.index["version"]))
+
+        self.tables = [np.load(os.path.join(root, s["name"] + ".npy")) for s in self.index["shards"]]
+        if not self.tables:
+            raise ValueError("Empty dataset: {}".format(root))
+        self.labels = np.concatenate(self.tables)
+        # global index -> (shard, row)
+        self.shard_of = np.concatenate([np.full(len(t), i, dtype=np.int32) for i, t in enumerate(self.tables)])
+        self.row_of = np.concatenate([np.arange(len(t), dtype=np.int64) for t in self.tables])
+        self._maps = None
+
+    def __len__(self):
+        return len(self.labels)
+
+    def __getstate__(self):
+        # worker processes reopen their own memory maps
+        state = dict(self.__dict__)
+        state["_maps"] = None
+        return state
+
+    @property
+    def maps(self):
+        if self._maps is None:
+            self._maps = [np.memmap(os.path.join(self.root, s["name"] + ".bin"), dtype=np.uint8, mode="r")
+                          for s in self.index["shards"]]
+        return self._maps
+
+    def raw(self, i):
+        """Encoded image bytes as a zero-copy view into the shard."""
+        shard, row = self.shard_of[i], self.row_of[i]
+        entry = self.tables[shard][row]
+        start = int(entry["offset"])
+        return self.maps[shard][start:start + int(entry["length"])]
+
+    def __getitem__(self, i):
+        return decode(self.raw(i)), self.labels[i]
+
+    def batches(self, batch_size=64, shuffle=True, seed=None, workers=0, drop_last=False):
+        """
+        Yields (images, labels) batches. With workers > 0, JPEG decoding runs in a
+        process pool; each worker memory-maps the shards itself so only indices and
+        decoded arrays cross process boundaries.
+        """
+        order = np.arange(len(self))
+        if shuffle:
+            np.random.default_rng(seed).shuffle(order)
+        chunks = [order[i:i + batch_size] for i in range(0, len(order), batch_size)]
+        if drop_last and chunks and len(chunks[-1]) < batch_size:
+            chunks.pop()
+
+        if workers <= 0:
+            for idx in chunks:
+                yield _decode_batch(self, idx)
+            return
+
+        import multiprocessing
+        with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(self,)) as pool:
+            for images, labels in pool.imap(_decode_worker, chunks):
+                yield images, labels
+
+
+_worker_dataset = None
+
+
+def _init_worker(dataset):
+    global _worker_dataset
+    _worker_dataset = dataset
+
+
+def _decode_worker(idx):
+    return _decode_batch(_worker_dataset, idx)
+
+
+def _decode_batch(dataset, idx):
+    images = np.stack([decode(dataset.raw(i)) for i in idx])
+    return images, dataset.labels[idx]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pack a capture directory into shards")
+    parser.add_argument("image_dir")
+    parser.add_argument("csv_file")
+    parser.add_argument("out_dir")
+    parser.add_argument("--shard-mb", type=int, default=SHARD_BYTES // (1024 * 1024))
+    parser.add_argument("--verify", action="store_true", help="re-read every image after packing")
+    args = parser.parse_args()
+
+    pack(args.image_dir, args.csv_file, args.out_dir, args.shard_mb * 1024 * 1024)
+    if args.verify:
+        ds = ShardDataset(args.out_dir)
+        bad = 0
+        for i in range(len(ds)):
+            name = ds.labels[i]["filename"].decode("utf-8")
+            with open(os.path.join(args.image_dir, name), "rb") as f:
+                if f.read() != ds.raw(i).tobytes():
+                    bad += 1
+        print("Verified {} images, {} mismatched".format(len(ds), bad))
+
+
+if __name__ == "__main__":
+    main()